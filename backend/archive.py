@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import DeleteOne, ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+# Заявки в этих статусах переносятся в архив, новые остаются в горячей коллекции всегда
+ARCHIVE_STATUSES = ("processed", "replied")
+ARCHIVE_COLLECTION = "contact_submissions_archive"
+# Журнал пачек, перенос которых начат и еще не завершен
+ARCHIVE_BATCHES_COLLECTION = "contact_submissions_archive_batches"
+
+
+class SubmissionArchiver:
+    """
+    Фоновый перенос старых обработанных заявок в contact_submissions_archive
+
+    Раз в interval секунд заявки со статусом processed/replied старше age_days
+    переносятся пачками по batch_size: копия пишется в архив (upsert по id),
+    затем из горячей коллекции удаляется ровно прочитанная версия документа.
+    Если заявку изменили между чтением и удалением, она остается в горячей
+    коллекции, а ее копия удаляется из архива. Повторный запуск после сбоя
+    безопасен: копии перезаписываются, а не дублируются. Пачка записывается
+    в журнал до копирования; если процесс упал до конца переноса, через
+    lease_seconds recover удаляет из архива копии заявок, оставшихся в горячей
+    коллекции (их могли изменить, и повторный запуск их уже не выберет).
+    """
+
+    def __init__(
+        self,
+        age_days: float = 180.0,
+        batch_size: int = 500,
+        interval: float = 3600.0,
+        lease_seconds: float = 600.0
+    ):
+        self.age_days = age_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self.archived = 0
+        self.recovered = 0
+        self.last_run_at: Optional[datetime] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.age_days > 0
+
+    async def archive_batch(self) -> int:
+        """Переносит одну пачку; возвращает количество перенесенных заявок"""
+        hot = self._db.contact_submissions
+        archive = self._db[ARCHIVE_COLLECTION]
+        cutoff = datetime.utcnow() - timedelta(days=self.age_days)
+
+        docs = await hot.find(
+            {"status": {"$in": list(ARCHIVE_STATUSES)}, "created_at": {"$lt": cutoff}}
+        ).sort([("created_at", 1), ("id", 1)]).limit(self.batch_size).to_list(length=self.batch_size)
+        if not docs:
+            return 0
+
+        now = datetime.utcnow()
+        ids = [doc["id"] for doc in docs]
+        batches = self._db[ARCHIVE_BATCHES_COLLECTION]
+        batch = await batches.insert_one({"ids": ids, "started_at": now})
+        await archive.bulk_write(
+            [ReplaceOne({"id": doc["id"]}, {**doc, "archived_at": now}, upsert=True) for doc in docs],
+            ordered=False
+        )
+        await hot.bulk_write(
+            [
+                DeleteOne({"_id": doc["_id"], "status": doc["status"], "updated_at": doc.get("updated_at")})
+                for doc in docs
+            ],
+            ordered=False
+        )
+
+        changed = await self._drop_copies_of_hot(ids)
+        await batches.delete_one({"_id": batch.inserted_id})
+
+        moved = len(ids) - changed
+        self.archived += moved
+        return moved
+
+    async def _drop_copies_of_hot(self, ids: list) -> int:
+        """Удаляет из архива копии заявок ids, которые остались в горячей коллекции"""
+        changed = [
+            doc["id"] async for doc in self._db.contact_submissions.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})
+        ]
+        if changed:
+            await self._db[ARCHIVE_COLLECTION].delete_many({"id": {"$in": changed}})
+        return len(changed)
+
+    async def recover(self) -> int:
+        """
+        Завершает пачки из журнала, начатые дольше lease_seconds назад (процесс упал)
+
+        Returns:
+        - количество удаленных из архива копий
+        """
+        batches = self._db[ARCHIVE_BATCHES_COLLECTION]
+        stale = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        dropped = 0
+        async for batch in batches.find({"started_at": {"$lte": stale}}):
+            dropped += await self._drop_copies_of_hot(batch["ids"])
+            await batches.delete_one({"_id": batch["_id"]})
+        if dropped:
+            self.recovered += dropped
+            logger.warning(f"Removed {dropped} archive copies left by an interrupted archive batch")
+        return dropped
+
+    async def run_once(self) -> int:
+        """Переносит все подходящие заявки; возвращает их количество"""
+        await self.recover()
+        moved = 0
+        while True:
+            batch = await self.archive_batch()
+            moved += batch
+            if batch < self.batch_size:
+                break
+        self.last_run_at = datetime.utcnow()
+        if moved:
+            logger.info(f"Archived {moved} contact submissions older than {self.age_days:g} days")
+        return moved
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Submission archiver cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, db) -> None:
+        self._db = db
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "age_days": self.age_days,
+            "archived": self.archived,
+            "recovered": self.recovered,
+            "last_run_at": self.last_run_at,
+        }
+
+
+submission_archiver = SubmissionArchiver(
+    age_days=float(os.getenv('SUBMISSION_ARCHIVE_AFTER_DAYS', '180')),
+    batch_size=int(os.getenv('SUBMISSION_ARCHIVE_BATCH_SIZE', '500')),
+    interval=float(os.getenv('SUBMISSION_ARCHIVE_INTERVAL_SECONDS', '3600'))
+)
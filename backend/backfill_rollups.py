@@ -0,0 +1,40 @@
+"""
+Пересчет сводок заявок по часам и дням (submission_rollups_hourly/daily) по истории
+
+Запуск из каталога backend (MONGO_URL и DB_NAME берутся из .env):
+    python backfill_rollups.py [--since YYYY-MM-DD]
+
+Без --since сводки пересчитываются за все время, с --since - начиная с этого дня
+(UTC). Новые заявки и смены статуса обновляют сводки сами, пересчет нужен один
+раз после обновления и для исправления расхождений.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from rollups import backfill
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--since", type=datetime.fromisoformat, help="первый пересчитываемый день, YYYY-MM-DD")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        report = await backfill(client[os.environ['DB_NAME']], args.since)
+    finally:
+        client.close()
+    print(f"{report['submissions']} submissions: {report['hours']} hourly and {report['days']} daily rollups")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+"""
+Вставка заявок при всплеске: insert_one на заявку против групповой записи GroupCommitWriter
+
+Запуск из каталога backend:
+    python benchmarks/bench_contact_group_commit.py --mongo-url mongodb://localhost:27017 [--submissions 2000] [--concurrency 50]
+    python benchmarks/bench_contact_group_commit.py --simulated-rtt-ms 1
+
+С --mongo-url документы пишутся в базу bench_group_commit (удаляется после замера).
+Без MongoDB --simulated-rtt-ms заменяет коллекцию объектом, каждый вызов которого
+занимает один сетевой round trip (параллельно с другими вызовами) и
+--simulated-commit-us + --simulated-doc-us на документ времени сервера, которое
+вызовы делят по очереди (фиксация записи в журнал). --concurrency - число
+одновременных отправителей формы.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from group_commit import GroupCommitWriter
+
+
+class SimulatedCollection:
+    """Коллекция с задержкой round trip и общей очередью фиксации; хранит только количество документов"""
+    full_name = "bench.contact_submissions"
+
+    def __init__(self, rtt: float, commit: float, per_document: float):
+        self.rtt = rtt
+        self.commit = commit
+        self.per_document = per_document
+        self.count = 0
+        self.round_trips = 0
+        self._server = asyncio.Lock()
+
+    async def insert_one(self, document):
+        await self.insert_many([document])
+
+        class Result:
+            inserted_id = document["_id"]
+        return Result()
+
+    async def insert_many(self, documents, ordered=True):
+        for document in documents:
+            document.setdefault("_id", uuid.uuid4().hex)
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt / 2)
+        async with self._server:
+            await asyncio.sleep(self.commit + self.per_document * len(documents))
+        await asyncio.sleep(self.rtt / 2)
+        self.count += len(documents)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def make_submission():
+    return {
+        "id": str(uuid.uuid4()),
+        "name": "Иван Петров",
+        "phone": "+79991234567",
+        "email": "ivan@example.com",
+        "organization": "Школа №1",
+        "comment": "Интересуют курсы якутского языка для сотрудников",
+        "agree": True,
+        "created_at": datetime.utcnow(),
+        "ip_address": "127.0.0.1",
+        "status": "new",
+    }
+
+
+async def run(writer, collection, submissions, concurrency):
+    remaining = [submissions]
+    latencies = []
+
+    async def client():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            document = make_submission()
+            began = time.perf_counter()
+            await writer.insert_one(collection, document)
+            latencies.append(time.perf_counter() - began)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await writer.stop()
+    return latencies, elapsed
+
+
+def report(name, latencies, elapsed, extra=""):
+    print(
+        f"{name:12s} {len(latencies) / elapsed:9.1f} inserts/s"
+        f"  p50 {percentile(latencies, 0.5) * 1000:7.2f} ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  {extra}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-url")
+    parser.add_argument("--simulated-rtt-ms", type=float, default=1.0)
+    parser.add_argument("--simulated-commit-us", type=float, default=300.0)
+    parser.add_argument("--simulated-doc-us", type=float, default=20.0)
+    parser.add_argument("--submissions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=2.0, help="окно группировки")
+    parser.add_argument("--max-batch", type=int, default=100)
+    args = parser.parse_args()
+
+    client = None
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+        database = client["bench_group_commit"]
+
+        def new_collection():
+            return database.contact_submissions
+        target = args.mongo_url
+    else:
+        rtt, commit, per_document = (
+            args.simulated_rtt_ms / 1000, args.simulated_commit_us / 1e6, args.simulated_doc_us / 1e6
+        )
+
+        def new_collection():
+            return SimulatedCollection(rtt, commit, per_document)
+        target = (
+            f"simulated: rtt {args.simulated_rtt_ms} ms, "
+            f"commit {args.simulated_commit_us} us + {args.simulated_doc_us} us/doc"
+        )
+
+    print(f"{args.submissions} submissions, {args.concurrency} concurrent clients, {target}")
+    try:
+        for name, writer in (
+            ("insert_one", GroupCommitWriter()),
+            ("group commit", GroupCommitWriter(max_delay=args.delay_ms / 1000, max_batch=args.max_batch)),
+        ):
+            collection = new_collection()
+            if client is not None:
+                await collection.drop()
+            latencies, elapsed = await run(writer, collection, args.submissions, args.concurrency)
+            stats = writer.stats()
+            report(name, latencies, elapsed, f"batches {stats['batches']}, avg batch {stats['avg_batch']}" if writer.enabled else "")
+    finally:
+        if client is not None:
+            await client.drop_database("bench_group_commit")
+            client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""
+Сравнение сериализации страницы новостей: pydantic + json против NewsRecord + orjson
+
+Запуск из каталога backend:
+    python benchmarks/bench_news_serialization.py [--items 100] [--rounds 2000]
+
+"before" повторяет прежний путь GET /news: модель на каждый документ,
+повторная проверка response_model в FastAPI, jsonable_encoder и json.dumps.
+"after" - текущий путь: NewsRecord.from_document и orjson.
+"""
+import argparse
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models import News, NewsSummary, NewsSummaryListResponse
+from projection import NEWS_SUMMARY_FIELDS
+from records import NewsRecord, dump
+
+
+def make_documents(count: int) -> list:
+    start = datetime(2025, 1, 1, 12, 30, 15, 123000)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Новость номер {i}: занятия по якутскому языку",
+            "excerpt": "Краткое описание новости центра «Силис». " * 3,
+            "content": "Полный текст новости. " * 80,
+            "date": start - timedelta(days=i),
+            "created_at": start - timedelta(days=i),
+            "updated_at": start - timedelta(days=i, hours=-1),
+            "published": True,
+            "author": "Администратор",
+        }
+        for i in range(count)
+    ]
+
+
+def encode_before_list(documents, fields, response_field) -> bytes:
+    news_objects = [NewsSummary(**{name: doc.get(name) for name in fields}) for doc in documents]
+    response = NewsSummaryListResponse(news=news_objects, total=None, has_more=True, next_cursor="x")
+    coroutine = serialize_response(field=response_field, response_content=response, exclude_unset=True)
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        content = done.value
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def encode_after_list(documents, fields) -> bytes:
+    records = [NewsRecord.from_document(doc) for doc in documents]
+    return dump({
+        "news": [record.to_dict(fields) for record in records],
+        "total": None,
+        "has_more": True,
+        "next_cursor": "x",
+    })
+
+
+def encode_before_item(document) -> bytes:
+    news_obj = News(**{name: document.get(name) for name in News.model_fields})
+    content = jsonable_encoder(News.model_validate(news_obj.model_dump()))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_after_item(document) -> bytes:
+    return dump(NewsRecord.from_document(document).to_dict())
+
+
+def _trim_dates(payload: dict) -> dict:
+    """pydantic пишет микросекунды полностью, orjson - без хвостовых нулей; сравниваем до миллисекунд"""
+    for item in payload["news"]:
+        for name in ("date", "created_at", "updated_at"):
+            if name in item:
+                item[name] = item[name][:23]
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="новостей на странице")
+    parser.add_argument("--rounds", type=int, default=2000, help="повторов на замер")
+    parser.add_argument("--fields", default=",".join(NEWS_SUMMARY_FIELDS), help="поля страницы (fields=)")
+    args = parser.parse_args()
+
+    documents = make_documents(args.items)
+    fields = args.fields.split(",")
+    response_field = create_response_field(name="Response_get_news", type_=NewsSummaryListResponse, mode="serialization")
+
+    # Оба пути должны давать один и тот же JSON
+    before = json.loads(encode_before_list(documents, fields, response_field))
+    after = json.loads(encode_after_list(documents, fields))
+    if _trim_dates(before) != _trim_dates(after):
+        sys.exit("before/after payloads differ")
+
+    cases = [
+        ("list before", lambda: encode_before_list(documents, fields, response_field), args.items),
+        ("list after", lambda: encode_after_list(documents, fields), args.items),
+        ("item before", lambda: encode_before_item(documents[0]), 1),
+        ("item after", lambda: encode_after_item(documents[0]), 1),
+    ]
+    print(f"{args.items} items per page, fields={','.join(fields)}, {args.rounds} rounds")
+    results = {}
+    for name, func, per_call in cases:
+        best = min(timeit.repeat(func, number=args.rounds, repeat=5)) / args.rounds
+        results[name] = best
+        print(f"{name:12s} {best * 1e6:10.1f} us/call {best * 1e6 / per_call:8.2f} us/item")
+    print(f"list speedup: {results['list before'] / results['list after']:.1f}x, "
+          f"item speedup: {results['item before'] / results['item after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Санитизация: цепочка re.sub против security.sanitize_string/sanitize_dict с одной проверкой
+
+Запуск из каталога backend:
+    python benchmarks/bench_sanitizer.py [--rows 100] [--rounds 200]
+
+Замеряется время страницы админки из --rows заявок и новостей: прежняя
+реализация (эталон из tests/test_sanitizer.py), текущий sanitize_dict
+и read_sanitized для документов, очищенных при записи (stamp_sanitized).
+Эквивалентность реализаций проверяется тестами: python -m pytest tests/test_sanitizer.py
+"""
+import argparse
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR.parent))
+
+from security import sanitize_dict, read_sanitized, stamp_sanitized
+from tests.test_sanitizer import reference_sanitize_dict
+
+
+# --- Замер ---
+
+def make_page(rows: int) -> tuple:
+    start = datetime(2025, 3, 1, 9, 0)
+    submissions = [
+        {
+            "_id": str(uuid.uuid4()),
+            "id": str(uuid.uuid4()),
+            "name": "Иван Петров",
+            "phone": "+79991234567",
+            "email": f"ivan{i}@example.com",
+            "organization": "МБОУ «Школа №1» г. Якутск",
+            "comment": "Интересуют курсы якутского языка для сотрудников, 2 группы по 10 человек. " * 2,
+            "agree": True,
+            "created_at": start - timedelta(hours=i),
+            "ip_address": "10.0.0.1",
+            "status": "new",
+        }
+        for i in range(rows)
+    ]
+    news = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Новость номер {i}: занятия по якутскому языку",
+            "excerpt": "Краткое описание новости центра «Силис». " * 3,
+            "content": "Полный текст новости (с подробностями): расписание, стоимость. " * 40,
+            "date": start - timedelta(days=i),
+            "published": True,
+            "author": "admin",
+        }
+        for i in range(rows)
+    ]
+    return submissions, news
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    submissions, news = make_page(args.rows)
+    for name, page in (("submissions", submissions), ("news", news)):
+        stamped = [stamp_sanitized(dict(doc)) for doc in page]
+        before = min(timeit.repeat(lambda: [reference_sanitize_dict(doc) for doc in page], number=args.rounds, repeat=3))
+        after = min(timeit.repeat(lambda: [sanitize_dict(doc) for doc in page], number=args.rounds, repeat=3))
+        # read_sanitized забирает служебные поля из документа, поэтому копия на каждый проход
+        on_write = min(timeit.repeat(lambda: [read_sanitized(dict(doc)) for doc in stamped], number=args.rounds, repeat=3))
+        print(
+            f"{name:11s} page of {args.rows}: before {before / args.rounds * 1000:7.3f} ms"
+            f"  after {after / args.rounds * 1000:7.3f} ms  x{before / after:.1f}"
+            f"  sanitized on write {on_write / args.rounds * 1000:7.3f} ms  x{before / on_write:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
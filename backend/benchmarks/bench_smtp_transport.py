@@ -0,0 +1,151 @@
+"""
+Пропускная способность отправки писем: соединение на письмо против пула SMTPPool
+
+Письма уходят на локальный SMTP-приемник aiosmtpd, который ничего не доставляет.
+Запуск из каталога backend (aiosmtpd: pip install -r benchmarks/requirements.txt):
+    python benchmarks/bench_smtp_transport.py [--messages 500] [--pool 2] [--server-delay-ms 5]
+
+"before" повторяет прежний EmailService._send_email: новое smtplib соединение
+на каждое письмо, письма по очереди. "after" - SMTPPool, в который пишут
+--pool параллельных отправителей (как воркеры очереди писем).
+--server-delay-ms добавляет задержку ответа на каждую команду сервера,
+чтобы приблизить стоимость соединения к реальному SMTP.
+"""
+import argparse
+import asyncio
+import smtplib
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from datetime import datetime
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP as SMTPServer
+
+from email_service import EmailService
+from models import EmailData
+from smtp_pool import SMTPPool
+
+
+class SinkHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+class SlowSMTPServer(SMTPServer):
+    """aiosmtpd сервер с задержкой перед ответом на каждую команду"""
+    delay = 0.0
+
+    async def push(self, status):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return await super().push(status)
+
+
+class SlowController(Controller):
+    def factory(self):
+        return SlowSMTPServer(self.handler, **self.SMTP_kwargs)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, latencies, elapsed):
+    print(
+        f"{name:7s} {len(latencies) / elapsed:8.1f} msg/s"
+        f"  p50 {percentile(latencies, 0.5) * 1000:7.2f} ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms"
+    )
+
+
+def make_message():
+    service = EmailService()
+    return service.create_submission_email(EmailData(
+        name="Иван Петров",
+        phone="+79991234567",
+        email="ivan@example.com",
+        organization="Школа №1",
+        comment="Интересуют курсы якутского языка для сотрудников",
+        created_at=datetime.utcnow(),
+    ))
+
+
+async def run_before(host, port, msg, count):
+    def send_one():
+        with smtplib.SMTP(host, port, timeout=30) as server:
+            server.sendmail(msg.sender, [msg.to], msg.as_bytes())
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        began = time.perf_counter()
+        # Прежний код выполнял это прямо в event loop; здесь в потоке, результат тот же
+        await asyncio.to_thread(send_one)
+        latencies.append(time.perf_counter() - began)
+    return latencies, time.perf_counter() - start
+
+
+async def run_after(host, port, msg, count, pool_size):
+    pool = SMTPPool(host, port, size=pool_size, require_tls=False)
+    queue = asyncio.Queue()
+    for _ in range(count):
+        queue.put_nowait(None)
+    latencies = []
+
+    async def sender():
+        while not queue.empty():
+            queue.get_nowait()
+            began = time.perf_counter()
+            await pool.send(msg)
+            latencies.append(time.perf_counter() - began)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(pool_size)))
+    elapsed = time.perf_counter() - start
+    await pool.close()
+    return latencies, elapsed, pool.stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--pool", type=int, default=2, help="размер пула и число параллельных отправителей")
+    parser.add_argument("--server-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    SlowSMTPServer.delay = args.server_delay_ms / 1000
+    handler = SinkHandler()
+    host, port = "127.0.0.1", free_port()
+    controller = SlowController(handler, hostname=host, port=port)
+    controller.start()
+    msg = make_message()
+
+    try:
+        print(f"{args.messages} messages, pool {args.pool}, server delay {args.server_delay_ms} ms per reply")
+        latencies, elapsed = await run_before(host, port, msg, args.messages)
+        report("before", latencies, elapsed)
+        latencies, elapsed, stats = await run_after(host, port, msg, args.messages, args.pool)
+        report("after", latencies, elapsed)
+        print(f"pool: {stats}, sink received {handler.received}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
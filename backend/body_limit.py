@@ -0,0 +1,117 @@
+import os
+from typing import List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+from security import SecurityMiddleware
+
+BODY_TOO_LARGE_DETAIL = "Размер запроса превышает лимит"
+
+
+class BodyLimit(NamedTuple):
+    """Лимит тела запроса для методов methods (None - любой) и путей, начинающихся с prefix"""
+    prefix: str
+    max_bytes: int
+    methods: Optional[Tuple[str, ...]] = None
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware: ограничение размера тела запроса по маршрутам
+
+    Запрос с Content-Length больше лимита отклоняется с 413 до вызова приложения.
+    Для остальных (в том числе chunked) байты считаются по мере чтения тела:
+    как только лимит превышен, чтение прерывается HTTPException 413, и тело
+    целиком в памяти не собирается. Если обработчик перехватил исключение
+    и пытается ответить иначе, клиент все равно получает 413.
+    Первый подходящий лимит из limits применяется, иначе default.
+    """
+
+    def __init__(self, app, limits: List[BodyLimit], default: int):
+        self.app = app
+        self.limits = limits
+        self.default = default
+
+    def limit_for(self, method: str, path: str) -> int:
+        for limit in self.limits:
+            if path.startswith(limit.prefix) and (limit.methods is None or method in limit.methods):
+                return limit.max_bytes
+        return self.default
+
+    async def _reject(self, scope, receive, send, client: Optional[str], detail: str) -> None:
+        SecurityMiddleware.log_security_event("BODY_TOO_LARGE", f"{scope['method']} {scope['path']}: {detail}", client)
+        response = JSONResponse(
+            {"detail": BODY_TOO_LARGE_DETAIL},
+            status_code=413,
+            headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.limit_for(scope["method"], scope["path"])
+        client = scope["client"][0] if scope.get("client") else None
+
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    pass
+                break
+        if content_length is not None and content_length > max_bytes:
+            await self._reject(scope, receive, send, client, f"content-length {content_length} > {max_bytes}")
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                raise HTTPException(status_code=413, detail=BODY_TOO_LARGE_DETAIL)
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    exceeded = True
+                    raise HTTPException(status_code=413, detail=BODY_TOO_LARGE_DETAIL)
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                # Обработчик перехватил исключение (например, как 500): отвечаем 413
+                if message["type"] == "http.response.start":
+                    response_started = True
+                    await self._reject(scope, receive, send, client, f"streamed body > {max_bytes}")
+                return
+            if exceeded:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+
+def _limit(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# Первый подходящий префикс применяется, поэтому частные пути идут раньше общих
+BODY_LIMITS = [
+    BodyLimit("/api/contact-form", _limit('BODY_LIMIT_CONTACT_FORM_BYTES', 16 * 1024), ("POST",)),
+    BodyLimit("/api/admin/news/import", _limit('BODY_LIMIT_IMPORT_BYTES', 50 * 1024 * 1024), ("POST",)),
+    BodyLimit("/api/admin/submissions/import", _limit('BODY_LIMIT_IMPORT_BYTES', 50 * 1024 * 1024), ("POST",)),
+    BodyLimit("/api/admin/login", 4 * 1024, ("POST",)),
+    BodyLimit("/api/admin/", _limit('BODY_LIMIT_ADMIN_BYTES', 1024 * 1024)),
+    BodyLimit("/api/news", _limit('BODY_LIMIT_ADMIN_BYTES', 1024 * 1024)),
+]
+BODY_LIMIT_DEFAULT = _limit('BODY_LIMIT_DEFAULT_BYTES', 64 * 1024)
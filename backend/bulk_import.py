@@ -0,0 +1,261 @@
+import codecs
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from models import NewsCreate, News, ContactSubmissionCreate, ContactSubmission
+from security import (
+    stamp_sanitized,
+    validate_email,
+    validate_phone,
+    MAX_NAME_LENGTH,
+    MAX_COMMENT_LENGTH,
+    MAX_ORGANIZATION_LENGTH
+)
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+MAX_LINE_LENGTH = 1024 * 1024  # 1MB на одну запись
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Краткое описание ошибок pydantic: "поле: сообщение; ..." """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Превращает поток байтов из request.stream() в строки, не держа в памяти весь файл
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError("Слишком длинная строка в файле импорта")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Разбирает NDJSON: (номер строки, объект, ошибка)
+    """
+    row_number = 0
+    async for line in lines:
+        row_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Некорректный JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Строка должна содержать JSON объект"
+            continue
+        yield row_number, row, None
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Разбирает CSV с заголовком: (номер записи, словарь, ошибка)
+
+    Поля в кавычках могут содержать переводы строк: запись считается
+    завершенной, когда количество кавычек в ней четное.
+    """
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    quotes = 0
+    row_number = 0
+
+    async for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            if sum(len(part) for part in record) > MAX_LINE_LENGTH:
+                raise ValueError("Слишком длинная запись в файле импорта")
+            continue
+
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"Ожидалось {len(header)} колонок, получено {len(values)}"
+            continue
+        yield row_number, {
+            name: (value if value != "" else None) for name, value in zip(header, values)
+        }, None
+
+    if record:
+        row_number += 1
+        yield row_number, None, "Незакрытая кавычка в конце файла"
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value) if "T" in value else datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Некорректный формат даты. Используйте YYYY-MM-DD")
+
+
+def news_row_to_document(row: Dict[str, Any]) -> dict:
+    """
+    Проверяет строку импорта моделью NewsCreate и строит документ новости
+    """
+    news_data = NewsCreate(**row)
+    published = row.get("published")
+    if isinstance(published, str):
+        published = published.strip().lower() in ("1", "true", "yes", "да")
+
+    now = datetime.utcnow()
+    return stamp_sanitized(News(
+        title=news_data.title,
+        excerpt=news_data.excerpt,
+        content=news_data.content,
+        date=_parse_date(news_data.date),
+        created_at=now,
+        updated_at=now,
+        published=True if published is None else bool(published)
+    ).dict())
+
+
+def submission_row_to_document(row: Dict[str, Any]) -> dict:
+    """
+    Проверяет строку импорта моделью ContactSubmissionCreate и теми же правилами, что и форма
+
+    Дополнительно принимает колонки created_at и status для архивных заявок.
+    """
+    submission = ContactSubmissionCreate(**row)
+
+    if len(submission.name) > MAX_NAME_LENGTH:
+        raise ValueError(f"Имя слишком длинное (максимум {MAX_NAME_LENGTH} символов)")
+    if submission.organization and len(submission.organization) > MAX_ORGANIZATION_LENGTH:
+        raise ValueError(f"Название организации слишком длинное (максимум {MAX_ORGANIZATION_LENGTH} символов)")
+    if submission.comment and len(submission.comment) > MAX_COMMENT_LENGTH:
+        raise ValueError(f"Комментарий слишком длинный (максимум {MAX_COMMENT_LENGTH} символов)")
+
+    status = row.get("status") or "new"
+    if status not in ("new", "processed", "replied"):
+        raise ValueError("Некорректный статус. Допустимые: new, processed, replied")
+
+    created_at = row.get("created_at")
+    return stamp_sanitized(ContactSubmission(
+        name=submission.name.strip(),
+        phone=validate_phone(submission.phone),
+        email=validate_email(submission.email),
+        organization=submission.organization.strip() if submission.organization else None,
+        comment=submission.comment.strip() if submission.comment else None,
+        agree=submission.agree,
+        created_at=_parse_date(created_at) if created_at else datetime.utcnow(),
+        status=status
+    ).dict())
+
+
+class BulkImporter:
+    """
+    Проверяет строки и пишет их пачками через insert_many(ordered=False)
+
+    В памяти одновременно находится не больше batch_size документов
+    и не больше MAX_REPORTED_ERRORS описаний ошибок.
+    """
+
+    def __init__(
+        self,
+        collection,
+        to_document: Callable[[Dict[str, Any]], dict],
+        on_inserted: Optional[Callable[[List[dict]], None]] = None,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ):
+        self.collection = collection
+        self.to_document = to_document
+        self.on_inserted = on_inserted
+        self.batch_size = batch_size
+        self._batch: List[Tuple[int, dict]] = []
+        self.total_rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def _error(self, row_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    async def add(self, row_number: int, row: Optional[dict], error: Optional[str] = None):
+        self.total_rows += 1
+        if error:
+            self._error(row_number, error)
+            return
+
+        try:
+            document = self.to_document(row)
+        except ValidationError as ve:
+            self._error(row_number, format_validation_error(ve))
+            return
+        except (ValueError, TypeError) as ve:
+            self._error(row_number, str(ve))
+            return
+
+        self._batch.append((row_number, document))
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        failed_indexes = set()
+        try:
+            await self.collection.insert_many([doc for _, doc in batch], ordered=False)
+        except BulkWriteError as bwe:
+            for write_error in bwe.details.get("writeErrors", []):
+                index = write_error["index"]
+                failed_indexes.add(index)
+                self._error(batch[index][0], f"Ошибка записи: {write_error.get('errmsg', 'unknown')}")
+
+        inserted_docs = [doc for index, (_, doc) in enumerate(batch) if index not in failed_indexes]
+        self.inserted += len(inserted_docs)
+        if self.on_inserted and inserted_docs:
+            self.on_inserted(inserted_docs)
+
+    async def run(self, rows: AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]) -> dict:
+        """Обрабатывает весь поток строк и возвращает отчет"""
+        async for row_number, row, error in rows:
+            await self.add(row_number, row, error)
+        await self.flush()
+        return self.report()
+
+    def report(self) -> dict:
+        return {
+            "success": self.failed == 0,
+            "total_rows": self.total_rows,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
@@ -0,0 +1,148 @@
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from models import BulkOperation, BulkOperationResult, BulkOperationsResponse
+
+SUBMISSION_STATUSES = ("new", "processed", "replied")
+
+
+def submission_operation(operation: BulkOperation, now: datetime) -> Tuple[object, Optional[dict]]:
+    """
+    Операция над заявкой: (запрос bulk_write, изменения $set или None для удаления)
+
+    Raises:
+    - ValueError: неизвестное действие или статус
+    """
+    if operation.action == "status":
+        if operation.status not in SUBMISSION_STATUSES:
+            raise ValueError(f"Некорректный статус. Допустимые: {', '.join(SUBMISSION_STATUSES)}")
+        changes = {"status": operation.status, "updated_at": now}
+        return UpdateOne({"id": operation.id}, {"$set": changes}), changes
+    if operation.action == "delete":
+        return DeleteOne({"id": operation.id}), None
+    raise ValueError("Неизвестное действие. Допустимые: status, delete")
+
+
+def news_operation(operation: BulkOperation, now: datetime) -> Tuple[object, Optional[dict]]:
+    """
+    Операция над новостью: (запрос bulk_write, изменения $set или None для удаления)
+
+    Raises:
+    - ValueError: неизвестное действие
+    """
+    if operation.action in ("publish", "unpublish"):
+        changes = {"published": operation.action == "publish", "updated_at": now}
+        return UpdateOne({"id": operation.id}, {"$set": changes}), changes
+    if operation.action == "delete":
+        return DeleteOne({"id": operation.id}), None
+    raise ValueError("Неизвестное действие. Допустимые: publish, unpublish, delete")
+
+
+class BulkOperations:
+    """
+    Выполняет пакет операций одним bulk_write(ordered=False)
+
+    Документы пакета читаются одним find по id (projection - какие поля нужны
+    on_written): несуществующие id и ошибки валидации попадают в результаты
+    сразу, без записи. on_written(id, before, after) вызывается для каждой
+    успешной операции (after=None для удаления).
+
+    fallback - вторая коллекция (архив заявок): id, которых нет в основной,
+    ищутся в ней, и операции над ними пишутся в нее отдельным bulk_write.
+    """
+
+    def __init__(
+        self,
+        collection,
+        to_request: Callable[[BulkOperation, datetime], Tuple[object, Optional[dict]]],
+        on_written: Optional[Callable[[str, dict, Optional[dict]], None]] = None,
+        projection: Optional[dict] = None,
+        fallback=None
+    ):
+        self.collection = collection
+        self.to_request = to_request
+        self.on_written = on_written
+        self.projection = projection
+        self.fallback = fallback
+
+    async def run(self, operations: List[BulkOperation]) -> BulkOperationsResponse:
+        now = datetime.utcnow()
+        results: List[BulkOperationResult] = [
+            BulkOperationResult(id=operation.id, action=operation.action, success=False)
+            for operation in operations
+        ]
+
+        ids = list(dict.fromkeys(operation.id for operation in operations))
+        existing: Dict[str, dict] = {}
+        # Коллекция, в которой найден документ
+        source: Dict[str, object] = {}
+        for collection in (self.collection, self.fallback):
+            missing = [document_id for document_id in ids if document_id not in existing]
+            if collection is None or not missing:
+                continue
+            async for document in collection.find({"id": {"$in": missing}}, self.projection):
+                existing[document["id"]] = document
+                source[document["id"]] = collection
+
+        # (номер операции, запрос, изменения) для bulk_write
+        planned: List[Tuple[int, object, Optional[dict]]] = []
+        seen = set()
+        for index, operation in enumerate(operations):
+            if operation.id in seen:
+                results[index].error = "id повторяется в пакете"
+                continue
+            seen.add(operation.id)
+            if operation.id not in existing:
+                results[index].error = "Не найдено"
+                continue
+            try:
+                request, changes = self.to_request(operation, now)
+            except ValueError as ve:
+                results[index].error = str(ve)
+                continue
+            planned.append((index, request, changes))
+
+        failed_positions = set()
+        for collection in (self.collection, self.fallback):
+            # Позиции в planned операций над документами этой коллекции
+            positions = [
+                position for position, (index, _, _) in enumerate(planned)
+                if source[operations[index].id] is collection
+            ]
+            if not positions:
+                continue
+            try:
+                await collection.bulk_write([planned[position][1] for position in positions], ordered=False)
+            except BulkWriteError as bwe:
+                for write_error in bwe.details.get("writeErrors", []):
+                    position = positions[write_error["index"]]
+                    failed_positions.add(position)
+                    results[planned[position][0]].error = f"Ошибка записи: {write_error.get('errmsg', 'unknown')}"
+
+        for position, (index, _, changes) in enumerate(planned):
+            if position in failed_positions:
+                continue
+            results[index].success = True
+            if self.on_written:
+                before = existing[operations[index].id]
+                self.on_written(before["id"], before, None if changes is None else {**before, **changes})
+
+        succeeded = sum(1 for result in results if result.success)
+        return BulkOperationsResponse(
+            success=succeeded == len(results),
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=results
+        )
+
+
+def summarize(response: BulkOperationsResponse) -> str:
+    """Описание пакета для журнала безопасности: действия и количество ошибок"""
+    actions = Counter(result.action for result in response.results if result.success)
+    done = ", ".join(f"{action}={count}" for action, count in sorted(actions.items())) or "none"
+    return f"{response.succeeded}/{response.total} operations applied ({done}), {response.failed} failed"
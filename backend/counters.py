@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from archive import ARCHIVE_COLLECTION
+from rollups import bucket_start, rollup_fields, write_rollups
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "admin_counters"
+ADMIN_COUNTERS_ID = "admin_stats"
+# Окно recent_submissions в статистике админки
+RECENT_DAYS = 7
+_HOUR_FORMAT = "%Y-%m-%dT%H"
+
+
+def _hour_key(moment: datetime) -> str:
+    return moment.strftime(_HOUR_FORMAT)
+
+
+def _recent_start(now: datetime) -> datetime:
+    """Начало часа, в который попадает now - RECENT_DAYS: с него хранятся почасовые счетчики"""
+    return (now - timedelta(days=RECENT_DAYS)).replace(minute=0, second=0, microsecond=0)
+
+
+def _comparable(counters: dict, field: str):
+    """Значение счетчика для сравнения при пересчете: без нулевых и выпавших из окна записей"""
+    value = counters.get(field, 0)
+    if not isinstance(value, dict):
+        return value
+    if field == "submissions_hourly":
+        start = _hour_key(_recent_start(datetime.utcnow()))
+        return {hour: count for hour, count in value.items() if count and hour >= start}
+    return {key: count for key, count in value.items() if count}
+
+
+class CounterDelta:
+    """
+    Изменения счетчиков ($inc) и сводок по часам (rollups.py) по одной записи или по пакету записей
+
+    before/after - документ до и после записи (None для создания и удаления),
+    достаточно полей status, organization и created_at у заявки и published у новости.
+    """
+
+    def __init__(self):
+        self.inc: Counter = Counter()
+        self.rollups: Dict[datetime, Counter] = defaultdict(Counter)
+        self._recent_start = _recent_start(datetime.utcnow())
+
+    def submission(self, before: Optional[dict], after: Optional[dict]) -> "CounterDelta":
+        if before:
+            self._submission(before, -1)
+        if after:
+            self._submission(after, 1)
+        return self
+
+    def news(self, before: Optional[dict], after: Optional[dict]) -> "CounterDelta":
+        if before:
+            self._news(before, -1)
+        if after:
+            self._news(after, 1)
+        return self
+
+    def _submission(self, document: dict, sign: int) -> None:
+        self.inc["submissions_total"] += sign
+        self.inc[f"submissions_by_status.{document.get('status', 'new')}"] += sign
+        created_at = document.get("created_at")
+        if not isinstance(created_at, datetime):
+            return
+        # Старые часы уже выпали из окна и не хранятся
+        if created_at >= self._recent_start:
+            self.inc[f"submissions_hourly.{_hour_key(created_at)}"] += sign
+        self.rollups[bucket_start(created_at, "hour")].update({field: sign for field in rollup_fields(document)})
+
+    def _news(self, document: dict, sign: int) -> None:
+        self.inc["news_total"] += sign
+        if document.get("published", True):
+            self.inc["news_published"] += sign
+
+
+class AdminCounters:
+    """
+    Счетчики статистики админки в одном документе admin_counters
+
+    Каждая запись заявки или новости применяет свои изменения одним $inc, поэтому
+    /admin/stats читает один документ вместо count_documents по коллекциям.
+    Заявки считаются вместе с архивом (перенос в архив счетчики не меняет),
+    recent_submissions - сумма почасовых счетчиков за RECENT_DAYS с точностью до часа.
+
+    $inc выполняется после записи документа и может не дойти (сбой, рестарт), поэтому
+    раз в interval секунд reconcile пересчитывает счетчики по коллекциям и
+    заменяет документ; расхождение пишется в лог. Записи, пришедшие во время
+    пересчета, могут дать такое же расхождение до следующего пересчета.
+    """
+
+    def __init__(self, interval: float = 3600.0):
+        self.interval = interval
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self.failed_updates = 0
+        self.reconciled = 0
+        self.corrections = 0
+        self.last_reconciled_at: Optional[datetime] = None
+
+    async def apply(self, delta: CounterDelta) -> None:
+        """
+        Применяет изменения счетчиков одним $inc и изменения сводок заявок
+
+        Ошибка не прерывает запрос: счетчики исправит reconcile, сводки - rollups.backfill
+        """
+        if self._db is None:
+            return
+        inc = {field: value for field, value in delta.inc.items() if value}
+        try:
+            if inc:
+                await self._db[COUNTERS_COLLECTION].update_one(
+                    {"_id": ADMIN_COUNTERS_ID}, {"$inc": inc}, upsert=True
+                )
+            if delta.rollups:
+                await write_rollups(self._db, delta.rollups)
+        except Exception as e:
+            self.failed_updates += 1
+            logger.error(f"Failed to update admin counters: {e}")
+
+    async def _count(self) -> dict:
+        db = self._db
+        now = datetime.utcnow()
+
+        by_status: Counter = Counter()
+        for name in ("contact_submissions", ARCHIVE_COLLECTION):
+            async for row in db[name].aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+                by_status[row["_id"] or "new"] += row["count"]
+
+        # Заявки за окно всегда в горячей коллекции (архивируются только старше 7 дней)
+        hourly = {}
+        async for row in db.contact_submissions.aggregate([
+            {"$match": {"created_at": {"$gte": _recent_start(now)}}},
+            {"$group": {"_id": {"$dateToString": {"format": _HOUR_FORMAT, "date": "$created_at"}}, "count": {"$sum": 1}}}
+        ]):
+            hourly[row["_id"]] = row["count"]
+
+        return {
+            "news_total": await db.news.count_documents({}),
+            "news_published": await db.news.count_documents({"published": {"$ne": False}}),
+            "submissions_total": sum(by_status.values()),
+            "submissions_by_status": dict(by_status),
+            "submissions_hourly": hourly,
+        }
+
+    async def reconcile(self) -> dict:
+        """Пересчитывает счетчики по коллекциям и заменяет документ; возвращает его"""
+        collection = self._db[COUNTERS_COLLECTION]
+        previous = await collection.find_one({"_id": ADMIN_COUNTERS_ID}) or {}
+        counters = await self._count()
+
+        drift = {}
+        for field in counters:
+            stored, actual = _comparable(previous, field), _comparable(counters, field)
+            if stored != actual:
+                drift[field] = (stored, actual)
+        if drift and previous.get("reconciled_at"):
+            self.corrections += 1
+            logger.warning(f"Admin counters drifted, corrected: {drift}")
+
+        counters["reconciled_at"] = datetime.utcnow()
+        await collection.replace_one({"_id": ADMIN_COUNTERS_ID}, counters, upsert=True)
+        self.reconciled += 1
+        self.last_reconciled_at = counters["reconciled_at"]
+        return {"_id": ADMIN_COUNTERS_ID, **counters}
+
+    async def read(self) -> dict:
+        """
+        Текущие счетчики:
+        {"news_total", "news_published", "submissions_total", "submissions_by_status", "recent_submissions"}
+
+        Документ, еще не прошедший пересчет (первый запуск), сначала пересчитывается
+        """
+        counters = await self._db[COUNTERS_COLLECTION].find_one({"_id": ADMIN_COUNTERS_ID})
+        if counters is None or "reconciled_at" not in counters:
+            counters = await self.reconcile()
+
+        start = _hour_key(_recent_start(datetime.utcnow()))
+        return {
+            "news_total": counters.get("news_total", 0),
+            "news_published": counters.get("news_published", 0),
+            "submissions_total": counters.get("submissions_total", 0),
+            "submissions_by_status": {
+                status: count for status, count in counters.get("submissions_by_status", {}).items() if count
+            },
+            "recent_submissions": sum(
+                count for hour, count in counters.get("submissions_hourly", {}).items() if hour >= start
+            ),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Admin counters reconcile failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, db) -> None:
+        self._db = db
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "reconciled": self.reconciled,
+            "corrections": self.corrections,
+            "failed_updates": self.failed_updates,
+            "last_reconciled_at": self.last_reconciled_at,
+        }
+
+
+admin_counters = AdminCounters(
+    interval=float(os.getenv('ADMIN_COUNTERS_RECONCILE_SECONDS', '3600'))
+)
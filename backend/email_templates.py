@@ -0,0 +1,378 @@
+"""
+Шаблоны писем центра «Силис»
+
+Шаблоны компилируются один раз при импорте: текст разбирается на статические
+куски и подстановки, поэтому при отправке письма склеиваются только значения
+заявки. Синтаксис:
+    {{ name }}              значение (в HTML шаблонах экранируется)
+    {{ name|safe }}         значение без экранирования (готовые HTML блоки)
+    {% if name %}...{% endif %}   блок выводится, если значение не пустое
+
+Тело письма кодируется в base64 (encode_base64): начало шаблона до первой
+подстановки (DOCTYPE, <style> с CSS, шапка) кодируется один раз, целыми
+строками base64, и при каждом письме кодируется только остаток.
+"""
+import base64
+import re
+import uuid
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from html import escape
+from typing import Any, Callable, Dict, List, Union
+
+_TOKEN = re.compile(
+    r"\{\{\s*(?P<var>\w+)(?P<safe>\|safe)?\s*\}\}"
+    r"|\{%\s*if\s+(?P<if>\w+)\s*%\}"
+    r"|\{%\s*endif\s*%\}"
+)
+
+_Node = Union[str, tuple]
+
+
+class TemplateSyntaxError(ValueError):
+    """Незакрытый или лишний {% if %} / {% endif %} в шаблоне"""
+
+
+class Template:
+    """Скомпилированный шаблон с автоэкранированием (autoescape=True для HTML)"""
+
+    __slots__ = ("_nodes", "_escape", "_body_nodes", "_prefix_base64", "_prefix_tail")
+
+    def __init__(self, source: str, autoescape: bool = True):
+        self._escape: Callable[[str], str] = escape if autoescape else str
+        self._nodes = self._compile(source)
+
+        # Статическое начало шаблона: целые строки base64 (по 57 байт) кэшируются,
+        # неполная последняя строка дописывается к динамической части
+        prefix = self._nodes[0].encode("utf-8") if self._nodes and isinstance(self._nodes[0], str) else b""
+        cut = len(prefix) - len(prefix) % _BASE64_LINE
+        self._prefix_base64 = _encode_base64(prefix[:cut])
+        self._prefix_tail = prefix[cut:]
+        self._body_nodes = self._nodes[1:] if prefix else self._nodes
+
+    def _compile(self, source: str) -> List[_Node]:
+        root: List[_Node] = []
+        stack = [root]
+        position = 0
+        for match in _TOKEN.finditer(source):
+            if match.start() > position:
+                stack[-1].append(source[position:match.start()])
+            position = match.end()
+
+            if match.group("var"):
+                stack[-1].append(("var", match.group("var"), not match.group("safe")))
+            elif match.group("if"):
+                block: List[_Node] = []
+                stack[-1].append(("if", match.group("if"), block))
+                stack.append(block)
+            else:
+                if len(stack) == 1:
+                    raise TemplateSyntaxError("{% endif %} без {% if %}")
+                stack.pop()
+
+        if len(stack) != 1:
+            raise TemplateSyntaxError("Незакрытый {% if %}")
+        if position < len(source):
+            root.append(source[position:])
+        return self._merge(root)
+
+    @classmethod
+    def _merge(cls, nodes: List[_Node]) -> List[_Node]:
+        """Склеивает соседние статические куски"""
+        merged: List[_Node] = []
+        for node in nodes:
+            if isinstance(node, tuple) and node[0] == "if":
+                node = ("if", node[1], cls._merge(node[2]))
+            if isinstance(node, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += node
+            else:
+                merged.append(node)
+        return merged
+
+    def _render(self, nodes: List[_Node], values: Dict[str, Any], out: List[str]) -> None:
+        for node in nodes:
+            if isinstance(node, str):
+                out.append(node)
+            elif node[0] == "var":
+                value = values.get(node[1])
+                text = "" if value is None else str(value)
+                out.append(self._escape(text) if node[2] else text)
+            elif values.get(node[1]):
+                self._render(node[2], values, out)
+
+    def render(self, **values: Any) -> str:
+        out: List[str] = []
+        self._render(self._nodes, values, out)
+        return "".join(out)
+
+    def encode_base64(self, **values: Any) -> bytes:
+        """То же, что render(), но сразу в виде тела MIME части (base64, строки по 76 символов, CRLF)"""
+        out: List[str] = []
+        self._render(self._body_nodes, values, out)
+        return self._prefix_base64 + _encode_base64(self._prefix_tail + "".join(out).encode("utf-8"))
+
+
+_BASE64_LINE = 57  # байт исходных данных на строку base64 из 76 символов
+
+
+def _encode_base64(data: bytes) -> bytes:
+    return base64.encodebytes(data).replace(b"\n", b"\r\n")
+
+
+# Заголовки частей multipart/alternative одинаковы для всех писем
+_TEXT_PART_HEADERS = (
+    b'Content-Type: text/plain; charset="utf-8"\r\n'
+    b"MIME-Version: 1.0\r\n"
+    b"Content-Transfer-Encoding: base64\r\n\r\n"
+)
+_HTML_PART_HEADERS = (
+    b'Content-Type: text/html; charset="utf-8"\r\n'
+    b"MIME-Version: 1.0\r\n"
+    b"Content-Transfer-Encoding: base64\r\n\r\n"
+)
+
+
+class EncodedEmail:
+    """
+    Готовое письмо multipart/alternative (текст + HTML) в виде байтов
+
+    msg["Subject"], msg["From"], msg["To"] доступны как у email.message.Message.
+    """
+
+    __slots__ = ("subject", "sender", "to", "data")
+
+    def __init__(self, subject: str, sender: str, to: str, text_body: bytes, html_body: bytes):
+        self.subject = subject
+        self.sender = sender
+        self.to = to
+        boundary = f"==============={uuid.uuid4().hex}=="
+        headers = (
+            f"Subject: {Header(subject, 'utf-8').encode(linesep=chr(13) + chr(10))}\r\n"
+            f"From: {sender}\r\n"
+            f"To: {to}\r\n"
+            f"Date: {formatdate(localtime=False, usegmt=True)}\r\n"
+            f"Message-ID: {make_msgid(domain=sender.rpartition('@')[2] or None)}\r\n"
+            f"MIME-Version: 1.0\r\n"
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n\r\n'
+        )
+        delimiter = f"--{boundary}\r\n".encode()
+        self.data = b"".join((
+            headers.encode("ascii"),
+            delimiter, _TEXT_PART_HEADERS, text_body,
+            delimiter, _HTML_PART_HEADERS, html_body,
+            f"--{boundary}--\r\n".encode(),
+        ))
+
+    def __getitem__(self, name: str) -> str:
+        return {"Subject": self.subject, "From": self.sender, "To": self.to}[name]
+
+    def as_bytes(self) -> bytes:
+        return self.data
+
+
+def _html_page(css: str, body: str) -> str:
+    # Общая обертка: <head> с CSS - статическая часть, компилируется вместе с шаблоном
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<style>\n"
+        + css
+        + "</style>\n</head>\n<body>\n"
+        + body
+        + "</body>\n</html>\n"
+    )
+
+
+_BASE_CSS = """
+body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; }
+.header { background: linear-gradient(135deg, #0E3F2B 0%, #7DB68C 100%); color: white; padding: 20px; border-radius: 8px; text-align: center; margin-bottom: 20px; }
+.footer { text-align: center; margin-top: 20px; padding: 15px; border-radius: 8px; font-size: 14px; color: #666; }
+"""
+
+SUBMISSION_HTML = Template(_html_page(_BASE_CSS + """
+.content { background: #f9f9f9; padding: 20px; border-radius: 8px; border-left: 4px solid #7DB68C; }
+.field { margin-bottom: 15px; padding: 10px; background: white; border-radius: 4px; }
+.field-label { font-weight: bold; color: #0E3F2B; }
+.field-value { margin-top: 5px; color: #333; }
+.footer { background: #EDE6D6; }
+""", """
+<div class="header">
+    <h2>Новая заявка на коммерческое предложение</h2>
+    <p>Центр якутского языка «Силис»</p>
+</div>
+
+<div class="content">
+    <div class="field">
+        <div class="field-label">Имя клиента:</div>
+        <div class="field-value">{{ name }}</div>
+    </div>
+
+    <div class="field">
+        <div class="field-label">Телефон:</div>
+        <div class="field-value">{{ phone }}</div>
+    </div>
+
+    <div class="field">
+        <div class="field-label">Email:</div>
+        <div class="field-value">{{ email }}</div>
+    </div>
+{% if organization %}
+    <div class="field">
+        <div class="field-label">Организация:</div>
+        <div class="field-value">{{ organization }}</div>
+    </div>
+{% endif %}{% if comment %}
+    <div class="field">
+        <div class="field-label">Комментарий:</div>
+        <div class="field-value">{{ comment }}</div>
+    </div>
+{% endif %}
+    <div class="field">
+        <div class="field-label">Дата подачи заявки:</div>
+        <div class="field-value">{{ created_at }}</div>
+    </div>
+</div>
+
+<div class="footer">
+    <p>Это автоматическое уведомление с сайта центра «Силис»</p>
+    <p>Свяжитесь с клиентом в ближайшее время для обсуждения коммерческого предложения</p>
+</div>
+"""))
+
+SUBMISSION_TEXT = Template("""Новая заявка на коммерческое предложение
+Центр якутского языка «Силис»
+
+Имя клиента: {{ name }}
+Телефон: {{ phone }}
+Email: {{ email }}
+{% if organization %}Организация: {{ organization }}
+{% endif %}{% if comment %}Комментарий: {{ comment }}
+{% endif %}Дата подачи заявки: {{ created_at }}
+
+Свяжитесь с клиентом в ближайшее время для обсуждения коммерческого предложения.
+""", autoescape=False)
+
+CONFIRMATION_HTML = Template(_html_page(_BASE_CSS + """
+.content { background: #f9f9f9; padding: 20px; border-radius: 8px; }
+.highlight { background: #EDE6D6; padding: 15px; border-radius: 8px; margin: 15px 0; border-left: 4px solid #7DB68C; }
+.contact-info { background: white; padding: 15px; border-radius: 8px; margin: 15px 0; }
+""", """
+<div class="header">
+    <h2>Спасибо за вашу заявку!</h2>
+    <p>Центр якутского языка «Силис»</p>
+</div>
+
+<div class="content">
+    <p>Уважаемый(ая) {{ name }}!</p>
+
+    <p>Мы получили вашу заявку на коммерческое предложение и благодарим вас за интерес к нашим услугам.</p>
+
+    <div class="highlight">
+        <strong>Что происходит дальше:</strong>
+        <ul>
+            <li>Наш менеджер свяжется с вами в течение рабочего дня</li>
+            <li>Мы подготовим персональное коммерческое предложение</li>
+            <li>Обсудим все детали и ответим на ваши вопросы</li>
+        </ul>
+    </div>
+
+    <div class="contact-info">
+        <strong>Наши контакты:</strong><br>
+        {{ contacts_html|safe }}
+    </div>
+
+    <p>С уважением,<br>
+    Команда центра якутского языка «Силис»</p>
+</div>
+
+<div class="footer">
+    <p>Это автоматическое сообщение. Пожалуйста, не отвечайте на него.</p>
+</div>
+"""))
+
+CONFIRMATION_TEXT = Template("""Спасибо за вашу заявку!
+Центр якутского языка «Силис»
+
+Уважаемый(ая) {{ name }}!
+
+Мы получили вашу заявку на коммерческое предложение и благодарим вас за интерес к нашим услугам.
+
+Что происходит дальше:
+- Наш менеджер свяжется с вами в течение рабочего дня
+- Мы подготовим персональное коммерческое предложение
+- Обсудим все детали и ответим на ваши вопросы
+
+Наши контакты:
+{{ contacts_text }}
+
+С уважением,
+Команда центра якутского языка «Силис»
+""", autoescape=False)
+
+# Блок контактов собирается из site_content при загрузке новой версии контента
+CONTACTS_HTML = Template("""{% if email %}📧 Email: {{ email }}<br>
+{% endif %}{% if phones %}📞 Телефон: {{ phones }}<br>
+{% endif %}{% if address %}📍 Адрес: {{ address }}<br>
+{% endif %}{% if telegram %}💬 Telegram: <a href="{{ telegram }}">{{ telegram }}</a><br>
+{% endif %}{% if vk %}💬 ВКонтакте: <a href="{{ vk }}">{{ vk }}</a>
+{% endif %}""")
+
+CONTACTS_TEXT = Template("""{% if email %}Email: {{ email }}
+{% endif %}{% if phones %}Телефон: {{ phones }}
+{% endif %}{% if address %}Адрес: {{ address }}
+{% endif %}{% if telegram %}Telegram: {{ telegram }}
+{% endif %}{% if vk %}ВКонтакте: {{ vk }}
+{% endif %}""", autoescape=False)
+
+DIGEST_HTML = Template(_html_page(_BASE_CSS.replace("max-width: 600px", "max-width: 800px") + """
+table { width: 100%; border-collapse: collapse; font-size: 14px; }
+th { background: #EDE6D6; color: #0E3F2B; text-align: left; }
+th, td { padding: 8px; border-bottom: 1px solid #ddd; vertical-align: top; }
+.footer { background: #EDE6D6; }
+""", """
+<div class="header">
+    <h2>Новые заявки на коммерческое предложение: {{ count }}</h2>
+    <p>Центр якутского языка «Силис»</p>
+</div>
+
+<table>
+    <tr><th>№</th><th>Имя</th><th>Контакты</th><th>Организация</th><th>Комментарий</th><th>Дата</th></tr>
+{{ rows|safe }}</table>
+
+<div class="footer">
+    <p>Это автоматическая сводка заявок с сайта центра «Силис»</p>
+    <p>Все заявки доступны в админ панели</p>
+</div>
+"""))
+
+DIGEST_ROW_HTML = Template(
+    "    <tr><td>{{ number }}</td><td>{{ name }}</td><td>{{ phone }}<br>{{ email }}</td>"
+    "<td>{{ organization }}</td><td>{{ comment }}</td><td>{{ created_at }}</td></tr>\n"
+)
+
+DIGEST_TEXT = Template("""Новые заявки на коммерческое предложение: {{ count }}
+Центр якутского языка «Силис»
+
+{{ rows }}
+Все заявки доступны в админ панели.
+""", autoescape=False)
+
+DIGEST_ROW_TEXT = Template(
+    "{{ number }}. {{ name }}, {{ phone }}, {{ email }}{% if organization %}, {{ organization }}{% endif %}"
+    " ({{ created_at }})\n{% if comment %}   {{ comment }}\n{% endif %}",
+    autoescape=False
+)
+
+
+def render_contacts(contacts: Dict[str, Any]) -> Dict[str, str]:
+    """Готовые блоки контактов (HTML и текст) из contacts контента сайта"""
+    social = contacts.get("social") or {}
+    values = {
+        "email": contacts.get("email"),
+        "phones": ", ".join(contacts.get("phones") or []),
+        "address": contacts.get("address"),
+        "telegram": social.get("telegram"),
+        "vk": social.get("vk"),
+    }
+    return {
+        "contacts_html": CONTACTS_HTML.render(**values).strip(),
+        "contacts_text": CONTACTS_TEXT.render(**values).strip(),
+    }
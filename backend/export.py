@@ -0,0 +1,182 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List
+from xml.sax.saxutils import escape
+
+from security import read_sanitized
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Заголовки колонок выгрузки заявок
+SUBMISSION_COLUMNS = {
+    "_id": "_id",
+    "id": "ID",
+    "name": "Имя",
+    "phone": "Телефон",
+    "email": "Email",
+    "organization": "Организация",
+    "comment": "Комментарий",
+    "agree": "Согласие",
+    "created_at": "Дата",
+    "updated_at": "Изменено",
+    "ip_address": "IP",
+    "status": "Статус",
+}
+
+# Символы, недопустимые в XML 1.0
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, bool):
+        return "да" if value else "нет"
+    return str(value)
+
+
+# Телефоны и числа вида "+7 (914) 123-45-67": без букв и ссылок это не опасная формула
+_PLAIN_NUMBER = re.compile(r"[+-][\d\s()-]*\Z")
+
+
+def _csv_cell(value: Any) -> str:
+    """Ячейка CSV; значения, которые Excel принял бы за формулу, начинаются с апострофа"""
+    text = _cell(value)
+    if text[:1] in ("+", "-") and _PLAIN_NUMBER.match(text):
+        return text
+    if text[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + text
+    return text
+
+
+async def iter_csv_export(cursor, fields: List[str]) -> AsyncIterator[bytes]:
+    """
+    CSV (UTF-8 с BOM, чтобы Excel распознал кириллицу) из курсора Motor
+
+    Строки копятся в буфере и отдаются кусками по EXPORT_CHUNK_SIZE байт,
+    поэтому память не зависит от количества заявок.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow([SUBMISSION_COLUMNS[name] for name in fields])
+
+    async for document in cursor:
+        document = read_sanitized(document)
+        writer.writerow([_csv_cell(document.get(name)) for name in fields])
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _StreamSink:
+    """Несдвигаемый (unseekable) файл для ZipFile: накапливает записанные байты до drain()"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Заявки" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(values: Iterable[Any]) -> str:
+    cells = "".join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_XML_INVALID.sub("", _cell(value)))}</t></is></c>'
+        for value in values
+    )
+    return f"<row>{cells}</row>"
+
+
+async def iter_xlsx_export(cursor, fields: List[str]) -> AsyncIterator[bytes]:
+    """
+    XLSX из курсора Motor без сторонних библиотек
+
+    Лист пишется строками в ZIP-поток (data descriptor вместо перемотки файла),
+    ячейки - inline-строки, поэтому таблица общих строк в памяти не строится.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(SUBMISSION_COLUMNS[name] for name in fields).encode("utf-8"))
+
+            async for document in cursor:
+                document = read_sanitized(document)
+                sheet.write(_xlsx_row(document.get(name) for name in fields).encode("utf-8"))
+                if sink.size >= EXPORT_CHUNK_SIZE:
+                    yield sink.drain()
+
+            sheet.write(b"</sheetData></worksheet>")
+
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv_export, "text/csv; charset=utf-8"),
+    "xlsx": (iter_xlsx_export, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
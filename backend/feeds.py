@@ -0,0 +1,180 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Awaitable, Callable, Dict, List
+from xml.sax.saxutils import escape, quoteattr
+
+from http_cache import make_etag
+
+FEED_TITLE = "Новости центра якутского языка «Силис»"
+FEED_DESCRIPTION = "Новости и события центра якутского языка «Силис»"
+
+
+def news_url(site_url: str, news_id: str) -> str:
+    return f"{site_url}/?news={news_id}#news"
+
+
+def _rfc3339(value: datetime) -> str:
+    return value.replace(microsecond=0).isoformat() + "Z"
+
+
+def _rfc822(value: datetime) -> str:
+    return format_datetime(value.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+
+
+def render_atom(news: List[dict], site_url: str, updated: datetime) -> bytes:
+    """Atom 1.0 лента по списку новостей (от новых к старым)"""
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n',
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n',
+        f"<title>{escape(FEED_TITLE)}</title>\n",
+        f"<subtitle>{escape(FEED_DESCRIPTION)}</subtitle>\n",
+        f"<link href={quoteattr(site_url + '/')}/>\n",
+        f"<link rel=\"self\" href={quoteattr(site_url + '/api/feeds/news.atom')}/>\n",
+        f"<id>{escape(site_url)}/</id>\n",
+        f"<updated>{_rfc3339(updated)}</updated>\n",
+    ]
+    for item in news:
+        link = news_url(site_url, item["id"])
+        parts.append(
+            "<entry>\n"
+            f"<title>{escape(item['title'])}</title>\n"
+            f"<link href={quoteattr(link)}/>\n"
+            f"<id>urn:uuid:{escape(item['id'])}</id>\n"
+            f"<published>{_rfc3339(item['date'])}</published>\n"
+            f"<updated>{_rfc3339(item.get('updated_at') or item['date'])}</updated>\n"
+            f"<summary>{escape(item['excerpt'])}</summary>\n"
+            "</entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def render_rss(news: List[dict], site_url: str, updated: datetime) -> bytes:
+    """RSS 2.0 лента по списку новостей (от новых к старым)"""
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n',
+        f"<title>{escape(FEED_TITLE)}</title>\n",
+        f"<link>{escape(site_url)}/</link>\n",
+        f"<description>{escape(FEED_DESCRIPTION)}</description>\n",
+        "<language>ru</language>\n",
+        f"<atom:link href={quoteattr(site_url + '/api/feeds/news.rss')} rel=\"self\" type=\"application/rss+xml\"/>\n",
+        f"<lastBuildDate>{_rfc822(updated)}</lastBuildDate>\n",
+    ]
+    for item in news:
+        link = news_url(site_url, item["id"])
+        parts.append(
+            "<item>\n"
+            f"<title>{escape(item['title'])}</title>\n"
+            f"<link>{escape(link)}</link>\n"
+            f"<guid isPermaLink=\"false\">{escape(item['id'])}</guid>\n"
+            f"<pubDate>{_rfc822(item['date'])}</pubDate>\n"
+            f"<description>{escape(item['excerpt'])}</description>\n"
+            "</item>\n"
+        )
+    parts.append("</channel>\n</rss>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def render_sitemap(news: List[dict], site_url: str, updated: datetime) -> bytes:
+    """sitemap.xml: главная страница и все опубликованные новости"""
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        f"<url><loc>{escape(site_url)}/</loc><lastmod>{updated.date().isoformat()}</lastmod></url>\n",
+    ]
+    for item in news:
+        lastmod = (item.get("updated_at") or item["date"]).date().isoformat()
+        parts.append(
+            f"<url><loc>{escape(news_url(site_url, item['id']))}</loc><lastmod>{lastmod}</lastmod></url>\n"
+        )
+    parts.append("</urlset>\n")
+    return "".join(parts).encode("utf-8")
+
+
+class RenderedFeed:
+    __slots__ = ("body", "etag", "media_type")
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.etag = make_etag(body)
+        self.media_type = media_type
+
+
+class FeedCache:
+    """
+    Отрендеренные ленты и sitemap в виде готовых байтов
+
+    Перерисовываются один раз после invalidate() (запись, затронувшая
+    опубликованные новости) или по истечении ttl - это нужно, чтобы другие
+    процессы uvicorn тоже увидели изменения. Пока кэш свежий, запросы не
+    обращаются к MongoDB.
+    """
+
+    def __init__(self, ttl: float = 300.0, feed_items: int = 50):
+        self.ttl = ttl
+        self.feed_items = feed_items
+        self._feeds: Dict[str, RenderedFeed] = {}
+        self._rendered_at = 0.0
+        self._dirty = True
+        self._lock = asyncio.Lock()
+        self.renders = 0
+
+    def invalidate(self):
+        self._dirty = True
+
+    def _is_fresh(self) -> bool:
+        return not self._dirty and time.monotonic() - self._rendered_at < self.ttl
+
+    async def get(
+        self,
+        kind: str,
+        load_news: Callable[[], Awaitable[List[dict]]],
+        site_url: str
+    ) -> RenderedFeed:
+        """
+        Возвращает ленту kind ("atom", "rss", "sitemap"), перерисовывая все три при необходимости
+        """
+        if self._is_fresh():
+            return self._feeds[kind]
+
+        async with self._lock:
+            if not self._is_fresh():
+                # Сбрасываем флаг до чтения: запись во время рендера снова пометит кэш
+                self._dirty = False
+                try:
+                    news = await load_news()
+                except Exception:
+                    self._dirty = True
+                    raise
+                updated = max(
+                    (item.get("updated_at") or item["date"] for item in news),
+                    default=datetime.utcnow()
+                )
+                latest = news[:self.feed_items]
+                self._feeds = {
+                    "atom": RenderedFeed(render_atom(latest, site_url, updated), "application/atom+xml; charset=utf-8"),
+                    "rss": RenderedFeed(render_rss(latest, site_url, updated), "application/rss+xml; charset=utf-8"),
+                    "sitemap": RenderedFeed(render_sitemap(news, site_url, updated), "application/xml; charset=utf-8"),
+                }
+                self._rendered_at = time.monotonic()
+                self.renders += 1
+
+        return self._feeds[kind]
+
+    def stats(self) -> dict:
+        return {
+            "renders": self.renders,
+            "fresh": self._is_fresh(),
+            "sizes": {kind: len(feed.body) for kind, feed in self._feeds.items()},
+        }
+
+
+# Общий экземпляр: routes.news помечает его устаревшим при записи опубликованных новостей
+news_feed_cache = FeedCache(
+    ttl=float(os.getenv('FEED_CACHE_TTL_SECONDS', '300')),
+    feed_items=int(os.getenv('FEED_MAX_ITEMS', '50'))
+)
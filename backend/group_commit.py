@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, WriteError
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    __slots__ = ("collection", "items", "timer")
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.items: List[Tuple[dict, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class GroupCommitWriter:
+    """
+    Групповая запись документов: вставки, пришедшие в течение max_delay секунд,
+    пишутся одним insert_many(ordered=False)
+
+    Каждый вызывающий ждет подтверждения своей пачки и получает свой результат:
+    _id документа или исключение (WriteError для его документа, исключение
+    insert_many при сбое всей пачки). Пачка уходит раньше таймера, если набралось
+    max_batch документов. При max_delay=0 группировка отключена и insert_one
+    выполняется как обычно.
+    """
+
+    def __init__(self, max_delay: float = 0.0, max_batch: int = 100):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._batches: Dict[str, _Batch] = {}
+        self._flushing: set = set()
+        self.batches = 0
+        self.documents = 0
+        self.largest_batch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_delay > 0
+
+    async def insert_one(self, collection, document: dict) -> Any:
+        """
+        Вставляет документ (в составе пачки, если группировка включена)
+
+        Returns:
+        - _id вставленного документа
+        """
+        if not self.enabled:
+            result = await collection.insert_one(document)
+            return result.inserted_id
+
+        loop = asyncio.get_running_loop()
+        key = collection.full_name
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(collection)
+            batch.timer = loop.call_later(self.max_delay, self._schedule_flush, key, batch)
+
+        future = loop.create_future()
+        batch.items.append((document, future))
+        if len(batch.items) >= self.max_batch:
+            batch.timer.cancel()
+            self._schedule_flush(key, batch)
+
+        return await future
+
+    def _schedule_flush(self, key: str, batch: _Batch) -> None:
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: _Batch) -> None:
+        documents = [document for document, _ in batch.items]
+        errors: Dict[int, Exception] = {}
+        try:
+            await batch.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as bwe:
+            for write_error in bwe.details.get("writeErrors", []):
+                errors[write_error["index"]] = WriteError(
+                    write_error.get("errmsg", "unknown"), write_error.get("code"), write_error
+                )
+        except Exception as e:
+            logger.error(f"Group commit of {len(documents)} documents failed: {e}")
+            errors = {index: e for index in range(len(documents))}
+
+        self.batches += 1
+        self.documents += len(documents)
+        self.largest_batch = max(self.largest_batch, len(documents))
+
+        for index, (document, future) in enumerate(batch.items):
+            if future.done():
+                # Вызывающий отменен (клиент отключился), документ при этом записан
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(document.get("_id"))
+
+    async def stop(self) -> None:
+        """Записывает накопленные пачки (при остановке сервера)"""
+        for key, batch in list(self._batches.items()):
+            batch.timer.cancel()
+            self._schedule_flush(key, batch)
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_delay_ms": self.max_delay * 1000,
+            "batches": self.batches,
+            "documents": self.documents,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.documents / self.batches, 2) if self.batches else 0,
+        }
+
+
+contact_group_commit = GroupCommitWriter(
+    max_delay=float(os.getenv('CONTACT_GROUP_COMMIT_MS', '0')) / 1000,
+    max_batch=int(os.getenv('CONTACT_GROUP_COMMIT_MAX_BATCH', '100'))
+)
@@ -0,0 +1,115 @@
+import hashlib
+import os
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def _normalize(value: Any) -> Any:
+    # MongoDB хранит даты с точностью до миллисекунд
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="milliseconds")
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    return value
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Строит сильный ETag из ревизий документов (id, updated_at и т.п.)
+    """
+    digest = hashlib.blake2b(repr(_normalize(parts)).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (слабое сравнение, RFC 9110 13.1.2)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ConditionalRequest:
+    """
+    Условный GET для одного запроса, создается зависимостью ConditionalGet
+    """
+
+    def __init__(self, request: Request, response: Response, policy: "ConditionalGet"):
+        self.request = request
+        self.response = response
+        self.policy = policy
+
+    def check(self, etag: str, public: bool = True) -> Optional[Response]:
+        """
+        Проставляет ETag и Cache-Control в ответ
+
+        Returns:
+        - Response 304, если клиент уже имеет актуальную версию, иначе None
+        """
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.policy.cache_control if public else "private, no-cache",
+        }
+        if etag_matches(self.request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        self.response.headers.update(headers)
+        return None
+
+    def respond(self, etag: str, body: bytes, media_type: str = "application/json", public: bool = True) -> Response:
+        """
+        Готовый ответ из закодированного тела: 304 или 200 с ETag и Cache-Control
+        """
+        not_modified = self.check(etag, public=public)
+        if not_modified:
+            return not_modified
+        return Response(content=body, media_type=media_type, headers=dict(self.response.headers))
+
+
+class ConditionalGet:
+    """
+    Зависимость FastAPI для поддержки ETag / If-None-Match и Cache-Control
+
+    Пример:
+        news_http_cache = ConditionalGet()
+
+        @router.get("/news")
+        async def get_news(conditional: ConditionalRequest = Depends(news_http_cache)):
+            ...
+            not_modified = conditional.check(make_etag(...))
+            if not_modified:
+                return not_modified
+
+    По умолчанию значения берутся из HTTP_CACHE_MAX_AGE и
+    HTTP_CACHE_STALE_WHILE_REVALIDATE (секунды). max_age=0 (по умолчанию) - "no-cache":
+    браузер хранит копию, но проверяет ее по ETag при каждом запросе. Новости и
+    контент редактируются из админки по тем же URL, и копия с max-age вернула бы
+    админу данные до сохранения.
+    """
+
+    def __init__(self, max_age: Optional[int] = None, stale_while_revalidate: Optional[int] = None):
+        if max_age is None:
+            max_age = int(os.getenv('HTTP_CACHE_MAX_AGE', '0'))
+        if stale_while_revalidate is None:
+            stale_while_revalidate = int(os.getenv('HTTP_CACHE_STALE_WHILE_REVALIDATE', '300'))
+
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        if max_age > 0:
+            self.cache_control = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+        else:
+            self.cache_control = "public, no-cache"
+
+    def __call__(self, request: Request, response: Response) -> ConditionalRequest:
+        return ConditionalRequest(request, response, self)
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def submission_fingerprint(email: str, phone: str, comment: Optional[str]) -> str:
+    """
+    Отпечаток заявки: email без регистра, последние 10 цифр телефона
+    (8 914... и +7 914... совпадают) и комментарий без регистра и лишних пробелов
+    """
+    digits = re.sub(r"\D", "", phone)[-10:]
+    normalized_comment = " ".join((comment or "").casefold().split())
+    return "\x1f".join((email.strip().lower(), digits, normalized_comment))
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Защита от повторной отправки формы (коллекция contact_idempotency)
+
+    Перед сохранением заявки в коллекцию вставляются документы с _id
+    "key:<хэш Idempotency-Key>" и "fp:<хэш отпечатка>" и готовым ответом.
+    Уникальность _id делает проверку атомарной: повтор (двойной клик,
+    повтор запроса клиентом) получает ответ исходной заявки, не создавая
+    новую заявку и письма. Документы удаляются TTL-индексом по expires_at:
+    ключ живет key_ttl секунд, отпечаток - window секунд.
+    """
+
+    def __init__(self, key_ttl: float = 86400.0, window: float = 600.0):
+        self.key_ttl = key_ttl
+        self.window = window
+        self.replays = 0
+
+    def keys(self, idempotency_key: Optional[str], fingerprint: str) -> List[Tuple[str, float]]:
+        """Ключи для reserve(): (_id, время жизни в секундах)"""
+        keys = []
+        if idempotency_key:
+            keys.append((f"key:{_hash(idempotency_key)}", self.key_ttl))
+        keys.append((f"fp:{_hash(fingerprint)}", self.window))
+        return keys
+
+    async def _insert(self, collection, key: str, ttl: float, response: dict) -> Optional[dict]:
+        """Вставляет резерв; при конфликте возвращает сохраненный ответ"""
+        now = datetime.utcnow()
+        document = {"_id": key, "response": response, "created_at": now, "expires_at": now + timedelta(seconds=ttl)}
+        for _ in range(2):
+            try:
+                await collection.insert_one(dict(document))
+                return None
+            except DuplicateKeyError:
+                existing = await collection.find_one({"_id": key})
+                if existing is None:
+                    continue
+                if existing["expires_at"] > now:
+                    return existing["response"]
+                # Окно истекло, но TTL-монитор еще не удалил документ
+                await collection.delete_one({"_id": key, "expires_at": existing["expires_at"]})
+        return None
+
+    async def reserve(self, db, keys: List[Tuple[str, float]], response: dict) -> Optional[dict]:
+        """
+        Резервирует ключи за новой заявкой с ответом response
+
+        Returns:
+        - None, если заявка новая (ключи зарезервированы)
+        - ответ исходной заявки, если это повтор
+        """
+        collection = db.contact_idempotency
+        reserved = []
+        for key, ttl in keys:
+            original = await self._insert(collection, key, ttl, response)
+            if original is not None:
+                # Уже вставленные ключи (новый Idempotency-Key) тоже указывают на исходную заявку
+                for reserved_key in reserved:
+                    await collection.update_one({"_id": reserved_key}, {"$set": {"response": original}})
+                self.replays += 1
+                return original
+            reserved.append(key)
+        return None
+
+    async def release(self, db, keys: List[Tuple[str, float]]) -> None:
+        """Снимает резерв, если заявку сохранить не удалось (повтор должен пройти заново)"""
+        await db.contact_idempotency.delete_many({"_id": {"$in": [key for key, _ in keys]}})
+
+
+contact_idempotency = IdempotencyStore(
+    key_ttl=float(os.getenv('IDEMPOTENCY_KEY_TTL_SECONDS', '86400')),
+    window=float(os.getenv('DUPLICATE_SUBMISSION_WINDOW_SECONDS', '600'))
+)
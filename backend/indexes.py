@@ -0,0 +1,274 @@
+"""
+Реестр индексов MongoDB и проверка планов запросов
+
+Все индексы объявляются здесь рядом с формами запросов, которые они обслуживают.
+При старте сервера ensure_indexes() создает недостающие индексы параллельно
+и сообщает о расхождениях с базой.
+
+Проверка планов (для разработки):
+    python indexes.py audit          # explain() каждой формы, ошибка при COLLSCAN / SORT в памяти
+    python indexes.py ensure         # создать индексы и показать расхождения
+    python indexes.py ensure --drop-extra   # удалить индексы, которых нет в реестре
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+
+# Отправленные письма хранятся для истории столько дней, затем удаляются TTL-индексом
+EMAIL_OUTBOX_SENT_TTL = int(os.getenv('EMAIL_OUTBOX_SENT_TTL_DAYS', '7')) * 86400
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, int]]
+    options: Dict[str, Any] = {}
+
+    @property
+    def name(self) -> str:
+        return self.options.get("name") or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+class QueryShape(NamedTuple):
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+    limit: Optional[int] = None
+
+
+INDEXES: List[IndexSpec] = [
+    # routes/news.py, routes/feeds.py: опубликованные новости по (date, id)
+    IndexSpec("news", [("id", 1)], {"unique": True}),
+    IndexSpec("news", [("published", 1), ("date", -1), ("id", -1)]),
+    # routes/admin.py: все новости по (date, id)
+    IndexSpec("news", [("date", -1), ("id", -1)]),
+    # view_counter.py: популярные новости
+    IndexSpec("news", [("published", 1), ("views", -1)]),
+    IndexSpec("news", [("updated_at", -1)]),
+
+    # routes/contact.py, routes/admin.py: заявки по (created_at, id), фильтр по статусу
+    IndexSpec("contact_submissions", [("id", 1)], {"unique": True}),
+    IndexSpec("contact_submissions", [("status", 1), ("created_at", -1), ("id", -1)]),
+    IndexSpec("contact_submissions", [("created_at", -1), ("id", -1)]),
+
+    # archive.py: архив обработанных заявок, те же запросы при include_archived=true
+    IndexSpec("contact_submissions_archive", [("id", 1)], {"unique": True}),
+    IndexSpec("contact_submissions_archive", [("status", 1), ("created_at", -1), ("id", -1)]),
+    IndexSpec("contact_submissions_archive", [("created_at", -1), ("id", -1)]),
+
+    # routes/content.py
+    IndexSpec("site_content", [("type", 1)]),
+
+    # outbox.py: выборка готовых к отправке писем, список dead-писем, буфер дайджеста, очистка отправленных
+    IndexSpec("email_outbox", [("id", 1)], {"unique": True}),
+    IndexSpec("email_outbox", [("status", 1), ("next_attempt_at", 1)]),
+    IndexSpec("email_outbox", [("status", 1), ("updated_at", -1)]),
+    IndexSpec("email_outbox", [("status", 1), ("created_at", 1)]),
+    IndexSpec("email_outbox", [("sent_at", 1)], {"expireAfterSeconds": EMAIL_OUTBOX_SENT_TTL}),
+    IndexSpec("email_outbox", [("digest_id", 1), ("created_at", 1)], {"sparse": True}),
+
+    # idempotency.py: ключи повтора формы заявки живут до expires_at (_id уникален сам по себе)
+    IndexSpec("contact_idempotency", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+
+    # rate_limit.py (RATE_LIMIT_BACKEND=mongo): удаление неактивных корзин
+    IndexSpec("rate_limits", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+]
+
+_SAMPLE_DATE = datetime(2025, 1, 1)
+_SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _after_cursor(sort_field: str) -> Dict[str, Any]:
+    return {"$or": [
+        {sort_field: {"$lt": _SAMPLE_DATE}},
+        {sort_field: _SAMPLE_DATE, "id": {"$lt": _SAMPLE_ID}},
+    ]}
+
+
+QUERY_SHAPES: List[QueryShape] = [
+    QueryShape("news_public_list", "news", {"published": True}, [("date", -1), ("id", -1)], 7),
+    QueryShape(
+        "news_public_list_cursor", "news",
+        {"$and": [{"published": True}, _after_cursor("date")]}, [("date", -1), ("id", -1)], 7
+    ),
+    QueryShape("news_admin_list", "news", {}, [("date", -1), ("id", -1)], 21),
+    QueryShape("news_admin_drafts", "news", {"published": False}, [("date", -1), ("id", -1)], 21),
+    QueryShape("news_by_id", "news", {"id": _SAMPLE_ID}),
+    QueryShape("news_popular", "news", {"published": True, "views": {"$gt": 0}}, [("views", -1)], 10),
+    QueryShape("news_last_updated", "news", {}, [("updated_at", -1)], 1),
+    QueryShape("submissions_list", "contact_submissions", {}, [("created_at", -1), ("id", -1)], 21),
+    QueryShape(
+        "submissions_list_cursor", "contact_submissions",
+        _after_cursor("created_at"), [("created_at", -1), ("id", -1)], 21
+    ),
+    QueryShape(
+        "submissions_by_status", "contact_submissions",
+        {"status": "new"}, [("created_at", -1), ("id", -1)], 21
+    ),
+    QueryShape("submissions_recent", "contact_submissions", {"created_at": {"$gte": _SAMPLE_DATE}}),
+    QueryShape("submission_by_id", "contact_submissions", {"id": _SAMPLE_ID}),
+    QueryShape(
+        "submissions_archive_scan", "contact_submissions",
+        {"status": {"$in": ["processed", "replied"]}, "created_at": {"$lt": _SAMPLE_DATE}},
+        [("created_at", 1), ("id", 1)], 500
+    ),
+    QueryShape(
+        "submissions_archived_list", "contact_submissions_archive",
+        {}, [("created_at", -1), ("id", -1)], 21
+    ),
+    QueryShape(
+        "submission_rollups_range", "submission_rollups_daily",
+        {"_id": {"$gte": _SAMPLE_DATE, "$lt": _SAMPLE_DATE}}
+    ),
+    QueryShape("site_content_main", "site_content", {"type": "main"}),
+    QueryShape(
+        "email_outbox_claim", "email_outbox",
+        {"status": {"$in": ["pending", "sending"]}, "next_attempt_at": {"$lte": _SAMPLE_DATE}},
+        [("next_attempt_at", 1)], 1
+    ),
+    QueryShape("email_outbox_dead", "email_outbox", {"status": "dead"}, [("updated_at", -1)], 50),
+    QueryShape("email_outbox_digest_buffer", "email_outbox", {"status": "buffered"}, [("created_at", 1)], 20),
+    QueryShape("email_outbox_digest_claimed", "email_outbox", {"digest_id": _SAMPLE_ID, "status": "digesting"}, [("created_at", 1)]),
+]
+
+
+def _by_collection(specs: List[IndexSpec]) -> Dict[str, List[IndexSpec]]:
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        grouped.setdefault(spec.collection, []).append(spec)
+    return grouped
+
+
+async def index_drift(db, specs: List[IndexSpec] = INDEXES) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Сравнивает индексы в базе с реестром
+
+    Returns:
+    - {коллекция: {"missing": [...], "extra": [...]}} только для коллекций с расхождениями
+    """
+    drift = {}
+    for collection, collection_specs in _by_collection(specs).items():
+        existing = set()
+        async for index in db[collection].list_indexes():
+            existing.add(index["name"])
+        declared = {spec.name for spec in collection_specs}
+
+        missing = sorted(declared - existing)
+        extra = sorted(existing - declared - {"_id_"})
+        if missing or extra:
+            drift[collection] = {"missing": missing, "extra": extra}
+    return drift
+
+
+async def ensure_indexes(db, specs: List[IndexSpec] = INDEXES, drop_extra: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Создает индексы из реестра (коллекции обрабатываются параллельно)
+
+    Returns:
+    - расхождения, оставшиеся после создания (см. index_drift)
+    """
+    async def create(collection: str, collection_specs: List[IndexSpec]):
+        models = [IndexModel(spec.keys, name=spec.name, **spec.options) for spec in collection_specs]
+        await db[collection].create_indexes(models)
+
+    await asyncio.gather(*(
+        create(collection, collection_specs)
+        for collection, collection_specs in _by_collection(specs).items()
+    ))
+
+    drift = await index_drift(db, specs)
+    if drop_extra:
+        for collection, problems in drift.items():
+            for name in problems["extra"]:
+                await db[collection].drop_index(name)
+                logger.info(f"Dropped unregistered index {collection}.{name}")
+        drift = await index_drift(db, specs)
+
+    for collection, problems in drift.items():
+        if problems["extra"]:
+            logger.warning(f"Indexes not in registry on {collection}: {', '.join(problems['extra'])}")
+        if problems["missing"]:
+            logger.warning(f"Registered indexes missing on {collection}: {', '.join(problems['missing'])}")
+    return drift
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Все стадии плана выполнения (рекурсивно, включая inputStage(s) и queryPlan)"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def audit_query_plans(db, shapes: List[QueryShape] = QUERY_SHAPES) -> List[dict]:
+    """
+    Выполняет explain() для каждой формы запроса
+
+    Returns:
+    - список проблем: формы, план которых содержит COLLSCAN или SORT в памяти
+    """
+    problems = []
+    for shape in shapes:
+        find = {"find": shape.collection, "filter": shape.filter}
+        if shape.sort:
+            find["sort"] = dict(shape.sort)
+        if shape.limit:
+            find["limit"] = shape.limit
+
+        explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+        bad = sorted({stage for stage in stages if stage in ("COLLSCAN", "SORT")})
+        if bad:
+            problems.append({"query": shape.name, "collection": shape.collection, "stages": bad})
+    return problems
+
+
+async def _main(command: str, drop_extra: bool) -> int:
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        drift = await ensure_indexes(db, drop_extra=drop_extra)
+        for collection, problems in drift.items():
+            print(f"{collection}: missing={problems['missing']} extra={problems['extra']}")
+
+        if command == "ensure":
+            return 0
+
+        problems = await audit_query_plans(db)
+        for shape in QUERY_SHAPES:
+            failed = next((p for p in problems if p["query"] == shape.name), None)
+            status = f"FAIL {', '.join(failed['stages'])}" if failed else "ok"
+            print(f"{shape.collection}.{shape.name}: {status}")
+        return 1 if problems else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Индексы MongoDB центра «Силис»")
+    parser.add_argument("command", choices=["audit", "ensure"])
+    parser.add_argument("--drop-extra", action="store_true", help="удалить индексы, которых нет в реестре")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(_main(args.command, args.drop_extra)))
@@ -0,0 +1,90 @@
+"""
+Однократная миграция: очищенные версии полей (sanitized, sanitized_v) для документов,
+сохраненных до санитизации при записи или со старой версией правил
+
+Запуск из каталога backend (MONGO_URL и DB_NAME берутся из .env):
+    python migrate_sanitized.py [--batch-size 500] [--dry-run]
+
+Документы обходятся пачками по _id и обновляются одним bulk_write на пачку.
+Документ, измененный во время миграции (другой updated_at), пропускается и
+продолжает очищаться при чтении; повторный запуск его подхватит.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from archive import ARCHIVE_COLLECTION
+from security import SANITIZER_VERSION, sanitized_overlay
+
+logger = logging.getLogger(__name__)
+
+# Коллекции, которые админка читает через security.read_sanitized
+COLLECTIONS = ("contact_submissions", ARCHIVE_COLLECTION, "news")
+
+
+async def migrate_collection(collection, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """
+    Returns:
+    - {"scanned": ..., "migrated": ...}
+    """
+    stale = {"sanitized_v": {"$ne": SANITIZER_VERSION}}
+    scanned = migrated = 0
+    last_id = None
+
+    while True:
+        query = stale if last_id is None else {"$and": [stale, {"_id": {"$gt": last_id}}]}
+        docs = await collection.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+        scanned += len(docs)
+
+        requests = [
+            UpdateOne(
+                {"_id": doc["_id"], "updated_at": doc.get("updated_at")},
+                {"$set": {"sanitized": sanitized_overlay(doc), "sanitized_v": SANITIZER_VERSION}}
+            )
+            for doc in docs
+        ]
+        if dry_run:
+            migrated += len(requests)
+            continue
+        result = await collection.bulk_write(requests, ordered=False)
+        migrated += result.modified_count
+
+    return {"scanned": scanned, "migrated": migrated}
+
+
+async def migrate(db, batch_size: int = 500, dry_run: bool = False) -> dict:
+    report = {}
+    for name in COLLECTIONS:
+        report[name] = await migrate_collection(db[name], batch_size, dry_run)
+        logger.info(f"{name}: {report[name]}")
+    return report
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать документы")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        report = await migrate(client[os.environ['DB_NAME']], args.batch_size, args.dry_run)
+    finally:
+        client.close()
+    for name, counts in report.items():
+        print(f"{name}: scanned {counts['scanned']}, migrated {counts['migrated']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -108,8 +108,80 @@ class NewsResponse(BaseModel):
 
 class NewsListResponse(BaseModel):
     news: List[News]
-    total: int
+    total: Optional[int] = None  # only when include_total=true
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class NewsSummary(BaseModel):
+    """Новость в списке: только поля, запрошенные через fields="""
+    id: str
+    title: Optional[str] = None
+    excerpt: Optional[str] = None
+    content: Optional[str] = None
+    date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    published: Optional[bool] = None
+    author: Optional[str] = None
+    views: Optional[int] = None
+
+
+class NewsSummaryListResponse(BaseModel):
+    news: List[NewsSummary]
+    total: Optional[int] = None  # only when include_total=true
     has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class PopularNewsResponse(BaseModel):
+    news: List[NewsSummary]
+    updated_at: Optional[datetime] = None  # время последнего пересчета
+
+
+class NewsSearchHit(BaseModel):
+    id: str
+    title: str
+    excerpt: str
+    date: datetime
+    score: float
+    title_highlighted: str  # HTML, совпадения в <mark>
+    snippet: str  # HTML, совпадения в <mark>
+
+
+class NewsSearchResponse(BaseModel):
+    query: str
+    results: List[NewsSearchHit]
+    total: int
+
+
+# Bulk operations (admin)
+MAX_BULK_OPERATIONS = 500
+
+
+class BulkOperation(BaseModel):
+    id: str
+    action: str  # заявки: status, delete; новости: publish, unpublish, delete
+    status: Optional[str] = None  # новый статус заявки для action=status
+
+
+class BulkOperationsRequest(BaseModel):
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=MAX_BULK_OPERATIONS)
+
+
+class BulkOperationResult(BaseModel):
+    id: str
+    action: str
+    success: bool
+    error: Optional[str] = None
+
+
+class BulkOperationsResponse(BaseModel):
+    success: bool
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkOperationResult]
 
 
 class ErrorResponse(BaseModel):
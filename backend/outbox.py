@@ -0,0 +1,396 @@
+import asyncio
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from models import EmailData
+from email_service import email_service
+
+logger = logging.getLogger(__name__)
+
+# Виды писем в очереди
+ADMIN_NOTIFICATION = "admin_notification"
+CLIENT_CONFIRMATION = "client_confirmation"
+ADMIN_DIGEST = "admin_digest"
+
+# Статусы сообщений
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+# Режим дайджеста: уведомления администратору копятся и уходят одним письмом
+BUFFERED = "buffered"
+DIGESTING = "digesting"
+DIGESTED = "digested"
+
+
+class EmailOutbox:
+    """
+    Очередь исходящих писем в коллекции email_outbox
+
+    Обработчик формы только добавляет письма в очередь, отправкой занимаются
+    фоновые воркеры. Сообщение забирается атомарно через find_one_and_update
+    (status=sending, next_attempt_at = срок аренды), поэтому письма, взятые
+    упавшим процессом, после истечения аренды забирает другой воркер.
+    Ошибка отправки переносит попытку с экспоненциальной задержкой, после
+    max_attempts попыток сообщение получает статус dead и остается в коллекции
+    для разбора (см. /api/admin/email-outbox).
+
+    В режиме дайджеста (digest_enabled) уведомления администратору
+    сохраняются со статусом buffered. Когда их набирается digest_max_items
+    или самое старое ждет дольше digest_window секунд, они объединяются
+    в одно письмо admin_digest. Подтверждения клиентам уходят как обычно.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_attempts: int = 8,
+        retry_base: float = 30.0,
+        retry_max: float = 3600.0,
+        poll_interval: float = 5.0,
+        lease_seconds: float = 120.0,
+        drain_timeout: float = 10.0,
+        digest_enabled: bool = False,
+        digest_window: float = 600.0,
+        digest_max_items: int = 20,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.drain_timeout = drain_timeout
+        self.digest_enabled = digest_enabled
+        self.digest_window = digest_window
+        self.digest_max_items = digest_max_items
+        self._senders: Dict[str, Callable[[dict], Awaitable[None]]] = {}
+        self._db = None
+        self._tasks: List[asyncio.Task] = []
+        self._digest_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.digests = 0
+
+    def register(self, kind: str, sender: Callable[[dict], Awaitable[None]]) -> None:
+        """Назначает функцию отправки (принимает payload) для вида писем; она должна бросать исключение при ошибке"""
+        self._senders[kind] = sender
+
+    def retry_delay(self, attempts: int) -> float:
+        """Задержка перед следующей попыткой: retry_base * 2^(n-1), не больше retry_max, +-10%"""
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.9, 1.1)
+
+    async def enqueue(self, messages: List[tuple], submission_id: Optional[str] = None) -> List[str]:
+        """
+        Добавляет письма в очередь одной вставкой
+
+        Args:
+        - messages: список пар (вид письма, EmailData)
+        - submission_id: заявка, к которой относятся письма
+        """
+        documents = [
+            self._document(
+                kind,
+                data.dict(),
+                submission_id,
+                BUFFERED if self.digest_enabled and kind == ADMIN_NOTIFICATION else PENDING
+            )
+            for kind, data in messages
+        ]
+        await self._db.email_outbox.insert_many(documents)
+        self._wakeup.set()
+        return [document["id"] for document in documents]
+
+    @staticmethod
+    def _document(kind: str, payload: dict, submission_id: Optional[str] = None, status: str = PENDING) -> dict:
+        now = datetime.utcnow()
+        return {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "payload": payload,
+            "submission_id": submission_id,
+            "status": status,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def _complete_digest(self, digest_id: str) -> bool:
+        """
+        Создает письмо admin_digest из уведомлений, забранных в дайджест digest_id,
+        и только затем помечает их digested
+
+        Письмо создается upsert по id = digest_id, поэтому повтор после сбоя
+        между шагами не создает второе письмо. Returns: создано ли письмо сейчас
+        """
+        claimed = await self._db.email_outbox.find(
+            {"digest_id": digest_id, "status": DIGESTING}, {"_id": 0, "payload": 1}
+        ).sort("created_at", 1).to_list(length=None)
+        if not claimed:
+            return False
+
+        document = self._document(ADMIN_DIGEST, {"submissions": [item["payload"] for item in claimed]})
+        document["id"] = digest_id
+        result = await self._db.email_outbox.update_one(
+            {"id": digest_id}, {"$setOnInsert": document}, upsert=True
+        )
+
+        # sent_at: включенные в дайджест уведомления удаляются TTL-индексом вместе с отправленными
+        now = datetime.utcnow()
+        await self._db.email_outbox.update_many(
+            {"digest_id": digest_id, "status": DIGESTING},
+            {"$set": {"status": DIGESTED, "sent_at": now, "updated_at": now}}
+        )
+
+        if result.upserted_id is None:
+            return False
+        self.digests += 1
+        self._wakeup.set()
+        logger.info(f"Admin digest {digest_id} created for {len(claimed)} submissions")
+        return True
+
+    async def flush_digest(self, force: bool = False) -> int:
+        """
+        Объединяет накопленные уведомления в письма admin_digest
+
+        Пачка забирается, если в ней digest_max_items уведомлений, самое старое
+        ждет дольше digest_window или force=True. Уведомления сначала атомарно
+        переводятся в digesting с digest_id, поэтому при нескольких процессах
+        каждое попадает ровно в один дайджест. Дайджесты, оставшиеся в digesting
+        дольше lease_seconds (процесс упал до создания письма), завершаются здесь же.
+
+        Returns:
+        - количество созданных дайджестов
+        """
+        created = 0
+        stale = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        for digest_id in await self._db.email_outbox.distinct(
+            "digest_id", {"status": DIGESTING, "updated_at": {"$lte": stale}}
+        ):
+            if await self._complete_digest(digest_id):
+                created += 1
+
+        while True:
+            buffered = await self._db.email_outbox.find(
+                {"status": BUFFERED}, {"_id": 0, "id": 1, "created_at": 1}
+            ).sort("created_at", 1).limit(self.digest_max_items).to_list(length=self.digest_max_items)
+            if not buffered:
+                return created
+
+            now = datetime.utcnow()
+            window_passed = buffered[0]["created_at"] <= now - timedelta(seconds=self.digest_window)
+            if not (force or window_passed or len(buffered) >= self.digest_max_items):
+                return created
+
+            digest_id = str(uuid.uuid4())
+            ids = [item["id"] for item in buffered]
+            await self._db.email_outbox.update_many(
+                {"id": {"$in": ids}, "status": BUFFERED},
+                {"$set": {"status": DIGESTING, "digest_id": digest_id, "updated_at": now}}
+            )
+            if await self._complete_digest(digest_id):
+                created += 1
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self._db.email_outbox.find_one_and_update(
+            {"status": {"$in": [PENDING, SENDING]}, "next_attempt_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": SENDING,
+                    "next_attempt_at": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _deliver(self, message: dict) -> None:
+        try:
+            sender = self._senders[message["kind"]]
+            await sender(message["payload"])
+        except Exception as e:
+            await self._failed(message, e)
+            return
+
+        now = datetime.utcnow()
+        await self._db.email_outbox.update_one(
+            {"id": message["id"]},
+            {"$set": {"status": SENT, "sent_at": now, "updated_at": now, "last_error": None}}
+        )
+        self.sent += 1
+
+    async def _failed(self, message: dict, error: Exception) -> None:
+        now = datetime.utcnow()
+        attempts = message["attempts"]
+        update = {"last_error": f"{type(error).__name__}: {error}"[:500], "updated_at": now}
+
+        if attempts >= self.max_attempts:
+            update.update(status=DEAD, dead_at=now)
+            self.dead += 1
+            logger.error(f"Email {message['id']} ({message['kind']}) moved to dead letters after {attempts} attempts: {error}")
+        else:
+            delay = self.retry_delay(attempts)
+            update.update(status=PENDING, next_attempt_at=now + timedelta(seconds=delay))
+            self.retried += 1
+            logger.warning(f"Email {message['id']} ({message['kind']}) attempt {attempts} failed, retry in {delay:.0f}s: {error}")
+
+        await self._db.email_outbox.update_one({"id": message["id"]}, {"$set": update})
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                message = await self._claim()
+            except Exception as e:
+                logger.error(f"Email outbox claim failed: {e}")
+                message = None
+                if self._stopping:
+                    return
+
+            if message is not None:
+                try:
+                    await self._deliver(message)
+                except Exception as e:
+                    # Сообщение останется в sending и будет забрано после истечения аренды
+                    logger.error(f"Email outbox bookkeeping failed for {message['id']}: {e}")
+                continue
+
+            if self._stopping:
+                return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _digest_loop(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(min(self.digest_window / 4, self.poll_interval))
+            try:
+                await self.flush_digest()
+            except Exception as e:
+                logger.error(f"Admin digest flush failed: {e}")
+
+    async def start(self, db) -> None:
+        self._db = db
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        # Буфер хранится в базе: после перезапуска дайджест собирается из оставшихся уведомлений
+        self._digest_task = asyncio.create_task(self._digest_loop()) if self.digest_enabled else None
+
+    async def stop(self) -> None:
+        """Дожидается отправки готовых к отправке писем (не дольше drain_timeout), затем останавливает воркеры"""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        if self._digest_task is not None:
+            self._digest_task.cancel()
+            await asyncio.gather(self._digest_task, return_exceptions=True)
+            self._digest_task = None
+        _, running = await asyncio.wait(self._tasks, timeout=self.drain_timeout)
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+            logger.warning("Email outbox not fully drained on shutdown, remaining messages will be sent after restart")
+        self._tasks = []
+
+    async def counts(self) -> Dict[str, int]:
+        """Количество сообщений по статусам"""
+        counts = {PENDING: 0, SENDING: 0, SENT: 0, DEAD: 0, BUFFERED: 0, DIGESTING: 0, DIGESTED: 0}
+        async for row in self._db.email_outbox.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+    async def dead_letters(self, limit: int = 50) -> List[dict]:
+        """Последние сообщения, для которых исчерпаны попытки отправки"""
+        cursor = self._db.email_outbox.find(
+            {"status": DEAD}, {"_id": 0}
+        ).sort("updated_at", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def retry(self, message_id: str) -> bool:
+        """Возвращает dead-сообщение в очередь с обнуленным счетчиком попыток"""
+        now = datetime.utcnow()
+        result = await self._db.email_outbox.update_one(
+            {"id": message_id, "status": DEAD},
+            {"$set": {"status": PENDING, "attempts": 0, "next_attempt_at": now, "updated_at": now},
+             "$unset": {"dead_at": ""}}
+        )
+        if result.modified_count:
+            self._wakeup.set()
+        return bool(result.modified_count)
+
+    async def digest_stats(self) -> dict:
+        """Состояние буфера дайджеста для статистики админки"""
+        buffered = oldest = next_digest_at = None
+        if self.digest_enabled:
+            buffered = await self._db.email_outbox.count_documents({"status": BUFFERED})
+            first = await self._db.email_outbox.find_one(
+                {"status": BUFFERED}, {"_id": 0, "created_at": 1}, sort=[("created_at", 1)]
+            )
+            if first:
+                oldest = first["created_at"]
+                next_digest_at = oldest + timedelta(seconds=self.digest_window)
+        return {
+            "enabled": self.digest_enabled,
+            "window_seconds": self.digest_window,
+            "max_items": self.digest_max_items,
+            "buffered": buffered or 0,
+            "oldest_buffered_at": oldest,
+            "next_digest_at": next_digest_at,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead,
+            "digests": self.digests,
+        }
+
+
+email_outbox = EmailOutbox(
+    workers=int(os.getenv('EMAIL_OUTBOX_WORKERS', '2')),
+    max_attempts=int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '8')),
+    retry_base=float(os.getenv('EMAIL_OUTBOX_RETRY_BASE_SECONDS', '30')),
+    retry_max=float(os.getenv('EMAIL_OUTBOX_RETRY_MAX_SECONDS', '3600')),
+    poll_interval=float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', '5')),
+    drain_timeout=float(os.getenv('EMAIL_OUTBOX_DRAIN_SECONDS', '10')),
+    digest_enabled=os.getenv('EMAIL_DIGEST_ENABLED', 'false').lower() == 'true',
+    digest_window=float(os.getenv('EMAIL_DIGEST_WINDOW_SECONDS', '600')),
+    digest_max_items=int(os.getenv('EMAIL_DIGEST_MAX_ITEMS', '20')),
+)
+
+
+async def _send_admin_notification(payload: dict) -> None:
+    await email_service.deliver_submission_notification(EmailData(**payload))
+
+
+async def _send_client_confirmation(payload: dict) -> None:
+    await email_service.deliver_confirmation_email(EmailData(**payload))
+
+
+async def _send_admin_digest(payload: dict) -> None:
+    await email_service.deliver_digest([EmailData(**item) for item in payload["submissions"]])
+
+
+email_outbox.register(ADMIN_NOTIFICATION, _send_admin_notification)
+email_outbox.register(CLIENT_CONFIRMATION, _send_client_confirmation)
+email_outbox.register(ADMIN_DIGEST, _send_admin_digest)
@@ -0,0 +1,156 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Ключ сортировки для keyset-пагинации: (поле даты, id), оба по убыванию.
+# Соответствующие составные индексы создаются при старте сервера.
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден или подделан"""
+
+
+def encode_cursor(sort_value: datetime, doc_id: str) -> str:
+    """
+    Кодирует позицию последнего элемента страницы в непрозрачный курсор
+    """
+    payload = json.dumps([sort_value.isoformat(), doc_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Декодирует курсор, выданный encode_cursor
+
+    Raises:
+    - InvalidCursorError: если курсор поврежден или подделан
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(doc_id, str):
+            raise ValueError
+        return datetime.fromisoformat(sort_value), doc_id
+    except Exception:
+        raise InvalidCursorError("Некорректный курсор пагинации")
+
+
+def apply_cursor(query: Dict[str, Any], sort_field: str, cursor: str) -> Dict[str, Any]:
+    """
+    Добавляет к запросу условие "после курсора" для сортировки (sort_field, id) по убыванию
+    """
+    sort_value, doc_id = decode_cursor(cursor)
+    seek = {
+        "$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: sort_value, "id": {"$lt": doc_id}},
+        ]
+    }
+    if not query:
+        return seek
+    return {"$and": [query, seek]}
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], bool, Optional[str]]:
+    """
+    Получает одну страницу документов, отсортированных по (sort_field, id) по убыванию
+
+    Если передан cursor, skip игнорируется и выборка начинается сразу после курсора
+    через индекс. has_more определяется запросом limit + 1 документов, без count_documents.
+
+    Returns:
+    - (документы, has_more, next_cursor)
+    """
+    if cursor:
+        query = apply_cursor(query, sort_field, cursor)
+        skip = 0
+
+    find_cursor = collection.find(query, projection).sort([(sort_field, -1), ("id", -1)])
+    if skip:
+        find_cursor = find_cursor.skip(skip)
+    docs = await find_cursor.limit(limit + 1).to_list(length=limit + 1)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    next_cursor = None
+    if has_more and docs:
+        last = docs[-1]
+        if last.get(sort_field) is not None and last.get("id") is not None:
+            next_cursor = encode_cursor(last[sort_field], last["id"])
+
+    return docs, has_more, next_cursor
+
+
+def _sort_key(sort_field: str):
+    return lambda doc: (doc.get(sort_field) or datetime.min, doc.get("id") or "")
+
+
+async def fetch_merged_page(
+    collections: List[Any],
+    query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], bool, Optional[str]]:
+    """
+    fetch_page по нескольким коллекциям с общим порядком (например, заявки и их архив)
+
+    Из каждой коллекции берется skip + limit документов, результаты сливаются
+    по (sort_field, id). Курсор совместим с fetch_page.
+    """
+    if cursor:
+        skip = 0
+
+    docs: List[dict] = []
+    has_more = False
+    for collection in collections:
+        page, more, _ = await fetch_page(collection, query, sort_field, skip + limit, cursor=cursor, projection=projection)
+        docs.extend(page)
+        has_more = has_more or more
+
+    docs.sort(key=_sort_key(sort_field), reverse=True)
+    has_more = has_more or len(docs) > skip + limit
+    docs = docs[skip:skip + limit]
+
+    next_cursor = None
+    if has_more and docs:
+        last = docs[-1]
+        if last.get(sort_field) is not None and last.get("id") is not None:
+            next_cursor = encode_cursor(last[sort_field], last["id"])
+
+    return docs, has_more, next_cursor
+
+
+async def merge_sorted(cursors: List[Any], sort_field: str) -> AsyncIterator[dict]:
+    """
+    Сливает курсоры, отсортированные по (sort_field, id) по убыванию, в один поток
+    с тем же порядком; в памяти держится по одному документу на курсор
+    """
+    key = _sort_key(sort_field)
+    iterators = [cursor.__aiter__() for cursor in cursors]
+    heads: Dict[int, dict] = {}
+    for index, iterator in enumerate(iterators):
+        try:
+            heads[index] = await iterator.__anext__()
+        except StopAsyncIteration:
+            pass
+
+    while heads:
+        index = max(heads, key=lambda i: key(heads[i]))
+        yield heads[index]
+        try:
+            heads[index] = await iterators[index].__anext__()
+        except StopAsyncIteration:
+            del heads[index]
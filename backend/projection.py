@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, List, Optional
+
+# Поля, доступные в параметре fields= списочных эндпоинтов
+NEWS_FIELDS = (
+    "id", "title", "excerpt", "content", "date",
+    "created_at", "updated_at", "published", "author", "views",
+)
+SUBMISSION_FIELDS = (
+    "_id", "id", "name", "phone", "email", "organization", "comment", "agree",
+    "created_at", "updated_at", "ip_address", "status",
+)
+
+# Облегченные наборы полей по умолчанию: списки не отдают полный текст новости
+NEWS_SUMMARY_FIELDS = ("id", "title", "excerpt", "date", "published")
+ADMIN_NEWS_SUMMARY_FIELDS = ("id", "title", "excerpt", "date", "published", "created_at", "updated_at", "author")
+SUBMISSION_SUMMARY_FIELDS = (
+    "id", "name", "phone", "email", "organization", "comment", "status", "created_at",
+)
+
+
+class InvalidFieldsError(ValueError):
+    """В параметре fields= запрошено неизвестное поле"""
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default: Iterable[str],
+    required: Iterable[str] = ("id",),
+) -> List[str]:
+    """
+    Разбирает параметр fields=a,b,c
+
+    Поля из required (id и ключ сортировки) возвращаются всегда, т.к. нужны для пагинации.
+
+    Raises:
+    - InvalidFieldsError: если запрошено поле не из allowed
+    """
+    if not fields:
+        selected = list(default)
+    else:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in allowed]
+        if unknown:
+            raise InvalidFieldsError(
+                f"Неизвестные поля: {', '.join(unknown)}. Допустимые: {', '.join(allowed)}"
+            )
+
+    for name in required:
+        if name not in selected:
+            selected.append(name)
+
+    return list(dict.fromkeys(selected))
+
+
+def to_projection(fields: Iterable[str], sanitized: bool = False) -> Dict[str, int]:
+    """
+    Превращает список полей в projection для find(); _id исключается, если не запрошен явно
+
+    sanitized=True добавляет sanitized_v и очищенные при записи версии тех же полей
+    (для security.read_sanitized)
+    """
+    fields = list(fields)
+    projection = {name: 1 for name in fields}
+    if "_id" not in projection:
+        projection["_id"] = 0
+    if sanitized:
+        projection["sanitized_v"] = 1
+        projection.update({f"sanitized.{name}": 1 for name in fields if name != "_id"})
+    return projection
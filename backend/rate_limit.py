@@ -0,0 +1,175 @@
+import logging
+import math
+import os
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitRule(NamedTuple):
+    """Token bucket: capacity запросов подряд, затем capacity запросов за period секунд"""
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimitRule":
+        """Формат "N/секунды", например "5/600" - 5 запросов за 10 минут"""
+        capacity, period = value.split("/", 1)
+        return cls(int(capacity), float(period))
+
+
+class MemoryRateLimitBackend:
+    """
+    Корзины в памяти процесса
+
+    Количество ключей ограничено max_keys: при переполнении удаляются ключи,
+    к которым дольше всего не обращались (LRU). Каждый процесс uvicorn
+    считает запросы отдельно; для общего лимита используйте MongoRateLimitBackend.
+    """
+
+    def __init__(self, max_keys: int = 10000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def hit(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        """
+        Забирает один токен из корзины key
+
+        Returns:
+        - (разрешен ли запрос, через сколько секунд появится следующий токен)
+        """
+        now = self.clock()
+        tokens, updated = self._buckets.pop(key, (float(rule.capacity), now))
+        tokens = min(float(rule.capacity), tokens + (now - updated) * rule.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+        return allowed, 0.0 if allowed else (1 - tokens) / rule.rate
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+class MongoRateLimitBackend:
+    """
+    Общие для всех процессов корзины в коллекции rate_limits
+
+    Пополнение и списание токена выполняются одним find_one_and_update
+    с pipeline-обновлением (MongoDB 4.2+). Неактивные корзины удаляются
+    TTL-индексом по expires_at.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def hit(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [
+            rule.capacity,
+            {"$add": [{"$ifNull": ["$tokens", rule.capacity]}, {"$multiply": [elapsed, rule.rate]}]}
+        ]}
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": now + timedelta(seconds=rule.period),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        allowed = bool(bucket["allowed"])
+        return allowed, 0.0 if allowed else (1 - bucket["tokens"]) / rule.rate
+
+    def stats(self) -> dict:
+        return {"backend": "mongo"}
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов по (маршрут, IP)
+
+    Маршруты без правила не ограничиваются. Если хранилище недоступно,
+    запрос пропускается (ошибка пишется в лог), чтобы сбой лимитера
+    не блокировал форму заявки.
+    """
+
+    def __init__(self, rules: Dict[str, RateLimitRule], backend=None):
+        self.rules = rules
+        self.backend = backend or MemoryRateLimitBackend()
+        self.allowed: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.errors = 0
+
+    async def check(self, route: str, client_ip: Optional[str]) -> None:
+        """
+        Raises:
+        - HTTPException 429 с заголовком Retry-After, если лимит исчерпан
+        """
+        rule = self.rules.get(route)
+        if rule is None:
+            return
+
+        try:
+            allowed, retry_after = await self.backend.hit(f"{route}:{client_ip or 'unknown'}", rule)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Rate limit backend failed, request allowed: {e}")
+            return
+
+        if allowed:
+            self.allowed[route] += 1
+            return
+
+        self.rejected[route] += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Слишком много запросов. Попробуйте позже.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    def start(self, db) -> None:
+        """Подключает общее хранилище в MongoDB, если RATE_LIMIT_BACKEND=mongo"""
+        if os.getenv('RATE_LIMIT_BACKEND', 'memory') == 'mongo':
+            self.backend = MongoRateLimitBackend(db.rate_limits)
+
+    def stats(self) -> dict:
+        return {
+            "rules": {route: f"{rule.capacity}/{rule.period:g}s" for route, rule in self.rules.items()},
+            "allowed": dict(self.allowed),
+            "rejected": dict(self.rejected),
+            "backend_errors": self.errors,
+            **self.backend.stats(),
+        }
+
+
+rate_limiter = RateLimiter(
+    rules={
+        "contact-form": RateLimitRule.parse(os.getenv('RATE_LIMIT_CONTACT_FORM', '5/600')),
+        "admin-login": RateLimitRule.parse(os.getenv('RATE_LIMIT_ADMIN_LOGIN', '10/300')),
+    },
+    backend=MemoryRateLimitBackend(max_keys=int(os.getenv('RATE_LIMIT_MAX_KEYS', '10000')))
+)
@@ -0,0 +1,48 @@
+from typing import Iterable
+
+import orjson
+
+# Поля ответа GET /news/{news_id} (совпадают с моделью News)
+NEWS_DETAIL_FIELDS = (
+    "id", "title", "excerpt", "content", "date",
+    "created_at", "updated_at", "published", "author",
+)
+
+
+class NewsRecord:
+    """
+    Легковесное представление документа новости для быстрых ответов на чтение
+
+    Документы из базы уже прошли валидацию при записи (NewsCreate/NewsUpdate),
+    поэтому на чтении они не проверяются повторно через pydantic, а сразу
+    кодируются orjson (см. dump).
+    """
+
+    __slots__ = (
+        "id", "title", "excerpt", "content", "date",
+        "created_at", "updated_at", "published", "author", "views",
+    )
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "NewsRecord":
+        record = cls.__new__(cls)
+        date = doc.get("date")
+        record.id = doc.get("id") or str(doc.get("_id"))
+        record.title = doc.get("title")
+        record.excerpt = doc.get("excerpt")
+        record.content = doc.get("content")
+        record.date = date
+        record.created_at = doc.get("created_at", date)
+        record.updated_at = doc.get("updated_at", date)
+        record.published = doc.get("published", True)
+        record.author = doc.get("author")
+        record.views = doc.get("views")
+        return record
+
+    def to_dict(self, fields: Iterable[str] = NEWS_DETAIL_FIELDS) -> dict:
+        return {name: getattr(self, name) for name in fields}
+
+
+def dump(payload) -> bytes:
+    """Кодирует ответ в JSON (orjson: datetime в ISO 8601, как в pydantic)"""
+    return orjson.dumps(payload)
@@ -0,0 +1,156 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from archive import ARCHIVE_COLLECTION
+
+# Сводки заявок по часу и по дню создания (UTC), _id - начало корзины.
+# Поля: total, by_status.<статус>, with_organization, without_organization
+ROLLUP_COLLECTIONS = {"hour": "submission_rollups_hourly", "day": "submission_rollups_daily"}
+TIMESERIES_BUCKETS = ("hour", "day", "week", "month")
+MAX_TIMESERIES_POINTS = 1000
+BACKFILL_BATCH_SIZE = 1000
+
+
+def rollup_fields(document: dict) -> List[str]:
+    """Поля сводки, в которые попадает заявка"""
+    has_organization = bool((document.get("organization") or "").strip())
+    return [
+        "total",
+        f"by_status.{document.get('status', 'new')}",
+        "with_organization" if has_organization else "without_organization",
+    ]
+
+
+def bucket_start(moment: datetime, bucket: str) -> datetime:
+    """Начало корзины hour/day/week (с понедельника)/month, в которую попадает moment"""
+    if bucket == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start: datetime, bucket: str) -> datetime:
+    if bucket == "hour":
+        return start + timedelta(hours=1)
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _daily(hourly: Dict[datetime, Counter]) -> Dict[datetime, Counter]:
+    daily: Dict[datetime, Counter] = defaultdict(Counter)
+    for hour, counts in hourly.items():
+        daily[bucket_start(hour, "day")].update(counts)
+    return daily
+
+
+async def write_rollups(db, hourly: Dict[datetime, Counter]) -> None:
+    """Применяет изменения по часам ($inc с upsert) к часовым и дневным сводкам"""
+    for bucket, changes in (("hour", hourly), ("day", _daily(hourly))):
+        requests = []
+        for start, counts in changes.items():
+            inc = {field: value for field, value in counts.items() if value}
+            if inc:
+                requests.append(UpdateOne({"_id": start}, {"$inc": inc}, upsert=True))
+        if requests:
+            await db[ROLLUP_COLLECTIONS[bucket]].bulk_write(requests, ordered=False)
+
+
+def _empty_point(start: datetime) -> dict:
+    return {"start": start, "total": 0, "by_status": {}, "with_organization": 0, "without_organization": 0}
+
+
+async def read_timeseries(db, start: datetime, end: datetime, bucket: str) -> List[dict]:
+    """
+    Точки ряда [start, end) по сводкам, с нулями для пустых корзин
+
+    Границы выравниваются по корзинам: первая точка начинается с корзины, содержащей start.
+    Час читается из часовых сводок, день, неделя и месяц - из дневных.
+
+    Raises:
+    - ValueError: неизвестная корзина, пустой период или больше MAX_TIMESERIES_POINTS точек
+    """
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ValueError(f"Некорректная корзина. Допустимые: {', '.join(TIMESERIES_BUCKETS)}")
+    if start >= end:
+        raise ValueError("Начало периода должно быть раньше конца")
+
+    points: Dict[datetime, dict] = {}
+    current = bucket_start(start, bucket)
+    while current < end:
+        if len(points) == MAX_TIMESERIES_POINTS:
+            raise ValueError(f"Слишком много точек (больше {MAX_TIMESERIES_POINTS}), увеличьте корзину")
+        points[current] = _empty_point(current)
+        current = next_bucket(current, bucket)
+
+    source = ROLLUP_COLLECTIONS["hour" if bucket == "hour" else "day"]
+    first = bucket_start(start, bucket)
+    async for rollup in db[source].find({"_id": {"$gte": first, "$lt": end}}):
+        point = points[bucket_start(rollup["_id"], bucket)]
+        point["total"] += rollup.get("total", 0)
+        point["with_organization"] += rollup.get("with_organization", 0)
+        point["without_organization"] += rollup.get("without_organization", 0)
+        for status, count in rollup.get("by_status", {}).items():
+            point["by_status"][status] = point["by_status"].get(status, 0) + count
+
+    for point in points.values():
+        point["by_status"] = {status: count for status, count in point["by_status"].items() if count}
+    return list(points.values())
+
+
+async def _replace_rollups(collection, counts: Dict[datetime, Counter], stale: dict) -> None:
+    await collection.delete_many({**stale, "_id": {**stale.get("_id", {}), "$nin": list(counts)}})
+    requests = []
+    for start in sorted(counts):
+        document: dict = {"by_status": {}}
+        for field, value in counts[start].items():
+            if field.startswith("by_status."):
+                document["by_status"][field[len("by_status."):]] = value
+            else:
+                document[field] = value
+        requests.append(ReplaceOne({"_id": start}, document, upsert=True))
+        if len(requests) == BACKFILL_BATCH_SIZE:
+            await collection.bulk_write(requests, ordered=False)
+            requests = []
+    if requests:
+        await collection.bulk_write(requests, ordered=False)
+
+
+async def backfill(db, since: Optional[datetime] = None) -> dict:
+    """
+    Пересчитывает сводки по заявкам (горячая коллекция и архив), созданным с since (или за все время)
+
+    Сводки за период заменяются целиком, корзины без заявок удаляются.
+    Заявки, записанные во время пересчета, могут не попасть в сводку:
+    запускать при низкой нагрузке, повторный запуск исправляет расхождение.
+
+    Returns:
+    - {"submissions": ..., "hours": ..., "days": ...}
+    """
+    since_day = bucket_start(since, "day") if since else None
+    query = {"created_at": {"$gte": since_day}} if since_day else {}
+
+    hourly: Dict[datetime, Counter] = defaultdict(Counter)
+    submissions = 0
+    for name in ("contact_submissions", ARCHIVE_COLLECTION):
+        async for document in db[name].find(query, {"_id": 0, "status": 1, "organization": 1, "created_at": 1}):
+            created_at = document.get("created_at")
+            if not isinstance(created_at, datetime):
+                continue
+            hourly[bucket_start(created_at, "hour")].update(rollup_fields(document))
+            submissions += 1
+
+    stale = {"_id": {"$gte": since_day}} if since_day else {}
+    daily = _daily(hourly)
+    await _replace_rollups(db[ROLLUP_COLLECTIONS["hour"]], hourly, stale)
+    await _replace_rollups(db[ROLLUP_COLLECTIONS["day"]], daily, stale)
+    return {"submissions": submissions, "hours": len(hourly), "days": len(daily)}
@@ -1,17 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, timezone
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
 from pydantic import BaseModel
+from typing import Dict, List, Optional
 
 from security import (
     verify_admin_access, 
     hash_password,
-    sanitize_dict,
+    read_sanitized,
     validate_news_update_fields,
     SecurityMiddleware
 )
+from pagination import fetch_page, fetch_merged_page, merge_sorted, InvalidCursorError
+from archive import submission_archiver, ARCHIVE_COLLECTION
+from group_commit import contact_group_commit
+from counters import admin_counters, CounterDelta
+from rollups import read_timeseries
+from routes.news import news_cache, notify_news_written
+from feeds import news_feed_cache
+from view_counter import news_view_counter
+from outbox import email_outbox
+from rate_limit import rate_limiter
+from email_service import email_service
+from bulk_import import (
+    BulkImporter,
+    iter_lines,
+    iter_csv_rows,
+    iter_ndjson_rows,
+    news_row_to_document,
+    submission_row_to_document
+)
+from export import EXPORT_FORMATS, EXPORT_BATCH_SIZE
+from bulk_operations import BulkOperations, submission_operation, news_operation, summarize
+from models import BulkOperationsRequest, BulkOperationsResponse, News
+from records import NewsRecord
+from projection import (
+    parse_fields,
+    to_projection,
+    InvalidFieldsError,
+    NEWS_FIELDS,
+    ADMIN_NEWS_SUMMARY_FIELDS,
+    SUBMISSION_FIELDS,
+    SUBMISSION_SUMMARY_FIELDS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +78,35 @@ class AdminLoginResponse(BaseModel):
     token: str
     message: str
 
+class EmailDigestStats(BaseModel):
+    enabled: bool
+    window_seconds: float
+    max_items: int
+    buffered: int  # submissions waiting for the next digest
+    oldest_buffered_at: Optional[datetime] = None
+    next_digest_at: Optional[datetime] = None
+
 class AdminStats(BaseModel):
     total_news: int
     total_contact_submissions: int
     recent_submissions: int  # last 7 days
     published_news: int
+    submissions_by_status: Dict[str, int] = {}  # "new", "processed", "replied", with archive
+    email_digest: Optional[EmailDigestStats] = None
+
+class TimeseriesPoint(BaseModel):
+    start: datetime  # начало корзины, UTC
+    total: int
+    by_status: Dict[str, int]
+    with_organization: int
+    without_organization: int
+
+class TimeseriesResponse(BaseModel):
+    bucket: str
+    points: List[TimeseriesPoint]
 
 @admin_router.post("/admin/login", response_model=AdminLoginResponse)
-async def admin_login(login_data: AdminLogin):
+async def admin_login(login_data: AdminLogin, request: Request):
     """
     Вход в админ панель
     
@@ -60,6 +116,11 @@ async def admin_login(login_data: AdminLogin):
     Returns:
     - token: токен для авторизации (хэш пароля)
     """
+    # Ограничение попыток входа с одного IP (429 + Retry-After)
+    await SecurityMiddleware.rate_limit_check(
+        request.client.host if request.client else None, "admin-login"
+    )
+    
     try:
         # Получаем хэш пароля из переменных окружения
         admin_password_hash = os.getenv('ADMIN_PASSWORD_HASH')
@@ -91,6 +152,8 @@ async def admin_login(login_data: AdminLogin):
                 detail="Неверный пароль"
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Admin login error: {e}")
         raise HTTPException(
@@ -104,25 +167,20 @@ async def get_admin_stats(admin_verified: bool = Depends(verify_admin_access)):
     Получение статистики для админ панели
     
     Требует авторизации админа
+    
+    Счетчики читаются одним документом admin_counters (см. counters.py)
     """
     init_db()
     try:
-        # Подсчитываем статистику
-        total_news = await db.news.count_documents({})
-        published_news = await db.news.count_documents({"published": True})
-        total_submissions = await db.contact_submissions.count_documents({})
-        
-        # Подсчитываем заявки за последние 7 дней
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        recent_submissions = await db.contact_submissions.count_documents({
-            "created_at": {"$gte": seven_days_ago}
-        })
+        counters = await admin_counters.read()
         
         return AdminStats(
-            total_news=total_news,
-            total_contact_submissions=total_submissions,
-            recent_submissions=recent_submissions,
-            published_news=published_news
+            total_news=counters["news_total"],
+            total_contact_submissions=counters["submissions_total"],
+            recent_submissions=counters["recent_submissions"],
+            published_news=counters["news_published"],
+            submissions_by_status=counters["submissions_by_status"],
+            email_digest=EmailDigestStats(**await email_outbox.digest_stats())
         )
         
     except Exception as e:
@@ -132,17 +190,143 @@ async def get_admin_stats(admin_verified: bool = Depends(verify_admin_access)):
             detail="Ошибка получения статистики"
         )
 
+@admin_router.get("/admin/stats/timeseries", response_model=TimeseriesResponse)
+async def get_submissions_timeseries(
+    admin_verified: bool = Depends(verify_admin_access),
+    date_from: str = Query(None, alias="from"),
+    date_to: str = Query(None, alias="to"),
+    bucket: str = "day"
+):
+    """
+    Заявки по часам, дням, неделям или месяцам: всего, по статусам и с организацией / без
+    
+    Требует авторизации админа
+    
+    Query Parameters:
+    - from, to: YYYY-MM-DD или ISO 8601, UTC; to включает указанный день (по умолчанию последние 30 дней)
+    - bucket: hour, day (default), week или month
+    
+    Отвечает только по сводкам submission_rollups_* (см. rollups.py), без обхода заявок
+    """
+    init_db()
+    end = _parse_query_date(date_to, end=True) if date_to else datetime.utcnow()
+    start = _parse_query_date(date_from) if date_from else end - timedelta(days=30)
+    try:
+        points = await read_timeseries(db, start, end, bucket)
+        return TimeseriesResponse(bucket=bucket, points=points)
+        
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error getting submissions timeseries: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка получения статистики"
+        )
+
+@admin_router.get("/admin/cache-stats")
+async def get_cache_stats(admin_verified: bool = Depends(verify_admin_access)):
+    """
+    Счетчики кэшей новостей и лент, просмотров, ограничения частоты запросов, архивации, групповой записи заявок и пересчета статистики
+    
+    Требует авторизации админа
+    """
+    return {
+        "news": news_cache.stats(),
+        "feeds": news_feed_cache.stats(),
+        "views": news_view_counter.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "archive": submission_archiver.stats(),
+        "group_commit": contact_group_commit.stats(),
+        "admin_counters": admin_counters.stats()
+    }
+
+@admin_router.get("/admin/email-outbox")
+async def get_email_outbox(
+    limit: int = 50,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Состояние очереди писем: количество по статусам и письма, которые не удалось отправить
+    
+    Query Parameters:
+    - limit: максимальное количество dead-писем в ответе
+    
+    Требует авторизации админа
+    """
+    try:
+        return {
+            "counts": await email_outbox.counts(),
+            "workers": email_outbox.stats(),
+            "smtp": email_service.transport.stats(),
+            "dead": await email_outbox.dead_letters(min(max(limit, 1), 200))
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting email outbox: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка получения очереди писем"
+        )
+
+@admin_router.post("/admin/email-outbox/{message_id}/retry")
+async def retry_outbox_email(
+    message_id: str,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Повторная отправка письма из dead-списка
+    
+    Требует авторизации админа
+    """
+    try:
+        if not await email_outbox.retry(message_id):
+            raise HTTPException(
+                status_code=404,
+                detail="Письмо не найдено среди неотправленных"
+            )
+        
+        SecurityMiddleware.log_security_event(
+            "OUTBOX_EMAIL_RETRIED",
+            f"Outbox email {message_id} returned to queue"
+        )
+        
+        return {
+            "success": True,
+            "message": "Письмо поставлено в очередь повторно",
+            "message_id": message_id
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrying outbox email: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка повторной отправки письма"
+        )
+
 @admin_router.get("/admin/submissions")
 async def get_admin_submissions(
     admin_verified: bool = Depends(verify_admin_access),
     skip: int = 0,
     limit: int = 20,
-    status: str = None
+    status: str = None,
+    cursor: str = None,
+    include_total: bool = False,
+    fields: str = None,
+    include_archived: bool = False
 ):
     """
     Получение заявок на КП для админ панели
     
     Требует авторизации админа
+    
+    Query Parameters:
+    - cursor: курсор следующей страницы (next_cursor), заменяет skip
+    - include_total: посчитать общее количество заявок (default: false)
+    - fields: поля через запятую (default: id,name,phone,email,organization,comment,status,created_at)
+    - include_archived: искать также в архиве обработанных заявок (default: false)
     """
     init_db()
     try:
@@ -155,19 +339,37 @@ async def get_admin_submissions(
         if status and status in ["new", "processed", "replied"]:
             query["status"] = status
         
-        # Получаем заявки
-        cursor = db.contact_submissions.find(query).sort("created_at", -1)
-        submissions = await cursor.skip(skip).limit(limit).to_list(length=limit)
+        # Выбираем только нужные поля
+        selected_fields = parse_fields(
+            fields, SUBMISSION_FIELDS, SUBMISSION_SUMMARY_FIELDS, required=("id", "created_at")
+        )
+        
+        # Получаем заявки: по умолчанию только из горячей коллекции
+        collections = [db.contact_submissions]
+        if include_archived:
+            collections.append(db[ARCHIVE_COLLECTION])
+        submissions, has_more, next_cursor = await fetch_merged_page(
+            collections, query, "created_at", limit, skip=skip, cursor=cursor,
+            projection=to_projection(selected_fields, sanitized=True)
+        ) if include_archived else await fetch_page(
+            db.contact_submissions, query, "created_at", limit, skip=skip, cursor=cursor,
+            projection=to_projection(selected_fields, sanitized=True)
+        )
         
-        # Общее количество
-        total_count = await db.contact_submissions.count_documents(query)
+        # Общее количество - только по запросу
+        total_count = None
+        if include_total:
+            total_count = 0
+            for collection in collections:
+                total_count += await collection.count_documents(query)
         
         # Очищаем данные перед отправкой
         cleaned_submissions = []
         for submission in submissions:
-            submission["_id"] = str(submission["_id"])
-            # Санитизируем данные
-            cleaned_submission = sanitize_dict(submission)
+            if "_id" in submission:
+                submission["_id"] = str(submission["_id"])
+            # Санитизируем данные (очищенные при записи берутся как есть)
+            cleaned_submission = read_sanitized(submission)
             cleaned_submissions.append(cleaned_submission)
         
         return {
@@ -175,9 +377,12 @@ async def get_admin_submissions(
             "total": total_count,
             "skip": skip,
             "limit": limit,
-            "has_more": (skip + len(cleaned_submissions)) < total_count
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
         
+    except (InvalidCursorError, InvalidFieldsError) as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error getting admin submissions: {e}")
         raise HTTPException(
@@ -185,6 +390,88 @@ async def get_admin_submissions(
             detail="Ошибка получения заявок"
         )
 
+def _parse_query_date(value: str, end: bool = False) -> datetime:
+    """Дата YYYY-MM-DD или дата-время ISO 8601; для конца периода дата включает весь день"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Некорректная дата: {value} (формат YYYY-MM-DD)")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+@admin_router.get("/admin/submissions/export")
+async def export_submissions(
+    admin_verified: bool = Depends(verify_admin_access),
+    format: str = "csv",
+    status: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    fields: str = None,
+    include_archived: bool = False
+):
+    """
+    Потоковая выгрузка заявок в CSV или XLSX
+    
+    Требует авторизации админа
+    
+    Query Parameters:
+    - format: "csv" (default) или "xlsx"
+    - status: new, processed или replied
+    - date_from, date_to: период по дате заявки (YYYY-MM-DD, date_to включительно)
+    - fields: колонки через запятую (default: id,name,phone,email,organization,comment,status,created_at)
+    - include_archived: выгрузить также архив обработанных заявок (default: false)
+    
+    Строки читаются из курсора MongoDB и сразу отдаются клиенту,
+    поэтому память не зависит от количества заявок.
+    """
+    init_db()
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Поддерживаемые форматы: csv, xlsx")
+    
+    query = {}
+    if status and status in ["new", "processed", "replied"]:
+        query["status"] = status
+    created_at = {}
+    if date_from:
+        created_at["$gte"] = _parse_query_date(date_from)
+    if date_to:
+        created_at["$lt"] = _parse_query_date(date_to, end=True)
+    if created_at:
+        query["created_at"] = created_at
+    
+    try:
+        selected_fields = parse_fields(fields, SUBMISSION_FIELDS, SUBMISSION_SUMMARY_FIELDS, required=())
+    except InvalidFieldsError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    
+    collections = [db.contact_submissions]
+    if include_archived:
+        collections.append(db[ARCHIVE_COLLECTION])
+    # created_at и id нужны для слияния с архивом в общем порядке
+    projection = to_projection(list(dict.fromkeys(selected_fields + ["created_at", "id"])), sanitized=True)
+    cursors = [
+        collection.find(query, projection, batch_size=EXPORT_BATCH_SIZE).sort([("created_at", -1), ("id", -1)])
+        for collection in collections
+    ]
+    cursor = merge_sorted(cursors, "created_at") if include_archived else cursors[0]
+    
+    SecurityMiddleware.log_security_event(
+        "SUBMISSIONS_EXPORTED",
+        f"Export {format}, filters: status={status}, date_from={date_from}, date_to={date_to}, "
+        f"include_archived={include_archived}"
+    )
+    
+    iter_export, media_type = EXPORT_FORMATS[format]
+    filename = f"submissions-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        iter_export(cursor, selected_fields),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
 @admin_router.put("/admin/submissions/{submission_id}/status")
 async def update_submission_status_admin(
     submission_id: str,
@@ -192,7 +479,7 @@ async def update_submission_status_admin(
     admin_verified: bool = Depends(verify_admin_access)
 ):
     """
-    Обновление статуса заявки (админ версия)
+    Обновление статуса заявки (админ версия), в том числе архивной
     
     Требует авторизации админа
     """
@@ -210,23 +497,32 @@ async def update_submission_status_admin(
         from security import sanitize_string
         clean_submission_id = sanitize_string(submission_id, 50)
         
-        # Обновляем статус
-        result = await db.contact_submissions.update_one(
-            {"id": clean_submission_id},
-            {
-                "$set": {
-                    "status": new_status,
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+        # Обновляем статус, предыдущий нужен для счетчиков по статусам.
+        # Заявки из архива (include_archived) обновляются в архиве
+        previous = None
+        for collection in (db.contact_submissions, db[ARCHIVE_COLLECTION]):
+            previous = await collection.find_one_and_update(
+                {"id": clean_submission_id},
+                {
+                    "$set": {
+                        "status": new_status,
+                        "updated_at": datetime.utcnow()
+                    }
+                },
+                projection={"_id": 0, "status": 1, "organization": 1, "created_at": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if previous is not None:
+                break
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(
                 status_code=404,
                 detail="Заявка не найдена"
             )
         
+        await admin_counters.apply(CounterDelta().submission(previous, {**previous, "status": new_status}))
+        
         # Логируем изменение
         SecurityMiddleware.log_security_event(
             "SUBMISSION_STATUS_UPDATED",
@@ -249,17 +545,96 @@ async def update_submission_status_admin(
             detail="Ошибка обновления статуса"
         )
 
+@admin_router.post("/admin/submissions/bulk", response_model=BulkOperationsResponse)
+async def bulk_update_submissions(
+    bulk_request: BulkOperationsRequest,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Пакетные операции над заявками одним bulk_write
+    
+    Требует авторизации админа
+    
+    Body: {"operations": [{"id": "...", "action": "status", "status": "processed"}, {"id": "...", "action": "delete"}]}
+    Returns: результат по каждой операции; заявки, которых нет в горячей коллекции, ищутся в архиве
+    """
+    init_db()
+    try:
+        delta = CounterDelta()
+        bulk = BulkOperations(
+            db.contact_submissions,
+            submission_operation,
+            on_written=lambda _, before, after: delta.submission(before, after),
+            projection={"_id": 0, "id": 1, "status": 1, "organization": 1, "created_at": 1},
+            fallback=db[ARCHIVE_COLLECTION]
+        )
+        response = await bulk.run(bulk_request.operations)
+        await admin_counters.apply(delta)
+        
+        SecurityMiddleware.log_security_event("SUBMISSIONS_BULK_UPDATED", summarize(response))
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error in bulk submissions update: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка пакетного обновления заявок"
+        )
+
+@admin_router.post("/admin/news/bulk", response_model=BulkOperationsResponse)
+async def bulk_update_news(
+    bulk_request: BulkOperationsRequest,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Пакетные операции над новостями одним bulk_write
+    
+    Требует авторизации админа
+    
+    Body: {"operations": [{"id": "...", "action": "publish" | "unpublish" | "delete"}]}
+    Returns: результат по каждой операции; кэш, поиск и ленты обновляются по каждой измененной новости
+    """
+    init_db()
+    try:
+        delta = CounterDelta()
+
+        def on_written(news_id, before, after):
+            notify_news_written(news_id, before, after)
+            delta.news(before, after)
+
+        bulk = BulkOperations(db.news, news_operation, on_written=on_written)
+        response = await bulk.run(bulk_request.operations)
+        await admin_counters.apply(delta)
+        
+        SecurityMiddleware.log_security_event("NEWS_BULK_UPDATED", summarize(response))
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error in bulk news update: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка пакетного обновления новостей"
+        )
+
 @admin_router.get("/admin/news")
 async def get_admin_news(
     admin_verified: bool = Depends(verify_admin_access),
     skip: int = 0,
     limit: int = 20,
-    published: bool = None
+    published: bool = None,
+    cursor: str = None,
+    include_total: bool = False,
+    fields: str = None
 ):
     """
     Получение новостей для админ панели (включая неопубликованные)
     
     Требует авторизации админа
+    
+    Query Parameters:
+    - cursor: курсор следующей страницы (next_cursor), заменяет skip
+    - include_total: посчитать общее количество новостей (default: false)
+    - fields: поля через запятую (default: без content, полный текст - GET /api/admin/news/{news_id})
     """
     init_db()
     try:
@@ -272,27 +647,36 @@ async def get_admin_news(
         if published is not None:
             query["published"] = published
         
+        # Выбираем только нужные поля
+        selected_fields = parse_fields(
+            fields, NEWS_FIELDS, ADMIN_NEWS_SUMMARY_FIELDS, required=("id", "date")
+        )
+        
         # Получаем новости
-        cursor = db.news.find(query).sort("date", -1)
-        news_list = await cursor.skip(skip).limit(limit).to_list(length=limit)
+        news_list, has_more, next_cursor = await fetch_page(
+            db.news, query, "date", limit, skip=skip, cursor=cursor,
+            projection=to_projection(selected_fields, sanitized=True)
+        )
         
-        # Общее количество
-        total_count = await db.news.count_documents(query)
+        # Общее количество - только по запросу
+        total_count = await db.news.count_documents(query) if include_total else None
         
         # Очищаем данные
         cleaned_news = []
         for news_item in news_list:
-            news_item["_id"] = str(news_item["_id"])
-            cleaned_news.append(sanitize_dict(news_item))
+            cleaned_news.append(read_sanitized(news_item))
         
         return {
             "news": cleaned_news,
             "total": total_count,
             "skip": skip,
             "limit": limit,
-            "has_more": (skip + len(cleaned_news)) < total_count
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
         
+    except (InvalidCursorError, InvalidFieldsError) as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error getting admin news: {e}")
         raise HTTPException(
@@ -300,6 +684,155 @@ async def get_admin_news(
             detail="Ошибка получения новостей"
         )
 
+@admin_router.get("/admin/news/{news_id}", response_model=News)
+async def get_admin_news_by_id(
+    news_id: str,
+    response: Response,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Новость целиком для формы редактирования
+    
+    Требует авторизации админа
+    
+    В отличие от GET /api/news/{news_id} читает базу напрямую, не кэшируется
+    браузером (private, no-store) и не считается просмотром
+    """
+    init_db()
+    try:
+        news_item = await db.news.find_one({"id": news_id}, {"views": 0, "sanitized": 0, "sanitized_v": 0})
+        
+        if not news_item:
+            raise HTTPException(
+                status_code=404,
+                detail="Новость не найдена"
+            )
+        
+        response.headers["Cache-Control"] = "private, no-store"
+        return NewsRecord.from_document(news_item).to_dict()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching admin news by ID: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка получения новости"
+        )
+
+def _import_rows(request: Request, format: str = None):
+    """Выбирает парсер по параметру format или Content-Type"""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Поддерживаемые форматы: ndjson, csv")
+    
+    lines = iter_lines(request.stream())
+    return iter_csv_rows(lines) if format == "csv" else iter_ndjson_rows(lines)
+
+
+@admin_router.post("/admin/news/import")
+async def import_news(
+    request: Request,
+    format: str = None,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Потоковый импорт новостей из NDJSON или CSV
+    
+    Требует авторизации админа
+    
+    Query Parameters:
+    - format: "ndjson" или "csv" (по умолчанию определяется по Content-Type)
+    
+    Каждая строка проверяется моделью NewsCreate, запись идет пачками insert_many.
+    Returns: количество добавленных строк и ошибки по номерам строк
+    """
+    init_db()
+    try:
+        rows = _import_rows(request, format)
+        delta = CounterDelta()
+
+        def on_inserted(documents):
+            for document in documents:
+                notify_news_written(document["id"], None, document)
+                delta.news(None, document)
+
+        importer = BulkImporter(db.news, news_row_to_document, on_inserted=on_inserted)
+        try:
+            report = await importer.run(rows)
+        finally:
+            # Пачки, записанные до ошибки, тоже учитываются
+            await admin_counters.apply(delta)
+        
+        SecurityMiddleware.log_security_event(
+            "NEWS_IMPORTED",
+            f"Imported {report['inserted']} news, {report['failed']} rows failed"
+        )
+        return report
+        
+    except HTTPException:
+        raise
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error importing news: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка импорта новостей"
+        )
+
+@admin_router.post("/admin/submissions/import")
+async def import_submissions(
+    request: Request,
+    format: str = None,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """
+    Потоковый импорт заявок из NDJSON или CSV
+    
+    Требует авторизации админа
+    
+    Query Parameters:
+    - format: "ndjson" или "csv" (по умолчанию определяется по Content-Type)
+    
+    Каждая строка проверяется моделью ContactSubmissionCreate, дополнительно
+    принимаются колонки created_at и status. Письма при импорте не отправляются.
+    """
+    init_db()
+    try:
+        rows = _import_rows(request, format)
+        delta = CounterDelta()
+
+        def on_inserted(documents):
+            for document in documents:
+                delta.submission(None, document)
+
+        importer = BulkImporter(db.contact_submissions, submission_row_to_document, on_inserted=on_inserted)
+        try:
+            report = await importer.run(rows)
+        finally:
+            # Пачки, записанные до ошибки, тоже учитываются
+            await admin_counters.apply(delta)
+        
+        SecurityMiddleware.log_security_event(
+            "SUBMISSIONS_IMPORTED",
+            f"Imported {report['inserted']} submissions, {report['failed']} rows failed"
+        )
+        return report
+        
+    except HTTPException:
+        raise
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error importing submissions: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка импорта заявок"
+        )
+
 # Импортируем timedelta
 from datetime import timedelta
 
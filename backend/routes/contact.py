@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response, Header
+from typing import Optional
 from datetime import datetime
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
 
 from models import (
@@ -11,9 +13,13 @@ from models import (
     ErrorResponse,
     EmailData
 )
-from email_service import email_service
+from outbox import email_outbox, ADMIN_NOTIFICATION, CLIENT_CONFIRMATION
+from group_commit import contact_group_commit
+from counters import admin_counters, CounterDelta
+from idempotency import contact_idempotency, submission_fingerprint, MAX_IDEMPOTENCY_KEY_LENGTH
 from security import (
     sanitize_dict,
+    stamp_sanitized,
     validate_email,
     validate_phone,
     SecurityMiddleware,
@@ -21,6 +27,7 @@ from security import (
     MAX_COMMENT_LENGTH,
     MAX_ORGANIZATION_LENGTH
 )
+from pagination import fetch_page, InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
@@ -47,22 +54,34 @@ def init_db():
 @contact_router.post("/contact-form", response_model=ContactSubmissionResponse)
 async def submit_contact_form(
     submission: ContactSubmissionCreate,
-    request: Request
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
     Обработка заявки на коммерческое предложение
     
     - Валидирует данные формы
+    - Повтор (тот же Idempotency-Key или те же email, телефон и комментарий
+      в пределах окна) возвращает ответ исходной заявки без новой записи и писем
     - Сохраняет в базу данных
-    - Отправляет email уведомления
+    - Ставит email уведомления в очередь отправки
     - Возвращает подтверждение
     """
     init_db()  # Initialize database connection
+    
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Некорректный заголовок Idempotency-Key (от 1 до {MAX_IDEMPOTENCY_KEY_LENGTH} символов)"
+        )
+    
+    # Ограничение частоты заявок с одного IP (429 + Retry-After)
+    await SecurityMiddleware.rate_limit_check(
+        request.client.host if request.client else None, "contact-form"
+    )
+    
     try:
-        # Проверяем размер запроса
-        content_length = int(request.headers.get('content-length', 0))
-        SecurityMiddleware.validate_request_size(content_length)
-        
         # Дополнительная валидация и санитизация
         try:
             # Валидируем email
@@ -104,13 +123,36 @@ async def submit_contact_form(
             created_at=datetime.utcnow()
         )
         
-        # Save to database
-        submission_dict = submission_data.dict()
-        result = await db.contact_submissions.insert_one(submission_dict)
+        submission_response = ContactSubmissionResponse(
+            success=True,
+            message="Заявка успешно отправлена! Мы свяжемся с вами в ближайшее время.",
+            id=submission_data.id
+        )
+        
+        # Резервируем ключи повтора до записи: параллельный дубль получит этот же ответ
+        idempotency_keys = contact_idempotency.keys(
+            idempotency_key,
+            submission_fingerprint(clean_email, clean_phone, submission.comment)
+        )
+        original = await contact_idempotency.reserve(db, idempotency_keys, submission_response.dict())
+        if original is not None:
+            logger.info(f"Duplicate contact submission suppressed, original: {original['id']}")
+            response.headers["Idempotent-Replayed"] = "true"
+            return ContactSubmissionResponse(**original)
         
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Ошибка сохранения заявки")
+        # Save to database, with sanitized values for the admin panel computed once here
+        submission_dict = stamp_sanitized(submission_data.dict())
+        try:
+            # При CONTACT_GROUP_COMMIT_MS > 0 заявки из всплеска пишутся общим insert_many
+            inserted_id = await contact_group_commit.insert_one(db.contact_submissions, submission_dict)
+            if not inserted_id:
+                raise HTTPException(status_code=500, detail="Ошибка сохранения заявки")
+        except Exception:
+            # Заявка не сохранена: повтор должен обработаться заново
+            await contact_idempotency.release(db, idempotency_keys)
+            raise
         
+        await admin_counters.apply(CounterDelta().submission(None, submission_dict))
         logger.info(f"Contact submission saved: {submission_data.id}")
         
         # Prepare email data
@@ -123,25 +165,17 @@ async def submit_contact_form(
             created_at=submission_data.created_at
         )
         
-        # Send notification emails (non-blocking)
+        # Queue notification emails, outbox workers send them in the background
         try:
-            # Send notification to admin
-            admin_email_sent = await email_service.send_submission_notification(email_data)
-            
-            # Send confirmation to client
-            client_email_sent = await email_service.send_confirmation_email(email_data)
-            
-            logger.info(f"Admin email sent: {admin_email_sent}, Client email sent: {client_email_sent}")
-            
+            await email_outbox.enqueue(
+                [(ADMIN_NOTIFICATION, email_data), (CLIENT_CONFIRMATION, email_data)],
+                submission_id=submission_data.id
+            )
         except Exception as email_error:
-            # Log email error but don't fail the request
-            logger.error(f"Email sending failed: {email_error}")
+            # Log outbox error but don't fail the request
+            logger.error(f"Failed to queue emails for submission {submission_data.id}: {email_error}")
         
-        return ContactSubmissionResponse(
-            success=True,
-            message="Заявка успешно отправлена! Мы свяжемся с вами в ближайшее время.",
-            id=submission_data.id
-        )
+        return submission_response
         
     except ValueError as ve:
         # Validation errors
@@ -164,7 +198,9 @@ async def submit_contact_form(
 async def get_contact_submissions(
     skip: int = 0,
     limit: int = 50,
-    status: str = None
+    status: str = None,
+    cursor: str = None,
+    include_total: bool = False
 ):
     """
     Получение списка заявок (для админки)
@@ -173,6 +209,8 @@ async def get_contact_submissions(
     - skip: количество записей для пропуска (pagination)
     - limit: максимальное количество записей
     - status: фильтр по статусу ("new", "processed", "replied")
+    - cursor: курсор следующей страницы (next_cursor), заменяет skip
+    - include_total: посчитать общее количество заявок (default: false)
     """
     init_db()  # Initialize database connection
     try:
@@ -181,12 +219,14 @@ async def get_contact_submissions(
         if status:
             query["status"] = status
         
-        # Get submissions with pagination
-        cursor = db.contact_submissions.find(query).sort("created_at", -1)
-        submissions = await cursor.skip(skip).limit(limit).to_list(length=limit)
+        # Get submissions page sorted by (created_at, id) descending
+        submissions, has_more, next_cursor = await fetch_page(
+            db.contact_submissions, query, "created_at", limit, skip=skip, cursor=cursor,
+            projection={"sanitized": 0, "sanitized_v": 0}
+        )
         
-        # Get total count
-        total_count = await db.contact_submissions.count_documents(query)
+        # Total count is opt-in
+        total_count = await db.contact_submissions.count_documents(query) if include_total else None
         
         # Convert ObjectId to string for JSON serialization
         for submission in submissions:
@@ -197,9 +237,12 @@ async def get_contact_submissions(
             "total": total_count,
             "skip": skip,
             "limit": limit,
-            "has_more": (skip + len(submissions)) < total_count
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
         
+    except InvalidCursorError as ce:
+        raise HTTPException(status_code=400, detail=str(ce))
     except Exception as e:
         logger.error(f"Error fetching contact submissions: {e}")
         raise HTTPException(
@@ -231,23 +274,27 @@ async def update_submission_status(
                 detail=f"Некорректный статус. Допустимые значения: {', '.join(valid_statuses)}"
             )
         
-        # Update submission status
-        result = await db.contact_submissions.update_one(
+        # Update submission status, keeping the previous one for the admin counters
+        previous = await db.contact_submissions.find_one_and_update(
             {"id": submission_id},
             {
                 "$set": {
                     "status": status,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"_id": 0, "status": 1, "organization": 1, "created_at": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(
                 status_code=404,
                 detail="Заявка не найдена"
             )
         
+        await admin_counters.apply(CounterDelta().submission(previous, {**previous, "status": status}))
+        
         return {
             "success": True,
             "message": "Статус заявки обновлен",
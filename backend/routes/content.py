@@ -6,7 +6,9 @@ import os
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
-from security import verify_admin_access, sanitize_dict, sanitize_string
+from security import verify_admin_access, sanitize_dict, sanitize_string, SANITIZER_VERSION
+from http_cache import ConditionalGet, ConditionalRequest, make_etag
+from site_content import DEFAULT_CONTENT, site_content_cache
 
 logger = logging.getLogger(__name__)
 
@@ -52,93 +54,26 @@ class ContentUpdate(BaseModel):
     contacts: Optional[ContactInfo] = None
     packages: Optional[PackagesData] = None
 
-# Default content structure
-DEFAULT_CONTENT = {
-    "contacts": {
-        "email": "silisykt@mail.ru",
-        "phones": ["8 914 287 0753", "8 964 076 7660"],
-        "address": "г. Якутск, ул. Лермонтова 47, ТЦ НОРД, 4 этаж",
-        "social": {
-            "instagram": "silis_school",
-            "telegram": "https://t.me/silisschool",
-            "vk": "https://vk.com/siliscenter"
-        }
-    },
-    "packages": {
-        "b2c": [
-            {
-                "id": 1,
-                "name": "Интенсивы",
-                "description": "Быстрое погружение в язык",
-                "features": ["Групповые занятия 3 раза в неделю", "Разговорная практика", "Домашние задания", "Поддержка преподавателя"],
-                "popular": False,
-                "freeLesson": True
-            },
-            {
-                "id": 2,
-                "name": "Частные занятия", 
-                "description": "Индивидуальный подход",
-                "features": ["Персональный преподаватель", "Гибкий график", "Индивидуальная программа", "Быстрый прогресс"],
-                "popular": True,
-                "freeLesson": True
-            },
-            {
-                "id": 3,
-                "name": "Вебинары",
-                "description": "Онлайн обучение",
-                "features": ["Доступ из любой точки мира", "Записи занятий", "Интерактивные материалы", "Сертификат участника"],
-                "popular": False,
-                "freeLesson": True
-            }
-        ],
-        "b2b": [
-            {
-                "id": 1,
-                "name": "Старт",
-                "description": "Базовое сопровождение",
-                "features": ["Консультация специалиста", "Базовый перевод документов", "Email поддержка"],
-                "popular": False
-            },
-            {
-                "id": 2,
-                "name": "Стандарт",
-                "description": "Комплексное сопровождение", 
-                "features": ["Все из пакета Старт", "Деловые тренинги", "Телефонная поддержка", "Культурное консультирование"],
-                "popular": True
-            },
-            {
-                "id": 3,
-                "name": "Премиум",
-                "description": "Полное сопровождение",
-                "features": ["Все из пакета Стандарт", "Персональный менеджер", "Срочные переводы", "Выездные тренинги"],
-                "popular": False
-            }
-        ]
-    }
-}
+# Cache-Control for the public content endpoint
+content_http_cache = ConditionalGet()
 
 @content_router.get("/content")
-async def get_site_content():
+async def get_site_content(
+    conditional: ConditionalRequest = Depends(content_http_cache)
+):
     """
     Получение текущего контента сайта (контакты, пакеты)
     Доступно без авторизации для фронтенда
+    
+    Поддерживает If-None-Match: ETag строится из updated_at документа
     """
     init_db()
     try:
-        # Получаем контент из базы данных
-        content = await db.site_content.find_one({"type": "main"})
-        
-        if not content:
-            # Если контента нет, возвращаем дефолтный и сохраняем в БД
-            await db.site_content.insert_one({
-                "type": "main",
-                "data": DEFAULT_CONTENT,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            })
-            return DEFAULT_CONTENT
+        # Контент из кэша процесса (если в базе его нет, сохраняется дефолтный)
+        content = await site_content_cache.get(db)
         
-        return content.get("data", DEFAULT_CONTENT)
+        etag = make_etag("content", content.get("updated_at"))
+        return conditional.check(etag) or content.get("data", DEFAULT_CONTENT)
         
     except Exception as e:
         logger.error(f"Error fetching site content: {e}")
@@ -191,6 +126,7 @@ async def update_site_content(
             await db.site_content.insert_one({
                 "type": "main",
                 "data": current_data,
+                "sanitized_v": SANITIZER_VERSION,
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             })
@@ -201,11 +137,16 @@ async def update_site_content(
                 {
                     "$set": {
                         "data": current_data,
+                        "sanitized_v": SANITIZER_VERSION,
                         "updated_at": datetime.utcnow()
                     }
                 }
             )
         
+        # Перечитываем контент: обновляет кэш и шаблоны писем (контакты)
+        site_content_cache.invalidate()
+        await site_content_cache.get(db)
+        
         logger.info(f"Site content updated: {list(update_data.keys())}")
         
         return {
@@ -278,6 +219,9 @@ async def reset_site_content(
             "updated_at": datetime.utcnow()
         })
         
+        site_content_cache.invalidate()
+        await site_content_cache.get(db)
+        
         logger.info("Site content reset to defaults")
         
         return {
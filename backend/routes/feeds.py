@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Depends
+import logging
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+
+from feeds import news_feed_cache
+from http_cache import ConditionalGet, ConditionalRequest
+
+logger = logging.getLogger(__name__)
+
+# Create router
+feeds_router = APIRouter()
+
+# Database connection - will be initialized after env loading
+client = None
+db = None
+
+def init_db():
+    global client, db
+    if client is None:
+        from dotenv import load_dotenv
+        from pathlib import Path
+        ROOT_DIR = Path(__file__).parent.parent
+        load_dotenv(ROOT_DIR / '.env')
+        
+        mongo_url = os.environ['MONGO_URL']
+        client = AsyncIOMotorClient(mongo_url)
+        db = client[os.environ['DB_NAME']]
+
+
+# Feeds are cheap to revalidate, let proxies keep them a bit longer
+feeds_http_cache = ConditionalGet(max_age=int(os.getenv('FEED_HTTP_MAX_AGE', '300')))
+
+
+async def load_published_news():
+    """Все опубликованные новости для лент и sitemap, от новых к старым"""
+    init_db()
+    cursor = db.news.find(
+        {"published": True},
+        {"_id": 0, "id": 1, "title": 1, "excerpt": 1, "date": 1, "updated_at": 1}
+    ).sort([("date", -1), ("id", -1)])
+    return [item async for item in cursor if item.get("id")]
+
+
+async def _serve_feed(kind: str, conditional: ConditionalRequest):
+    # Адрес сайта только из настроек: по заголовку Host запроса первый же клиент,
+    # перерисовавший кэш, подставил бы свой адрес в ссылки для всех
+    site_url = os.getenv('SITE_URL', '').rstrip("/")
+    if not site_url:
+        logger.error(f"SITE_URL is not set, {kind} feed is unavailable")
+        raise HTTPException(
+            status_code=503,
+            detail="Лента недоступна: не задан адрес сайта"
+        )
+    try:
+        feed = await news_feed_cache.get(kind, load_published_news, site_url)
+        
+        return conditional.respond(feed.etag, feed.body, media_type=feed.media_type)
+        
+    except Exception as e:
+        logger.error(f"Error rendering {kind} feed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Ошибка формирования ленты"
+        )
+
+
+@feeds_router.get("/feeds/news.atom")
+async def get_news_atom(
+    conditional: ConditionalRequest = Depends(feeds_http_cache)
+):
+    """
+    Atom-лента последних опубликованных новостей
+    """
+    return await _serve_feed("atom", conditional)
+
+
+@feeds_router.get("/feeds/news.rss")
+async def get_news_rss(
+    conditional: ConditionalRequest = Depends(feeds_http_cache)
+):
+    """
+    RSS 2.0 лента последних опубликованных новостей
+    """
+    return await _serve_feed("rss", conditional)
+
+
+@feeds_router.get("/sitemap.xml")
+async def get_sitemap(
+    conditional: ConditionalRequest = Depends(feeds_http_cache)
+):
+    """
+    sitemap.xml с главной страницей и всеми опубликованными новостями
+    """
+    return await _serve_feed("sitemap", conditional)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+import asyncio
 from datetime import datetime
 from typing import List, Optional
 import logging
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
 
 from models import (
@@ -10,16 +13,36 @@ from models import (
     NewsUpdate, 
     News,
     NewsResponse,
-    NewsListResponse
+    NewsSummary,
+    NewsSummaryListResponse,
+    NewsSearchResponse,
+    PopularNewsResponse
 )
 from security import (
     sanitize_dict,
     sanitize_string,
+    stamp_sanitized,
+    sanitized_update,
     validate_news_update_fields,
     MAX_TITLE_LENGTH,
     MAX_EXCERPT_LENGTH,
     MAX_CONTENT_LENGTH
 )
+from pagination import fetch_page, InvalidCursorError
+from cache import TTLCache
+from http_cache import ConditionalGet, ConditionalRequest, make_etag
+from search import NewsSearchIndex
+from feeds import news_feed_cache
+from view_counter import news_view_counter
+from counters import admin_counters, CounterDelta
+from records import NewsRecord, dump
+from projection import (
+    parse_fields,
+    to_projection,
+    InvalidFieldsError,
+    NEWS_FIELDS,
+    NEWS_SUMMARY_FIELDS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +66,172 @@ def init_db():
         db = client[os.environ['DB_NAME']]
 
 
-@news_router.get("/news", response_model=NewsListResponse)
+# In-process cache for public news reads, values are (encoded JSON body, etag).
+# Keys: ("list", published, limit, skip, cursor, include_total, fields) and ("item", news_id)
+news_cache = TTLCache(
+    maxsize=int(os.getenv('NEWS_CACHE_MAX_ITEMS', '256')),
+    ttl=float(os.getenv('NEWS_CACHE_TTL_SECONDS', '300'))
+)
+
+
+# Cache-Control for public news reads
+news_http_cache = ConditionalGet()
+
+
+def invalidate_news_cache(news_id: Optional[str] = None, published_affected: bool = True):
+    """
+    Инвалидирует кэш новостей после записи
+
+    - news_id: сбросить карточку конкретной новости
+    - published_affected: запись затронула опубликованные новости
+      (иначе списки с published=true остаются в кэше)
+    """
+    def is_stale(key):
+        if key[0] == "item":
+            return key[1] == news_id
+        # Lists with published=false show every article
+        return published_affected or not key[1]
+
+    news_cache.invalidate(is_stale)
+
+
+async def _news_revision():
+    """
+    (количество новостей, последний updated_at): меняется при создании, удалении и любом изменении
+    """
+    latest = await db.news.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", -1)])
+    return await db.news.count_documents({}), latest.get("updated_at") if latest else None
+
+
+# invalidate_news_cache runs only in the process that handled the write, so before
+# a cache lookup every process also compares the news revision (at most once per
+# NEWS_CACHE_REVISION_CHECK_SECONDS) and drops its cache when other workers wrote
+NEWS_CACHE_REVISION_CHECK_SECONDS = float(os.getenv('NEWS_CACHE_REVISION_CHECK_SECONDS', '1'))
+_cache_revision = None
+_cache_revision_checked_at: Optional[float] = None
+
+
+async def sync_news_cache():
+    """
+    Сбрасывает кэш новостей, если ревизия новостей изменилась (запись в другом процессе)
+
+    Ошибка чтения ревизии не прерывает запрос: кэш остается до следующей проверки
+    """
+    global _cache_revision, _cache_revision_checked_at
+    now = time.monotonic()
+    if _cache_revision_checked_at is not None and now - _cache_revision_checked_at < NEWS_CACHE_REVISION_CHECK_SECONDS:
+        return
+    _cache_revision_checked_at = now
+    try:
+        revision = await _news_revision()
+    except Exception as e:
+        logger.warning(f"News revision check failed, cache kept: {e}")
+        return
+    if revision != _cache_revision:
+        news_cache.clear()
+        _cache_revision = revision
+
+
+# In-memory full-text index over published news, built at startup.
+# Writes update it only in the process that handled them, so every process
+# also rebuilds it when the news revision changes (see refresh_news_search_index)
+news_search_index = NewsSearchIndex()
+NEWS_SEARCH_REFRESH_SECONDS = float(os.getenv('NEWS_SEARCH_REFRESH_SECONDS', '60'))
+_search_revision = None
+_search_refresh_task: Optional[asyncio.Task] = None
+
+
+async def build_news_search_index():
+    """
+    Строит поисковый индекс по опубликованным новостям (при старте и при смене ревизии)
+    """
+    global _search_revision
+    init_db()
+    # Ревизия читается до документов: запись во время построения вызовет еще одно
+    revision = await _news_revision()
+    cursor = db.news.find(
+        {"published": True},
+        {"_id": 0, "id": 1, "title": 1, "excerpt": 1, "content": 1, "date": 1}
+    )
+    news_search_index.build([doc async for doc in cursor if doc.get("id")])
+    _search_revision = revision
+    logger.info(f"News search index built: {len(news_search_index)} documents")
+
+
+async def refresh_news_search_index() -> bool:
+    """
+    Перестраивает индекс, если новости менялись (в том числе другими процессами uvicorn)
+
+    Returns: был ли индекс перестроен
+    """
+    init_db()
+    if await _news_revision() == _search_revision:
+        return False
+    await build_news_search_index()
+    return True
+
+
+async def _refresh_news_search_loop():
+    while True:
+        await asyncio.sleep(NEWS_SEARCH_REFRESH_SECONDS)
+        try:
+            await refresh_news_search_index()
+        except Exception as e:
+            logger.error(f"News search index refresh failed: {e}")
+
+
+def start_news_search_refresh():
+    global _search_refresh_task
+    if NEWS_SEARCH_REFRESH_SECONDS > 0:
+        _search_refresh_task = asyncio.create_task(_refresh_news_search_loop())
+
+
+async def stop_news_search_refresh():
+    global _search_refresh_task
+    if _search_refresh_task is not None:
+        _search_refresh_task.cancel()
+        try:
+            await _search_refresh_task
+        except asyncio.CancelledError:
+            pass
+        _search_refresh_task = None
+
+
+def notify_news_written(news_id: str, before: Optional[dict], after: Optional[dict]):
+    """
+    Синхронизирует кэш, поисковый индекс и RSS/Atom/sitemap после записи новости
+
+    - before: документ до записи (None для создания)
+    - after: документ после записи (None для удаления)
+    """
+    was_published = bool(before) and before.get("published", True)
+    is_published = bool(after) and after.get("published", True)
+
+    invalidate_news_cache(news_id, published_affected=was_published or is_published)
+
+    if was_published or is_published:
+        news_feed_cache.invalidate()
+
+    if is_published:
+        news_search_index.add(after)
+    else:
+        news_search_index.remove(news_id)
+        news_view_counter.discard(news_id)
+
+
+@news_router.get(
+    "/news",
+    response_model=NewsSummaryListResponse,
+    response_model_exclude_unset=True
+)
 async def get_news(
     limit: int = 6,
     skip: int = 0,
-    published: bool = True
+    published: bool = True,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = None,
+    conditional: ConditionalRequest = Depends(news_http_cache)
 ):
     """
     Получение списка новостей
@@ -56,47 +240,54 @@ async def get_news(
     - limit: количество новостей (default: 6)
     - skip: пропустить новости (для пагинации)
     - published: показывать только опубликованные (default: true)
+    - cursor: курсор следующей страницы (next_cursor из предыдущего ответа), заменяет skip
+    - include_total: посчитать общее количество новостей (default: false)
+    - fields: поля через запятую (default: id,title,excerpt,date,published).
+      Полный текст (content) отдается только по запросу или через GET /news/{news_id}
     """
     init_db()  # Initialize database connection
     try:
+        selected_fields = parse_fields(fields, NEWS_FIELDS, NEWS_SUMMARY_FIELDS, required=("id", "date"))
+        
+        cache_key = ("list", published, limit, skip, cursor, include_total, tuple(selected_fields))
+        await sync_news_cache()
+        cached = news_cache.get(cache_key)
+        if cached is not None:
+            body, etag = cached
+            return conditional.respond(etag, body, public=published)
+        generation = news_cache.generation
+        
         # Build query filter
         query = {}
         if published:
             query["published"] = True
         
-        # Get news with pagination, sorted by date descending
-        cursor = db.news.find(query).sort("date", -1)
-        news_list = await cursor.skip(skip).limit(limit).to_list(length=limit)
-        
-        # Get total count
-        total_count = await db.news.count_documents(query)
-        
-        # Convert to News objects
-        news_objects = []
-        for news_item in news_list:
-            # Convert ObjectId to string
-            news_item["_id"] = str(news_item["_id"])
-            
-            # Ensure all required fields exist
-            news_obj = News(
-                id=news_item.get("id", str(news_item["_id"])),
-                title=news_item["title"],
-                excerpt=news_item["excerpt"],
-                content=news_item["content"],
-                date=news_item["date"],
-                created_at=news_item.get("created_at", news_item["date"]),
-                updated_at=news_item.get("updated_at", news_item["date"]),
-                published=news_item.get("published", True),
-                author=news_item.get("author")
-            )
-            news_objects.append(news_obj)
+        # Fetch only the selected fields (+ _id for legacy ids, updated_at for the ETag)
+        projection = to_projection(selected_fields + ["_id", "updated_at"])
         
-        return NewsListResponse(
-            news=news_objects,
-            total=total_count,
-            has_more=(skip + len(news_objects)) < total_count
+        # Get news page sorted by (date, id) descending
+        news_list, has_more, next_cursor = await fetch_page(
+            db.news, query, "date", limit, skip=skip, cursor=cursor, projection=projection
         )
         
+        # Total count is opt-in
+        total_count = await db.news.count_documents(query) if include_total else None
+        
+        # Documents were validated on write: encode them directly with the selected fields only
+        records = [NewsRecord.from_document(news_item) for news_item in news_list]
+        body = dump({
+            "news": [record.to_dict(selected_fields) for record in records],
+            "total": total_count,
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        })
+        
+        etag = make_etag(cache_key, [(r.id, r.updated_at) for r in records], total_count, has_more)
+        news_cache.set(cache_key, (body, etag), generation=generation)
+        return conditional.respond(etag, body, public=published)
+        
+    except (InvalidCursorError, InvalidFieldsError) as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching news: {e}")
         raise HTTPException(
@@ -105,6 +296,46 @@ async def get_news(
         )
 
 
+@news_router.get("/news/search", response_model=NewsSearchResponse)
+async def search_news(q: str, limit: int = 10):
+    """
+    Полнотекстовый поиск по опубликованным новостям
+    
+    Query Parameters:
+    - q: поисковый запрос (учитываются словоформы, якутские буквы ө, ү, һ, ҕ, ҥ и ё)
+    - limit: максимальное количество результатов (default: 10, максимум 50)
+    
+    Поиск выполняется по индексу в памяти, без запросов к базе данных
+    """
+    query = sanitize_string(q, 200)
+    limit = min(50, max(1, limit))
+    
+    results, total = news_search_index.search(query, limit)
+    
+    return NewsSearchResponse(query=query, results=results, total=total)
+
+
+@news_router.get(
+    "/news/popular",
+    response_model=PopularNewsResponse,
+    response_model_exclude_unset=True
+)
+async def get_popular_news(limit: int = 5):
+    """
+    Самые читаемые опубликованные новости
+    
+    Query Parameters:
+    - limit: количество новостей (default: 5, максимум POPULAR_NEWS_LIMIT)
+    
+    Список пересчитывается в фоне после записи просмотров, запрос не обращается к базе
+    """
+    limit = max(1, limit)
+    return PopularNewsResponse(
+        news=[NewsSummary(**item) for item in news_view_counter.popular[:limit]],
+        updated_at=news_view_counter.popular_updated_at
+    )
+
+
 @news_router.post("/news", response_model=NewsResponse)
 async def create_news(news_data: NewsCreate):
     """
@@ -138,12 +369,14 @@ async def create_news(news_data: NewsCreate):
         )
         
         # Save to database
-        news_dict = news_obj.dict()
+        news_dict = stamp_sanitized(news_obj.dict())
         result = await db.news.insert_one(news_dict)
         
         if not result.inserted_id:
             raise HTTPException(status_code=500, detail="Ошибка сохранения новости")
         
+        notify_news_written(news_obj.id, None, news_dict)
+        await admin_counters.apply(CounterDelta().news(None, news_dict))
         logger.info(f"News created: {news_obj.id}")
         
         return NewsResponse(
@@ -163,7 +396,10 @@ async def create_news(news_data: NewsCreate):
 
 
 @news_router.get("/news/{news_id}", response_model=News)
-async def get_news_by_id(news_id: str):
+async def get_news_by_id(
+    news_id: str,
+    conditional: ConditionalRequest = Depends(news_http_cache)
+):
     """
     Получение конкретной новости по ID
     
@@ -172,7 +408,17 @@ async def get_news_by_id(news_id: str):
     """
     init_db()  # Initialize database connection
     try:
-        news_item = await db.news.find_one({"id": news_id})
+        cache_key = ("item", news_id)
+        await sync_news_cache()
+        cached = news_cache.get(cache_key)
+        if cached is not None:
+            body, etag, is_published = cached
+            if is_published:
+                news_view_counter.record(news_id)
+            return conditional.respond(etag, body, public=is_published)
+        generation = news_cache.generation
+        
+        news_item = await db.news.find_one({"id": news_id}, {"views": 0, "sanitized": 0, "sanitized_v": 0})
         
         if not news_item:
             raise HTTPException(
@@ -180,23 +426,16 @@ async def get_news_by_id(news_id: str):
                 detail="Новость не найдена"
             )
         
-        # Convert ObjectId to string
-        news_item["_id"] = str(news_item["_id"])
-        
-        # Create News object
-        news_obj = News(
-            id=news_item.get("id", str(news_item["_id"])),
-            title=news_item["title"],
-            excerpt=news_item["excerpt"], 
-            content=news_item["content"],
-            date=news_item["date"],
-            created_at=news_item.get("created_at", news_item["date"]),
-            updated_at=news_item.get("updated_at", news_item["date"]),
-            published=news_item.get("published", True),
-            author=news_item.get("author")
-        )
+        # Encode the stored document directly, it was validated on write
+        record = NewsRecord.from_document(news_item)
+        body = dump(record.to_dict())
         
-        return news_obj
+        etag = make_etag(record.id, record.updated_at)
+        news_cache.set(cache_key, (body, etag, record.published), generation=generation)
+        # Views of drafts (admin preview) would count toward popularity after publishing
+        if record.published:
+            news_view_counter.record(news_id)
+        return conditional.respond(etag, body, public=record.published)
         
     except HTTPException:
         raise
@@ -240,20 +479,20 @@ async def update_news(news_id: str, news_update: NewsUpdate):
                     detail="Некорректный формат даты. Используйте YYYY-MM-DD"
                 )
         
-        # Update in database
-        result = await db.news.update_one(
+        # Update in database, keeping the previous version to invalidate precisely
+        previous_news = await db.news.find_one_and_update(
             {"id": news_id},
-            {"$set": update_data}
+            sanitized_update(update_data),
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if previous_news is None:
             raise HTTPException(
                 status_code=404,
                 detail="Новость не найдена"
             )
         
-        # Get updated news
-        updated_news = await db.news.find_one({"id": news_id})
+        updated_news = {**previous_news, **update_data}
         updated_news["_id"] = str(updated_news["_id"])
         
         news_obj = News(
@@ -268,6 +507,8 @@ async def update_news(news_id: str, news_update: NewsUpdate):
             author=updated_news.get("author")
         )
         
+        notify_news_written(news_id, previous_news, updated_news)
+        await admin_counters.apply(CounterDelta().news(previous_news, updated_news))
         logger.info(f"News updated: {news_id}")
         
         return NewsResponse(
@@ -296,14 +537,16 @@ async def delete_news(news_id: str):
     """
     init_db()  # Initialize database connection
     try:
-        result = await db.news.delete_one({"id": news_id})
+        deleted_news = await db.news.find_one_and_delete({"id": news_id})
         
-        if result.deleted_count == 0:
+        if deleted_news is None:
             raise HTTPException(
                 status_code=404,
                 detail="Новость не найдена"
             )
         
+        notify_news_written(news_id, deleted_news, None)
+        await admin_counters.apply(CounterDelta().news(deleted_news, None))
         logger.info(f"News deleted: {news_id}")
         
         return {
@@ -0,0 +1,221 @@
+import html
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Якутские буквы приводятся к ближайшим русским, чтобы запрос "ойуун"
+# находил "өйүүн" и наоборот; ё и прочая диакритика снимается через NFD.
+_YAKUT_FOLD = str.maketrans({
+    "ө": "о", "Ө": "о",
+    "ү": "у", "Ү": "у",
+    "һ": "х", "Һ": "х",
+    "ҕ": "г", "Ҕ": "г",
+    "ҥ": "н", "Ҥ": "н",
+})
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Окончания в "сложенном" виде (й -> и, ё -> е), от длинных к коротким
+_SUFFIXES = sorted({
+    # русские прилагательные, причастия
+    "ыми", "ими", "ого", "его", "ому", "ему", "ая", "яя", "ое", "ее", "ые", "ие",
+    "ыи", "ии", "ои", "ую", "юю", "ых", "их", "ым", "им", "ом", "ем",
+    # русские существительные
+    "ами", "ями", "ах", "ях", "ам", "ям", "ов", "ев", "еи", "ию", "ия", "ье", "ья",
+    "ью", "а", "я", "о", "е", "ы", "и", "у", "ю", "ь",
+    # глаголы
+    "ать", "ять", "ить", "еть", "ует", "ают", "яют", "ет", "ит", "ут", "ют", "ал", "ил", "ла", "ли", "ть",
+    # якутские множественное число и падежи
+    "лар", "лэр", "лор", "тар", "тэр", "тор", "дар", "дэр", "дор", "нар", "нэр", "нор",
+    "тан", "тэн", "дан", "дэн", "ттан", "ттэн",
+}, key=len, reverse=True)
+
+_MIN_STEM = 3
+
+_STOPWORDS = {
+    "и", "в", "во", "не", "что", "он", "на", "я", "с", "со", "как", "а", "то", "все", "она",
+    "так", "его", "но", "да", "ты", "к", "у", "же", "вы", "за", "бы", "по", "только", "ее",
+    "мне", "было", "вот", "от", "меня", "еще", "нет", "о", "из", "ему", "для", "это", "при",
+}
+
+
+def fold(text: str) -> str:
+    """
+    Нижний регистр, якутские буквы -> русские, снятие диакритики (ё -> е, й -> и)
+    """
+    text = text.lower().translate(_YAKUT_FOLD)
+    return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+def stem(token: str) -> str:
+    """
+    Облегченный стеммер: отрезает самое длинное известное окончание
+    """
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Разбивает текст на термы индекса
+    """
+    terms = []
+    for word in _WORD_RE.findall(fold(text)):
+        if word in _STOPWORDS:
+            continue
+        terms.append(stem(word))
+    return terms
+
+
+def highlight(text: str, terms: Iterable[str], width: Optional[int] = None) -> str:
+    """
+    Экранирует текст и выделяет совпадения тегом <mark>
+
+    Если передан width, возвращает фрагмент длиной ~width символов вокруг
+    первого совпадения.
+    """
+    terms = set(terms)
+    matches = [m for m in _WORD_RE.finditer(text) if stem(fold(m.group())) in terms]
+
+    start, end = 0, len(text)
+    if width is not None and len(text) > width:
+        anchor = matches[0].start() if matches else 0
+        start = max(0, anchor - width // 3)
+        end = min(len(text), start + width)
+        # Не режем слова по краям фрагмента
+        if start > 0:
+            space = text.find(" ", start)
+            start = space + 1 if 0 <= space < anchor else start
+        if end < len(text):
+            space = text.rfind(" ", start, end)
+            end = space if space > start else end
+
+    parts = ["…"] if start > 0 else []
+    position = start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+
+class NewsSearchIndex:
+    """
+    Инвертированный индекс опубликованных новостей с ранжированием BM25
+
+    Заголовок учитывается с весом TITLE_WEIGHT, краткое описание - EXCERPT_WEIGHT.
+    Индекс обновляется инкрементально через add/remove; другие процессы
+    подхватывают изменения через routes.news.refresh_news_search_index.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 3
+    EXCERPT_WEIGHT = 2
+    SNIPPET_WIDTH = 200
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._docs: Dict[str, dict] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def build(self, documents: Iterable[dict]) -> None:
+        """Полностью перестраивает индекс"""
+        fresh = NewsSearchIndex()
+        for doc in documents:
+            fresh.add(doc)
+        self.__dict__.update(fresh.__dict__)
+
+    def add(self, doc: dict) -> None:
+        """Добавляет или переиндексирует новость"""
+        doc_id = doc["id"]
+        self.remove(doc_id)
+
+        terms = Counter()
+        for term in analyze(doc.get("title", "")):
+            terms[term] += self.TITLE_WEIGHT
+        for term in analyze(doc.get("excerpt", "")):
+            terms[term] += self.EXCERPT_WEIGHT
+        terms.update(analyze(doc.get("content", "")))
+
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = terms
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        self._docs[doc_id] = {
+            "id": doc_id,
+            "title": doc.get("title", ""),
+            "excerpt": doc.get("excerpt", ""),
+            "content": doc.get("content", ""),
+            "date": doc.get("date"),
+        }
+
+    def remove(self, doc_id: str) -> None:
+        """Удаляет новость из индекса (если она там есть)"""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._docs[doc_id]
+
+    def search(self, query: str, limit: int = 10) -> Tuple[List[dict], int]:
+        """
+        Ищет новости по запросу
+
+        Returns:
+        - (список результатов со score и подсвеченными фрагментами, всего найдено)
+        """
+        query_terms = list(dict.fromkeys(analyze(query)))
+        if not query_terms or not self._docs:
+            return [], 0
+
+        n_docs = len(self._docs)
+        avg_len = self._total_len / n_docs
+        scores: Dict[str, float] = {}
+
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for doc_id, score in ranked[:limit]:
+            doc = self._docs[doc_id]
+            results.append({
+                "id": doc_id,
+                "title": doc["title"],
+                "excerpt": doc["excerpt"],
+                "date": doc["date"],
+                "score": round(score, 4),
+                "title_highlighted": highlight(doc["title"], query_terms),
+                "snippet": highlight(doc["content"] or doc["excerpt"], query_terms, self.SNIPPET_WIDTH),
+            })
+        return results, len(ranked)
@@ -1,15 +1,42 @@
 import re
 import hashlib
 import os
+from functools import lru_cache
 from typing import Any, Dict
 from fastapi import HTTPException, Depends, Header
 import logging
 
+from rate_limit import rate_limiter
+
 logger = logging.getLogger(__name__)
 
 # Admin password hash (в продакшене должен быть в переменных окружения)
 ADMIN_PASSWORD_HASH = os.getenv('ADMIN_PASSWORD_HASH', 'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')  # пустая строка для дев
 
+# Потенциально опасные подстроки для NoSQL injection и XSS, удаляются по порядку
+DANGEROUS_PATTERNS = [
+    r'\$where',
+    r'\$regex',
+    r'\$ne',
+    r'\$gt',
+    r'\$lt',
+    r'\$in',
+    r'\$nin',
+    r'javascript:',
+    r'<script',
+    r'eval\(',
+    r'function\(',
+]
+_DANGEROUS_SEQUENCE = [re.compile(pattern, re.IGNORECASE) for pattern in DANGEROUS_PATTERNS]
+# Одна проверка вместо цепочки: если ни один шаблон не найден, цепочка ничего не меняет.
+# Те же шаблоны, но каждая ветка начинается с символа без регистра ($ < : (),
+# поэтому поиск быстро пропускает обычный текст
+_DANGEROUS_ANY = re.compile(
+    r'\$(?:where|regex|ne|gt|lt|in|nin)|<script|:(?<=javascript:)|\((?<=eval\()|\((?<=function\()',
+    re.IGNORECASE
+)
+_DANGEROUS_CHARS = re.compile(r'[<>"\']')
+
 def sanitize_string(value: str, max_length: int = 1000) -> str:
     """
     Очищает строку от потенциально опасных символов
@@ -17,34 +44,38 @@ def sanitize_string(value: str, max_length: int = 1000) -> str:
     if not isinstance(value, str):
         raise ValueError("Value must be a string")
     
-    # Удаляем потенциально опасные символы для NoSQL injection
-    dangerous_patterns = [
-        r'\$where',
-        r'\$regex', 
-        r'\$ne',
-        r'\$gt',
-        r'\$lt',
-        r'\$in',
-        r'\$nin',
-        r'javascript:',
-        r'<script',
-        r'eval\(',
-        r'function\(',
-    ]
-    
     cleaned = value
-    for pattern in dangerous_patterns:
-        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+    if _DANGEROUS_ANY.search(cleaned):
+        # Удаление одного шаблона может образовать другой, поэтому порядок сохраняется
+        for pattern in _DANGEROUS_SEQUENCE:
+            cleaned = pattern.sub('', cleaned)
     
     # Ограничиваем длину
     if len(cleaned) > max_length:
         cleaned = cleaned[:max_length]
     
     # Удаляем потенциально опасные символы
-    cleaned = re.sub(r'[<>"\']', '', cleaned)
+    if '<' in cleaned or '>' in cleaned or '"' in cleaned or "'" in cleaned:
+        cleaned = _DANGEROUS_CHARS.sub('', cleaned)
     
     return cleaned.strip()
 
+@lru_cache(maxsize=1024)
+def _sanitize_key(key: str) -> str:
+    # Ключи документов повторяются от документа к документу
+    return sanitize_string(key, 100)
+
+def _sanitize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return sanitize_string(value)
+    if isinstance(value, dict):
+        return sanitize_dict(value)
+    if isinstance(value, list):
+        return [sanitize_dict(item) if isinstance(item, dict) 
+                else sanitize_string(str(item)) if isinstance(item, str)
+                else item for item in value]
+    return value
+
 def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Рекурсивно очищает словарь от опасных значений
@@ -55,21 +86,66 @@ def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
     sanitized = {}
     for key, value in data.items():
         # Очищаем ключи
-        clean_key = sanitize_string(str(key), 100)
-        
-        if isinstance(value, str):
-            sanitized[clean_key] = sanitize_string(value)
-        elif isinstance(value, dict):
-            sanitized[clean_key] = sanitize_dict(value)
-        elif isinstance(value, list):
-            sanitized[clean_key] = [sanitize_dict(item) if isinstance(item, dict) 
-                                   else sanitize_string(str(item)) if isinstance(item, str)
-                                   else item for item in value]
-        else:
-            sanitized[clean_key] = value
+        clean_key = _sanitize_key(str(key))
+        sanitized[clean_key] = _sanitize_value(value)
     
     return sanitized
 
+# Санитизация при записи.
+# Документ хранится как есть (публичный API отдает исходный текст), а очищенные
+# версии полей, которые sanitize_dict изменила бы, лежат в поле sanitized.
+# sanitized_v - версия правил; при их изменении версия увеличивается, документы
+# со старой версией очищаются при чтении, пока их не обновит migrate_sanitized.py
+SANITIZER_VERSION = 1
+_SANITIZE_META_FIELDS = ("_id", "sanitized", "sanitized_v")
+
+def sanitized_overlay(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Очищенные значения тех полей, которые sanitize_dict изменила бы
+    """
+    overlay = {}
+    for key, value in fields.items():
+        if key in _SANITIZE_META_FIELDS:
+            continue
+        clean_value = _sanitize_value(value)
+        if clean_value != value:
+            overlay[key] = clean_value
+    return overlay
+
+def stamp_sanitized(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Добавляет к новому документу sanitized и sanitized_v (перед insert)
+    """
+    document["sanitized"] = sanitized_overlay(document)
+    document["sanitized_v"] = SANITIZER_VERSION
+    return document
+
+def sanitized_update(update_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Обновление {"$set": ..., "$unset": ...} для update_data с пересчетом sanitized.<поле>
+
+    sanitized_v не меняется: документ без версии по-прежнему очищается при чтении целиком
+    """
+    overlay = sanitized_overlay(update_data)
+    update = {"$set": {**update_data, **{f"sanitized.{key}": value for key, value in overlay.items()}}}
+    unset = {f"sanitized.{key}": "" for key in update_data if key not in overlay}
+    if unset:
+        update["$unset"] = unset
+    return update
+
+def read_sanitized(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    То же, что sanitize_dict(document), но документ текущей версии не обходится рекурсивно:
+    достаточно подставить сохраненные очищенные значения
+    """
+    version = document.pop("sanitized_v", None)
+    overlay = document.pop("sanitized", None)
+    if version != SANITIZER_VERSION:
+        return sanitize_dict(document)
+    if overlay:
+        document.update(overlay)
+    return document
+
 def validate_email(email: str) -> str:
     """
     Валидация email с дополнительной защитой
@@ -146,10 +222,22 @@ class SecurityMiddleware:
             raise HTTPException(status_code=413, detail="Размер запроса превышает лимит")
     
     @staticmethod
-    def rate_limit_check(client_ip: str):
-        """Простая проверка частоты запросов (для продакшена нужен Redis)"""
-        # В простой версии не реализуем, но структура готова
-        pass
+    async def rate_limit_check(client_ip: str, route: str):
+        """
+        Проверка частоты запросов по IP для маршрута (см. rate_limit.py)
+        
+        Raises:
+        - HTTPException 429 с заголовком Retry-After
+        """
+        try:
+            await rate_limiter.check(route, client_ip)
+        except HTTPException as he:
+            SecurityMiddleware.log_security_event(
+                "RATE_LIMIT_EXCEEDED",
+                f"{route}, retry after {he.headers['Retry-After']}s",
+                client_ip
+            )
+            raise
     
     @staticmethod
     def log_security_event(event_type: str, details: str, client_ip: str = None):
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -12,9 +13,20 @@ from datetime import datetime
 
 # Import our routes
 from routes.contact import contact_router
-from routes.news import news_router
+from routes.news import news_router, build_news_search_index, start_news_search_refresh, stop_news_search_refresh
 from routes.admin import admin_router
 from routes.content import content_router
+from routes.feeds import feeds_router
+from indexes import ensure_indexes
+from view_counter import news_view_counter
+from outbox import email_outbox
+from email_service import email_service
+from site_content import site_content_cache
+from rate_limit import rate_limiter
+from archive import submission_archiver
+from group_commit import contact_group_commit
+from counters import admin_counters
+from body_limit import BodySizeLimitMiddleware, BODY_LIMITS, BODY_LIMIT_DEFAULT
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -28,7 +40,8 @@ db = client[os.environ['DB_NAME']]
 app = FastAPI(
     title="Silis Language Center API",
     description="API для центра якутского языка «Силис»",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Create a router with the /api prefix
@@ -65,10 +78,15 @@ api_router.include_router(contact_router, tags=["contact"])
 api_router.include_router(news_router, tags=["news"])
 api_router.include_router(admin_router, tags=["admin"])
 api_router.include_router(content_router, tags=["content"])
+api_router.include_router(feeds_router, tags=["feeds"])
 
 # Include the main router in the app
 app.include_router(api_router)
 
+# Request body size limits per route, enforced while the body streams in.
+# Added before CORS so that 413 responses still carry CORS headers
+app.add_middleware(BodySizeLimitMiddleware, limits=BODY_LIMITS, default=BODY_LIMIT_DEFAULT)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -89,23 +107,61 @@ logger = logging.getLogger(__name__)
 async def startup_db_client():
     logger.info("Starting Silis Language Center API")
     
-    # Create indexes for better performance
+    if not os.getenv('SITE_URL'):
+        logger.warning("SITE_URL is not set, news feeds and sitemap.xml will respond with 503")
+    
+    # Create registered indexes (see indexes.py), drift is logged as warnings
     try:
-        # Contact submissions indexes
-        await db.contact_submissions.create_index("created_at")
-        await db.contact_submissions.create_index("status")
-        await db.contact_submissions.create_index("id", unique=True)
-        
-        # News indexes
-        await db.news.create_index("date")
-        await db.news.create_index("published")
-        await db.news.create_index("id", unique=True)
-        
+        await ensure_indexes(db)
         logger.info("Database indexes created successfully")
     except Exception as e:
         logger.warning(f"Error creating indexes: {e}")
+    
+    # Build in-memory news search index
+    try:
+        await build_news_search_index()
+    except Exception as e:
+        logger.warning(f"Error building news search index: {e}")
+    # Rebuild it when other worker processes change news
+    start_news_search_refresh()
+    
+    # Start write-behind news view counter
+    await news_view_counter.start(db)
+    
+    # Load site content (public /content and contacts in email templates)
+    try:
+        await site_content_cache.start(db)
+    except Exception as e:
+        logger.warning(f"Error loading site content: {e}")
+    
+    # Shared rate limit buckets in MongoDB when RATE_LIMIT_BACKEND=mongo
+    rate_limiter.start(db)
+    
+    # Start email outbox workers
+    await email_outbox.start(db)
+    
+    # Move old processed submissions to the archive collection in the background
+    submission_archiver.start(db)
+    
+    # Admin stats counters, recounted from the collections in the background
+    admin_counters.start(db)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     logger.info("Shutting down Silis Language Center API")
+    
+    # Flush buffered news views before closing the connection
+    await news_view_counter.stop()
+    
+    await submission_archiver.stop()
+    await admin_counters.stop()
+    await stop_news_search_refresh()
+    
+    # Write contact submissions still waiting for their group commit
+    await contact_group_commit.stop()
+    
+    # Send emails that are already due before closing the connection
+    await email_outbox.stop()
+    await email_service.close()
+    
     client.close()
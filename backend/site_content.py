@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default content structure
+DEFAULT_CONTENT = {
+    "contacts": {
+        "email": "silisykt@mail.ru",
+        "phones": ["8 914 287 0753", "8 964 076 7660"],
+        "address": "г. Якутск, ул. Лермонтова 47, ТЦ НОРД, 4 этаж",
+        "social": {
+            "instagram": "silis_school",
+            "telegram": "https://t.me/silisschool",
+            "vk": "https://vk.com/siliscenter"
+        }
+    },
+    "packages": {
+        "b2c": [
+            {
+                "id": 1,
+                "name": "Интенсивы",
+                "description": "Быстрое погружение в язык",
+                "features": ["Групповые занятия 3 раза в неделю", "Разговорная практика", "Домашние задания", "Поддержка преподавателя"],
+                "popular": False,
+                "freeLesson": True
+            },
+            {
+                "id": 2,
+                "name": "Частные занятия", 
+                "description": "Индивидуальный подход",
+                "features": ["Персональный преподаватель", "Гибкий график", "Индивидуальная программа", "Быстрый прогресс"],
+                "popular": True,
+                "freeLesson": True
+            },
+            {
+                "id": 3,
+                "name": "Вебинары",
+                "description": "Онлайн обучение",
+                "features": ["Доступ из любой точки мира", "Записи занятий", "Интерактивные материалы", "Сертификат участника"],
+                "popular": False,
+                "freeLesson": True
+            }
+        ],
+        "b2b": [
+            {
+                "id": 1,
+                "name": "Старт",
+                "description": "Базовое сопровождение",
+                "features": ["Консультация специалиста", "Базовый перевод документов", "Email поддержка"],
+                "popular": False
+            },
+            {
+                "id": 2,
+                "name": "Стандарт",
+                "description": "Комплексное сопровождение", 
+                "features": ["Все из пакета Старт", "Деловые тренинги", "Телефонная поддержка", "Культурное консультирование"],
+                "popular": True
+            },
+            {
+                "id": 3,
+                "name": "Премиум",
+                "description": "Полное сопровождение",
+                "features": ["Все из пакета Стандарт", "Персональный менеджер", "Срочные переводы", "Выездные тренинги"],
+                "popular": False
+            }
+        ]
+    }
+}
+
+
+class SiteContentCache:
+    """
+    Документ контента сайта (type=main) в памяти процесса
+
+    Используется публичным GET /api/content и шаблонами писем (контакты).
+    Документ перечитывается после invalidate() (изменение контента в этом
+    процессе) или по истечении ttl (изменения, сделанные другими процессами).
+    Подписчики вызываются с новыми данными, когда меняется updated_at.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._db = None
+        self._content: Optional[dict] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._subscribers: List[Callable[[dict], None]] = []
+        self.loads = 0
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        """callback(data) вызывается при загрузке новой версии контента"""
+        self._subscribers.append(callback)
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        return self._content is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self, db=None) -> dict:
+        """
+        Возвращает документ контента; если его нет в базе, сохраняет DEFAULT_CONTENT
+        """
+        if self._is_fresh():
+            return self._content
+
+        async with self._lock:
+            if not self._is_fresh():
+                db = db if db is not None else self._db
+                content = await db.site_content.find_one({"type": "main"}, {"_id": 0})
+                if not content:
+                    now = datetime.utcnow()
+                    content = {
+                        "type": "main",
+                        "data": DEFAULT_CONTENT,
+                        "created_at": now,
+                        "updated_at": now
+                    }
+                    await db.site_content.insert_one(dict(content))
+
+                changed = self._content is None or self._content.get("updated_at") != content.get("updated_at")
+                self._content = content
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+                if changed:
+                    for callback in self._subscribers:
+                        try:
+                            callback(content.get("data", DEFAULT_CONTENT))
+                        except Exception as e:
+                            logger.error(f"Site content subscriber failed: {e}")
+
+        return self._content
+
+    async def refresh(self) -> None:
+        """Перечитывает контент, если истек ttl (для фоновых задач, например отправки писем)"""
+        if self._db is not None and not self._is_fresh():
+            await self.get()
+
+    async def start(self, db) -> None:
+        """Запоминает базу для фоновых читателей (письма) и загружает контент"""
+        self._db = db
+        await self.get(db)
+
+
+site_content_cache = SiteContentCache(ttl=float(os.getenv('CONTENT_CACHE_TTL_SECONDS', '60')))
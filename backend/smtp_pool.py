@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+import aiosmtplib
+
+from email_templates import EncodedEmail
+
+logger = logging.getLogger(__name__)
+
+
+class _Connection:
+    __slots__ = ("smtp", "last_used", "sent")
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+class SMTPPool:
+    """
+    Пул постоянных авторизованных SMTP соединений (aiosmtplib)
+
+    Соединение открывается (TLS/STARTTLS + login) один раз и переиспользуется
+    для следующих писем. Перед выдачей соединения, простаивавшего дольше
+    health_check_after секунд, выполняется NOOP; разорванное соединение
+    закрывается и открывается заново. Если сервер разорвал соединение во время
+    отправки, письмо один раз повторяется на новом соединении.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        size: int = 2,
+        timeout: float = 30.0,
+        require_tls: bool = True,
+        health_check_after: float = 30.0,
+        max_messages_per_connection: int = 100,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.require_tls = require_tls
+        self.health_check_after = health_check_after
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle: List[_Connection] = []
+        self._open = 0
+        self._available: Optional[asyncio.Condition] = None
+        self.connects = 0
+        self.reconnects = 0
+        self.sent = 0
+
+    def _condition(self) -> asyncio.Condition:
+        # Создается при первом использовании, внутри работающего event loop
+        if self._available is None:
+            self._available = asyncio.Condition()
+        return self._available
+
+    async def _connect(self) -> _Connection:
+        use_tls = self.port == 465
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            timeout=self.timeout,
+            use_tls=use_tls,
+            # STARTTLS обязателен, если не отключен явно (например, для локального SMTP в разработке)
+            start_tls=None if use_tls or not self.require_tls else True,
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password)
+        self.connects += 1
+        return _Connection(smtp)
+
+    @staticmethod
+    async def _close(connection: _Connection) -> None:
+        try:
+            if connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
+
+    async def _is_healthy(self, connection: _Connection) -> bool:
+        if not connection.smtp.is_connected:
+            return False
+        if connection.sent >= self.max_messages_per_connection:
+            return False
+        if time.monotonic() - connection.last_used < self.health_check_after:
+            return True
+        try:
+            await connection.smtp.noop()
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self) -> _Connection:
+        available = self._condition()
+        async with available:
+            while not self._idle and self._open >= self.size:
+                await available.wait()
+            if self._idle:
+                connection = self._idle.pop()
+            else:
+                connection = None
+                self._open += 1
+
+        if connection is not None:
+            if await self._is_healthy(connection):
+                return connection
+            await self._close(connection)
+            self.reconnects += 1
+
+        try:
+            return await self._connect()
+        except Exception:
+            await self._release(None)
+            raise
+
+    async def _release(self, connection: Optional[_Connection]) -> None:
+        available = self._condition()
+        async with available:
+            if connection is None:
+                self._open -= 1
+            else:
+                connection.last_used = time.monotonic()
+                self._idle.append(connection)
+            available.notify()
+
+    async def send(self, msg) -> None:
+        """
+        Отправляет письмо через соединение из пула; при ошибке бросает исключение
+
+        msg - EncodedEmail (готовые байты) или email.message.Message
+        """
+        connection = await self._acquire()
+        try:
+            try:
+                await self._send(connection, msg)
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as e:
+                # Сервер закрыл простаивающее соединение: повторяем на новом
+                logger.warning(f"SMTP connection to {self.host} dropped ({e}), reconnecting")
+                connection.smtp.close()
+                self.reconnects += 1
+                connection = await self._connect()
+                await self._send(connection, msg)
+        except Exception:
+            if connection is not None:
+                await self._close(connection)
+            await self._release(None)
+            raise
+
+        connection.sent += 1
+        self.sent += 1
+        await self._release(connection)
+
+    @staticmethod
+    async def _send(connection: _Connection, msg) -> None:
+        if isinstance(msg, EncodedEmail):
+            await connection.smtp.sendmail(msg.sender, [msg.to], msg.data)
+        else:
+            await connection.smtp.send_message(msg)
+
+    async def close(self) -> None:
+        """Закрывает свободные соединения пула (при остановке сервера, после остановки воркеров очереди)"""
+        idle, self._idle = self._idle, []
+        self._open -= len(idle)
+        await asyncio.gather(*(self._close(connection) for connection in idle))
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": self._open,
+            "idle": len(self._idle),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "sent": self.sent,
+        }
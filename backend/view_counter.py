@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Буферизованный счетчик просмотров новостей (write-behind)
+
+    Просмотры копятся в памяти и раз в flush_interval секунд записываются
+    одним bulk_write из $inc. После записи пересчитывается список популярных
+    новостей, который отдается без обращения к базе.
+    """
+
+    def __init__(self, flush_interval: float = 10.0, top_n: int = 10):
+        self.flush_interval = flush_interval
+        self.top_n = top_n
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._db = None
+        self.popular: List[dict] = []
+        self.popular_updated_at: Optional[datetime] = None
+        self.flushed_views = 0
+
+    def record(self, news_id: str) -> None:
+        """Учитывает один просмотр (без обращения к базе)"""
+        self._pending[news_id] += 1
+
+    def discard(self, news_id: str) -> None:
+        """Убирает новость из списка популярных (снята с публикации или удалена)"""
+        self.popular = [item for item in self.popular if item["id"] != news_id]
+
+    async def flush(self) -> int:
+        """Записывает накопленные просмотры; при ошибке возвращает их в буфер"""
+        if not self._pending or self._db is None:
+            return 0
+
+        pending, self._pending = self._pending, Counter()
+        operations = [
+            UpdateOne({"id": news_id}, {"$inc": {"views": count}})
+            for news_id, count in pending.items()
+        ]
+        try:
+            await self._db.news.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to flush news views: {e}")
+            self._pending.update(pending)
+            return 0
+
+        total = sum(pending.values())
+        self.flushed_views += total
+        return total
+
+    async def refresh_popular(self) -> None:
+        """Пересчитывает топ-N опубликованных новостей по просмотрам"""
+        cursor = self._db.news.find(
+            {"published": True, "views": {"$gt": 0}},
+            {"_id": 0, "id": 1, "title": 1, "excerpt": 1, "date": 1, "views": 1}
+        ).sort("views", -1).limit(self.top_n)
+        self.popular = await cursor.to_list(length=self.top_n)
+        self.popular_updated_at = datetime.utcnow()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                if await self.flush() or self.popular_updated_at is None:
+                    await self.refresh_popular()
+            except Exception as e:
+                logger.error(f"View counter cycle failed: {e}")
+
+    async def start(self, db) -> None:
+        self._db = db
+        try:
+            await self.refresh_popular()
+        except Exception as e:
+            logger.warning(f"Error loading popular news: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу и записывает оставшиеся просмотры"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_news": len(self._pending),
+            "pending_views": sum(self._pending.values()),
+            "flushed_views": self.flushed_views,
+            "popular_updated_at": self.popular_updated_at,
+        }
+
+
+news_view_counter = ViewCounter(
+    flush_interval=float(os.getenv('VIEW_COUNTER_FLUSH_SECONDS', '10')),
+    top_n=int(os.getenv('POPULAR_NEWS_LIMIT', '10'))
+)
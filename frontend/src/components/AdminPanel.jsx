@@ -583,6 +583,19 @@ const NewsTab = () => {
     fetchNews();
   }, []);
 
+  const handleEdit = async (item) => {
+    try {
+      // The admin list omits the full text, load the whole article for editing
+      // from the uncached admin endpoint so a just-saved article is never stale
+      const response = await axios.get(`${API}/admin/news/${item.id}`);
+      setEditingNews(response.data);
+      setShowForm(true);
+    } catch (error) {
+      console.error('Error fetching news:', error);
+      alert('Ошибка загрузки новости');
+    }
+  };
+
   const handleDelete = async (newsId) => {
     if (window.confirm('Вы уверены, что хотите удалить эту новость?')) {
       try {
@@ -637,10 +650,7 @@ const NewsTab = () => {
                 </div>
                 <div className="flex items-center space-x-2 ml-4">
                   <button
-                    onClick={() => {
-                      setEditingNews(item);
-                      setShowForm(true);
-                    }}
+                    onClick={() => handleEdit(item)}
                     className="p-2 text-gray-600 hover:text-[#0E3F2B] transition-colors"
                   >
                     <Edit size={16} />
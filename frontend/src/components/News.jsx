@@ -37,16 +37,41 @@ const News = () => {
     fetchNews();
   }, []);
 
+  // Feed and sitemap links point to /?news=<id>#news, open that article
+  useEffect(() => {
+    const newsId = new URLSearchParams(window.location.search).get('news');
+    if (!newsId) return;
+    axios.get(`${API}/news/${encodeURIComponent(newsId)}`)
+      .then((response) => setSelectedNews(response.data))
+      .catch((error) => console.error('Error fetching linked news article:', error));
+  }, []);
+
   // Show only 6 latest news by default
   const visibleNews = showAllNews ? news : news.slice(0, 6);
   const hasMoreNews = news.length > 6;
 
-  const openNewsModal = (article) => {
+  const openNewsModal = async (article) => {
     setSelectedNews(article);
+    // List responses don't include the full text, load it on demand
+    if (article.content === undefined) {
+      try {
+        const response = await axios.get(`${API}/news/${article.id}`);
+        setSelectedNews(response.data);
+      } catch (error) {
+        console.error('Error fetching news article:', error);
+      }
+    }
   };
 
   const closeNewsModal = () => {
     setSelectedNews(null);
+    // Drop the deep link so a reload doesn't reopen the article
+    const params = new URLSearchParams(window.location.search);
+    if (params.has('news')) {
+      params.delete('news');
+      const query = params.toString();
+      window.history.replaceState(null, '', `${window.location.pathname}${query ? `?${query}` : ''}${window.location.hash}`);
+    }
   };
 
   const handleAddNews = async (e) => {
@@ -218,7 +243,7 @@ const News = () => {
                 
                 <div className="prose prose-lg max-w-none">
                   <p className="text-[#333333] leading-relaxed text-lg whitespace-pre-line">
-                    {selectedNews.content}
+                    {selectedNews.content ?? selectedNews.excerpt}
                   </p>
                 </div>
                 
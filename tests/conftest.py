@@ -0,0 +1,53 @@
+import asyncio
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Модули backend импортируются так же, как при запуске uvicorn из каталога backend
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture
+def db():
+    """Отдельная база MongoDB в памяти (mongomock) на каждый тест"""
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient()["test"]
+
+
+def news_document(news_id: str, title: str, published: bool = True) -> dict:
+    moment = datetime(2025, 3, 1, 9, 0)
+    return {
+        "id": news_id,
+        "title": title,
+        "excerpt": "Кратко",
+        "content": "Текст",
+        "date": moment,
+        "created_at": moment,
+        "updated_at": moment,
+        "published": published,
+    }
+
+
+@pytest.fixture
+def news_client(db, monkeypatch):
+    """Маршруты новостей на базе db с пустым кэшем и опубликованной новостью n1"""
+    import routes.news as news_routes
+    from view_counter import news_view_counter
+
+    monkeypatch.setattr(news_routes, "client", object())
+    monkeypatch.setattr(news_routes, "db", db)
+    monkeypatch.setattr(news_routes, "_cache_revision", None)
+    monkeypatch.setattr(news_routes, "_cache_revision_checked_at", None)
+    monkeypatch.setattr(news_view_counter, "_pending", Counter())
+    news_routes.news_cache.clear()
+    asyncio.run(db.news.insert_one(news_document("n1", "Курсы якутского языка")))
+
+    app = FastAPI()
+    app.include_router(news_routes.news_router, prefix="/api")
+    yield TestClient(app)
+    news_routes.news_cache.clear()
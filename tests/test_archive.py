@@ -0,0 +1,123 @@
+"""Перенос старых обработанных заявок в архив и повторный запуск после сбоя"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import SubmissionArchiver, ARCHIVE_BATCHES_COLLECTION, ARCHIVE_COLLECTION
+
+LEASE_SECONDS = 600
+
+
+class FailingDeletes:
+    """Обертка горячей коллекции: удаление падает, как упавший после копирования процесс"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def bulk_write(self, requests, *args, **kwargs):
+        raise ConnectionError("process died")
+
+
+class CrashingDb:
+    def __init__(self, db):
+        self._db = db
+        self.contact_submissions = FailingDeletes(db.contact_submissions)
+
+    def __getitem__(self, name):
+        return self._db[name]
+
+
+def make_archiver(db) -> SubmissionArchiver:
+    archiver = SubmissionArchiver(age_days=180, batch_size=2, lease_seconds=LEASE_SECONDS)
+    archiver._db = db
+    return archiver
+
+
+def insert_submissions(db, count: int, status: str = "processed", age_days: int = 400) -> None:
+    created_at = datetime.utcnow() - timedelta(days=age_days)
+    asyncio.run(db.contact_submissions.insert_many([
+        {"id": f"s{index}", "status": status, "created_at": created_at + timedelta(minutes=index), "updated_at": created_at}
+        for index in range(count)
+    ]))
+
+
+def ids(db, collection: str) -> list:
+    return sorted(doc["id"] for doc in asyncio.run(db[collection].find().to_list(None)))
+
+
+def expire_batches(db) -> None:
+    started_at = datetime.utcnow() - timedelta(seconds=LEASE_SECONDS + 1)
+    asyncio.run(db[ARCHIVE_BATCHES_COLLECTION].update_many({}, {"$set": {"started_at": started_at}}))
+
+
+def test_moves_only_old_processed_submissions(db):
+    insert_submissions(db, 3)
+    asyncio.run(db.contact_submissions.insert_many([
+        {"id": "new-old", "status": "new", "created_at": datetime(2020, 1, 1)},
+        {"id": "recent", "status": "replied", "created_at": datetime.utcnow()},
+    ]))
+
+    assert asyncio.run(make_archiver(db).run_once()) == 3
+    assert ids(db, ARCHIVE_COLLECTION) == ["s0", "s1", "s2"]
+    assert ids(db, "contact_submissions") == ["new-old", "recent"]
+    assert ids(db, ARCHIVE_BATCHES_COLLECTION) == []
+
+
+def test_rerun_after_crash_between_copy_and_delete(db):
+    insert_submissions(db, 2)
+    with pytest.raises(ConnectionError):
+        asyncio.run(make_archiver(CrashingDb(db)).archive_batch())
+    assert ids(db, ARCHIVE_COLLECTION) == ["s0", "s1"]
+    assert ids(db, "contact_submissions") == ["s0", "s1"]
+
+    archiver = make_archiver(db)
+    assert asyncio.run(archiver.run_once()) == 2
+    # Копии перезаписаны, а не продублированы
+    assert asyncio.run(db[ARCHIVE_COLLECTION].count_documents({})) == 2
+    assert ids(db, "contact_submissions") == []
+
+
+def test_changed_submission_copy_removed_after_lease(db):
+    insert_submissions(db, 2)
+    with pytest.raises(ConnectionError):
+        asyncio.run(make_archiver(CrashingDb(db)).archive_batch())
+    # До повторного запуска заявку вернули в работу: новый запуск ее не выберет
+    asyncio.run(db.contact_submissions.update_one(
+        {"id": "s0"}, {"$set": {"status": "new", "updated_at": datetime.utcnow()}}
+    ))
+
+    archiver = make_archiver(db)
+    # Аренда не истекла: пачку, возможно, еще переносит другой процесс
+    assert asyncio.run(archiver.recover()) == 0
+    assert ids(db, ARCHIVE_COLLECTION) == ["s0", "s1"]
+
+    expire_batches(db)
+    assert asyncio.run(archiver.run_once()) == 1
+    assert ids(db, ARCHIVE_COLLECTION) == ["s1"]
+    assert ids(db, "contact_submissions") == ["s0"]
+    assert ids(db, ARCHIVE_BATCHES_COLLECTION) == []
+    # Обе копии сняты при восстановлении, неизмененная s1 перенесена заново
+    assert archiver.stats()["recovered"] == 2
+
+
+def test_submission_changed_during_batch_stays_hot(db):
+    insert_submissions(db, 2)
+    archiver = make_archiver(db)
+
+    class ChangeBeforeDelete(FailingDeletes):
+        async def bulk_write(self, requests, *args, **kwargs):
+            # Статус меняется между чтением пачки и удалением
+            await self._collection.update_one({"id": "s1"}, {"$set": {"status": "new", "updated_at": datetime.utcnow()}})
+            return await self._collection.bulk_write(requests, *args, **kwargs)
+
+    racing = CrashingDb(db)
+    racing.contact_submissions = ChangeBeforeDelete(db.contact_submissions)
+    archiver._db = racing
+
+    assert asyncio.run(archiver.archive_batch()) == 1
+    assert ids(db, ARCHIVE_COLLECTION) == ["s0"]
+    assert ids(db, "contact_submissions") == ["s1"]
@@ -0,0 +1,143 @@
+"""Ограничение размера тела запроса: Content-Length, chunked-тело и лимиты по маршрутам"""
+import asyncio
+import json
+
+from fastapi import FastAPI, Request
+
+from body_limit import BodySizeLimitMiddleware, BodyLimit, BODY_LIMITS, BODY_LIMIT_DEFAULT
+
+CHUNK = b"x" * 1024
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/admin/login")
+    async def login(request: Request):
+        return {"received": len(await request.body())}
+
+    @app.post("/api/admin/news/import")
+    async def import_news(request: Request):
+        return {"received": len(await request.body())}
+
+    @app.post("/api/swallow")
+    async def swallow(request: Request):
+        try:
+            await request.body()
+        except Exception:
+            return {"received": "partial"}
+        return {"received": "all"}
+
+    return app
+
+
+class Client:
+    """ASGI-клиент: тело отдается кусками, считается, сколько кусков прочитано"""
+
+    def __init__(self, app):
+        self.app = app
+        self.chunks_read = 0
+
+    def post(self, path: str, chunks: int, content_length: bool = False):
+        return asyncio.run(self._post(path, chunks, content_length))
+
+    async def _post(self, path: str, chunks: int, content_length: bool):
+        self.chunks_read = 0
+        headers = [(b"host", b"testserver"), (b"content-type", b"application/octet-stream")]
+        if content_length:
+            headers.append((b"content-length", str(chunks * len(CHUNK)).encode()))
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": headers, "client": ("10.0.0.1", 5000), "server": ("testserver", 80),
+        }
+
+        async def receive():
+            if self.chunks_read < chunks:
+                self.chunks_read += 1
+                return {"type": "http.request", "body": CHUNK, "more_body": self.chunks_read < chunks}
+            return {"type": "http.disconnect"}
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+        [start] = [message for message in messages if message["type"] == "http.response.start"]
+        body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+        return start["status"], dict(start["headers"]), json.loads(body)
+
+
+def limited(limits=BODY_LIMITS, default=BODY_LIMIT_DEFAULT) -> Client:
+    return Client(BodySizeLimitMiddleware(make_app(), limits=limits, default=default))
+
+
+def test_chunked_body_over_limit_stops_reading():
+    client = limited()
+    status, headers, body = client.post("/api/admin/login", chunks=100)
+
+    assert status == 413
+    assert body == {"detail": "Размер запроса превышает лимит"}
+    assert headers[b"connection"] == b"close"
+    # Лимит 4 КБ: чтение прерывается на пятом куске из ста
+    assert client.chunks_read == 5
+
+
+def test_content_length_over_limit_rejected_before_reading():
+    client = limited()
+    status, _, _ = client.post("/api/admin/login", chunks=100, content_length=True)
+
+    assert status == 413
+    assert client.chunks_read == 0
+
+
+def test_body_within_limit_passes():
+    client = limited()
+    status, _, body = client.post("/api/admin/login", chunks=4)
+
+    assert status == 200
+    assert body == {"received": 4 * 1024}
+
+
+def test_handler_swallowing_error_still_gets_413():
+    client = limited(limits=[BodyLimit("/api/swallow", 2048, ("POST",))])
+    status, _, body = client.post("/api/swallow", chunks=10)
+
+    assert status == 413
+    assert body == {"detail": "Размер запроса превышает лимит"}
+
+
+def test_import_route_uses_import_limit():
+    client = limited()
+    # 100 КБ больше лимита входа (4 КБ) и лимита по умолчанию, но меньше лимита импорта
+    status, _, body = client.post("/api/admin/news/import", chunks=100)
+
+    assert status == 200
+    assert body == {"received": 100 * 1024}
+
+
+def test_route_limits_chosen_by_prefix_and_method():
+    middleware = BodySizeLimitMiddleware(make_app(), limits=BODY_LIMITS, default=BODY_LIMIT_DEFAULT)
+    import_limit = 50 * 1024 * 1024
+    admin_limit = 1024 * 1024
+
+    assert middleware.limit_for("POST", "/api/admin/login") == 4 * 1024
+    assert middleware.limit_for("POST", "/api/admin/news/import") == import_limit
+    assert middleware.limit_for("POST", "/api/admin/submissions/import") == import_limit
+    # Частный путь раньше общего /api/admin/, остальные админские запросы - общий лимит
+    assert middleware.limit_for("PUT", "/api/admin/news/n1") == admin_limit
+    assert middleware.limit_for("GET", "/api/admin/news/import") == admin_limit
+    assert middleware.limit_for("POST", "/api/news") == admin_limit
+    assert middleware.limit_for("POST", "/api/contact-form") == 16 * 1024
+    # Лимит формы только для POST
+    assert middleware.limit_for("PUT", "/api/contact-form") == BODY_LIMIT_DEFAULT
+    assert middleware.limit_for("POST", "/api/content/home") == BODY_LIMIT_DEFAULT
+    assert BODY_LIMIT_DEFAULT == 64 * 1024
+
+
+def test_server_uses_route_limits():
+    import server
+
+    [middleware] = [entry for entry in server.app.user_middleware if entry.cls is BodySizeLimitMiddleware]
+    assert middleware.kwargs == {"limits": BODY_LIMITS, "default": BODY_LIMIT_DEFAULT}
@@ -0,0 +1,129 @@
+"""Пакетные операции над заявками в горячей коллекции и в архиве"""
+import asyncio
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from archive import ARCHIVE_COLLECTION
+from bulk_operations import BulkOperations, submission_operation
+from models import BulkOperation
+
+
+class FailingWrites:
+    """Обертка коллекции: операции с номерами fail_indexes в bulk_write не выполняются"""
+
+    def __init__(self, collection, fail_indexes):
+        self._collection = collection
+        self.fail_indexes = set(fail_indexes)
+        self.calls = []
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.calls.append(len(requests))
+        applied = [request for index, request in enumerate(requests) if index not in self.fail_indexes]
+        if applied:
+            await self._collection.bulk_write(applied, ordered=ordered)
+        if self.fail_indexes:
+            raise BulkWriteError({
+                "writeErrors": [{"index": index, "errmsg": f"failed {index}"} for index in sorted(self.fail_indexes)],
+                "nInserted": 0,
+            })
+
+
+def seed(db) -> None:
+    created_at = datetime(2024, 1, 1)
+    asyncio.run(db.contact_submissions.insert_many([
+        {"id": f"h{index}", "status": "new", "created_at": created_at} for index in range(3)
+    ]))
+    asyncio.run(db[ARCHIVE_COLLECTION].insert_many([
+        {"id": f"a{index}", "status": "processed", "created_at": created_at} for index in range(3)
+    ]))
+
+
+def run(collection, fallback, operations, written=None):
+    bulk = BulkOperations(
+        collection,
+        submission_operation,
+        on_written=(lambda document_id, before, after: written.append((document_id, after))) if written is not None else None,
+        projection={"_id": 0, "id": 1, "status": 1},
+        fallback=fallback
+    )
+    return asyncio.run(bulk.run([BulkOperation(**operation) for operation in operations]))
+
+
+def status(db, collection: str, document_id: str):
+    document = asyncio.run(db[collection].find_one({"id": document_id}))
+    return document and document["status"]
+
+
+def test_mixed_hot_and_archived_ids(db):
+    seed(db)
+    written = []
+    response = run(db.contact_submissions, db[ARCHIVE_COLLECTION], [
+        {"id": "h0", "action": "status", "status": "replied"},
+        {"id": "a0", "action": "status", "status": "new"},
+        {"id": "a1", "action": "delete"},
+        {"id": "missing", "action": "delete"},
+        {"id": "h1", "action": "status", "status": "unknown"},
+        {"id": "h0", "action": "delete"},
+    ], written)
+
+    assert [result.success for result in response.results] == [True, True, True, False, False, False]
+    assert response.results[3].error == "Не найдено"
+    assert response.results[4].error.startswith("Некорректный статус")
+    assert response.results[5].error == "id повторяется в пакете"
+    assert (response.total, response.succeeded, response.failed) == (6, 3, 3)
+
+    assert status(db, "contact_submissions", "h0") == "replied"
+    assert status(db, ARCHIVE_COLLECTION, "a0") == "new"
+    assert status(db, ARCHIVE_COLLECTION, "a1") is None
+    # Архивные id не записываются в горячую коллекцию
+    assert status(db, "contact_submissions", "a0") is None
+    after = {document_id: document and document["status"] for document_id, document in written}
+    assert after == {"h0": "replied", "a0": "new", "a1": None}
+
+
+def test_hot_collection_wins_over_archive_copy(db):
+    seed(db)
+    asyncio.run(db[ARCHIVE_COLLECTION].insert_one({"id": "h2", "status": "processed"}))
+    run(db.contact_submissions, db[ARCHIVE_COLLECTION], [{"id": "h2", "action": "status", "status": "replied"}])
+
+    assert status(db, "contact_submissions", "h2") == "replied"
+    assert status(db, ARCHIVE_COLLECTION, "h2") == "processed"
+
+
+def test_write_errors_mapped_back_per_collection(db):
+    seed(db)
+    hot = FailingWrites(db.contact_submissions, fail_indexes=[1])
+    archive = FailingWrites(db[ARCHIVE_COLLECTION], fail_indexes=[0])
+    written = []
+    response = run(hot, archive, [
+        {"id": "a0", "action": "status", "status": "replied"},
+        {"id": "h0", "action": "status", "status": "processed"},
+        {"id": "a1", "action": "status", "status": "replied"},
+        {"id": "h1", "action": "delete"},
+        {"id": "a2", "action": "delete"},
+        {"id": "h2", "action": "status", "status": "replied"},
+    ], written)
+
+    # Горячая коллекция: h0, h1, h2 (ошибка у второй), архив: a0, a1, a2 (ошибка у первой)
+    assert hot.calls == [3] and archive.calls == [3]
+    assert {result.id: result.success for result in response.results} == {
+        "a0": False, "h0": True, "a1": True, "h1": False, "a2": True, "h2": True
+    }
+    assert response.results[0].error == "Ошибка записи: failed 0"
+    assert response.results[3].error == "Ошибка записи: failed 1"
+    assert sorted(document_id for document_id, _ in written) == ["a1", "a2", "h0", "h2"]
+
+    assert status(db, ARCHIVE_COLLECTION, "a0") == "processed"
+    assert status(db, "contact_submissions", "h1") == "new"
+    assert status(db, "contact_submissions", "h2") == "replied"
+
+
+def test_without_fallback_archived_ids_not_found(db):
+    seed(db)
+    response = run(db.contact_submissions, None, [{"id": "a0", "action": "delete"}])
+    assert response.results[0].error == "Не найдено"
+    assert status(db, ARCHIVE_COLLECTION, "a0") == "processed"
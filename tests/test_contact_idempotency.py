@@ -0,0 +1,128 @@
+"""Повторная отправка формы заявки: Idempotency-Key и окно дублей по отпечатку"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.contact as contact_routes
+from group_commit import contact_group_commit
+from outbox import email_outbox
+from rate_limit import rate_limiter
+
+FORM = {
+    "name": "Иван Петров",
+    "phone": "+7 914 123-45-67",
+    "email": "ivan@example.com",
+    "organization": "Школа №1",
+    "comment": "Курсы для 10 сотрудников",
+    "agree": True,
+}
+
+
+@pytest.fixture
+def contact_client(db, monkeypatch):
+    monkeypatch.setattr(contact_routes, "client", object())
+    monkeypatch.setattr(contact_routes, "db", db)
+    monkeypatch.setattr(email_outbox, "_db", db)
+    monkeypatch.setattr(email_outbox, "digest_enabled", False)
+    monkeypatch.setattr(rate_limiter, "rules", {})
+
+    app = FastAPI()
+    app.include_router(contact_routes.contact_router, prefix="/api")
+    return TestClient(app)
+
+
+def count(db, collection: str, query=None) -> int:
+    return asyncio.run(db[collection].count_documents(query or {}))
+
+
+def test_same_key_replays_stored_response(contact_client, db):
+    first = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k1"})
+    second = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k1"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert count(db, "contact_submissions") == 1
+    # Уведомление администратору и подтверждение клиенту - только для первой отправки
+    assert count(db, "email_outbox") == 2
+
+
+def test_same_key_with_different_body_replays_original(contact_client, db):
+    first = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k1"})
+    changed = {**FORM, "email": "other@example.com", "comment": "Другая заявка"}
+    second = contact_client.post("/api/contact-form", json=changed, headers={"Idempotency-Key": "k1"})
+
+    # Ключ определяет запрос: повтор с тем же ключом получает ответ исходной заявки
+    assert second.json()["id"] == first.json()["id"]
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert count(db, "contact_submissions") == 1
+    assert count(db, "email_outbox") == 2
+
+
+def test_different_keys_same_body_hit_fingerprint(contact_client, db):
+    first = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k1"})
+    second = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k2"})
+    third = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k2"})
+
+    assert second.json()["id"] == third.json()["id"] == first.json()["id"]
+    assert count(db, "contact_submissions") == 1
+
+
+def test_fingerprint_match_within_window_is_duplicate(contact_client, db):
+    first = contact_client.post("/api/contact-form", json=FORM)
+    # Тот же телефон в другом формате, email и комментарий в другом регистре
+    same = {**FORM, "phone": "8 (914) 123 45 67", "email": "IVAN@example.com", "comment": "  курсы для 10   сотрудников "}
+    second = contact_client.post("/api/contact-form", json=same)
+
+    assert second.json()["id"] == first.json()["id"]
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert count(db, "contact_submissions") == 1
+    assert count(db, "email_outbox") == 2
+
+
+def test_different_comment_is_new_submission(contact_client, db):
+    first = contact_client.post("/api/contact-form", json=FORM)
+    second = contact_client.post("/api/contact-form", json={**FORM, "comment": "Еще одна группа"})
+
+    assert second.json()["id"] != first.json()["id"]
+    assert count(db, "contact_submissions") == 2
+
+
+def test_fingerprint_after_window_is_new_submission(contact_client, db):
+    first = contact_client.post("/api/contact-form", json=FORM)
+    # Окно истекло, а TTL-монитор еще не удалил документ отпечатка
+    asyncio.run(db.contact_idempotency.update_many(
+        {"_id": {"$regex": "^fp:"}}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    ))
+    second = contact_client.post("/api/contact-form", json=FORM)
+
+    assert second.status_code == 200
+    assert second.json()["id"] != first.json()["id"]
+    assert "Idempotent-Replayed" not in second.headers
+    assert count(db, "contact_submissions") == 2
+
+
+def test_failed_save_releases_keys(contact_client, db, monkeypatch):
+    async def failing_insert(collection, document):
+        raise ConnectionError("database is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(contact_group_commit, "insert_one", failing_insert)
+        failed = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k1"})
+    assert failed.status_code == 500
+    assert count(db, "contact_idempotency") == 0
+
+    retried = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k1"})
+    assert retried.status_code == 200
+    assert "Idempotent-Replayed" not in retried.headers
+    assert count(db, "contact_submissions") == 1
+
+
+def test_invalid_key_rejected(contact_client, db):
+    response = contact_client.post("/api/contact-form", json=FORM, headers={"Idempotency-Key": "k" * 256})
+    assert response.status_code == 400
+    assert count(db, "contact_submissions") == 0
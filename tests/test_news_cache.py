@@ -0,0 +1,51 @@
+"""Кэш публичных чтений новостей: запись из другого процесса сбрасывает кэш по ревизии"""
+import asyncio
+from datetime import datetime
+
+import routes.news as news_routes
+
+
+def write_from_other_worker(coroutine):
+    """Запись мимо маршрутов: invalidate_news_cache в этом процессе не вызывается"""
+    asyncio.run(coroutine)
+
+
+def test_item_served_from_cache_until_revision_changes(news_client, db, monkeypatch):
+    monkeypatch.setattr(news_routes, "NEWS_CACHE_REVISION_CHECK_SECONDS", 3600)
+    assert news_client.get("/api/news/n1").json()["published"] is True
+    hits = news_routes.news_cache.hits
+    assert news_client.get("/api/news/n1").status_code == 200
+    assert news_routes.news_cache.hits == hits + 1
+
+    write_from_other_worker(db.news.update_one(
+        {"id": "n1"}, {"$set": {"published": False, "updated_at": datetime(2025, 3, 2)}}
+    ))
+    # До следующей проверки ревизии отдается кэш
+    assert news_client.get("/api/news/n1").json()["published"] is True
+
+    monkeypatch.setattr(news_routes, "NEWS_CACHE_REVISION_CHECK_SECONDS", 0)
+    response = news_client.get("/api/news/n1")
+    assert response.json()["published"] is False
+    assert "public" not in response.headers["Cache-Control"]
+
+
+def test_list_drops_article_deleted_by_other_worker(news_client, db, monkeypatch):
+    monkeypatch.setattr(news_routes, "NEWS_CACHE_REVISION_CHECK_SECONDS", 0)
+    assert [item["id"] for item in news_client.get("/api/news").json()["news"]] == ["n1"]
+
+    write_from_other_worker(db.news.delete_one({"id": "n1"}))
+    assert news_client.get("/api/news").json()["news"] == []
+    assert news_client.get("/api/news/n1").status_code == 404
+
+
+def test_revision_check_failure_keeps_cache(news_client, db, monkeypatch):
+    monkeypatch.setattr(news_routes, "NEWS_CACHE_REVISION_CHECK_SECONDS", 0)
+    assert news_client.get("/api/news/n1").status_code == 200
+
+    async def broken_revision():
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(news_routes, "_news_revision", broken_revision)
+    hits = news_routes.news_cache.hits
+    assert news_client.get("/api/news/n1").status_code == 200
+    assert news_routes.news_cache.hits == hits + 1
@@ -0,0 +1,130 @@
+"""Дайджест уведомлений: забор в digesting, создание письма и восстановление после сбоя"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from outbox import (
+    EmailOutbox,
+    ADMIN_DIGEST,
+    ADMIN_NOTIFICATION,
+    BUFFERED,
+    DIGESTED,
+    DIGESTING,
+)
+
+LEASE_SECONDS = 60
+
+
+class CrashBeforeMark:
+    """Обертка email_outbox: падает на шаге digesting -> digested, как упавший процесс"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def update_many(self, query, update, *args, **kwargs):
+        if update.get("$set", {}).get("status") == DIGESTED:
+            raise ConnectionError("process died")
+        return await self._collection.update_many(query, update, *args, **kwargs)
+
+
+class CrashingDb:
+    def __init__(self, db):
+        self.email_outbox = CrashBeforeMark(db.email_outbox)
+
+
+def make_outbox(db) -> EmailOutbox:
+    outbox = EmailOutbox(digest_enabled=True, digest_window=600, digest_max_items=20, lease_seconds=LEASE_SECONDS)
+    outbox._db = db
+    return outbox
+
+
+def buffer_notifications(db, count: int) -> None:
+    start = datetime.utcnow() - timedelta(seconds=5)
+    documents = []
+    for index in range(count):
+        document = EmailOutbox._document(ADMIN_NOTIFICATION, {"name": f"Заявка {index}"}, status=BUFFERED)
+        document["created_at"] = start + timedelta(milliseconds=index)
+        documents.append(document)
+    asyncio.run(db.email_outbox.insert_many(documents))
+
+
+def expire_claims(db) -> None:
+    """Сдвигает digesting-уведомления за пределы аренды"""
+    expired = datetime.utcnow() - timedelta(seconds=LEASE_SECONDS + 1)
+    asyncio.run(db.email_outbox.update_many({"status": DIGESTING}, {"$set": {"updated_at": expired}}))
+
+
+def statuses(db) -> dict:
+    result = {}
+    for document in asyncio.run(db.email_outbox.find({"kind": ADMIN_NOTIFICATION}).to_list(None)):
+        result[document["status"]] = result.get(document["status"], 0) + 1
+    return result
+
+
+def digests(db) -> list:
+    return asyncio.run(db.email_outbox.find({"kind": ADMIN_DIGEST}).to_list(None))
+
+
+def test_flush_creates_one_digest(db):
+    buffer_notifications(db, 3)
+    outbox = make_outbox(db)
+
+    assert asyncio.run(outbox.flush_digest()) == 0
+    assert asyncio.run(outbox.flush_digest(force=True)) == 1
+
+    [digest] = digests(db)
+    assert [item["name"] for item in digest["payload"]["submissions"]] == ["Заявка 0", "Заявка 1", "Заявка 2"]
+    assert statuses(db) == {DIGESTED: 3}
+
+
+def test_crash_between_upsert_and_mark_does_not_duplicate_digest(db):
+    buffer_notifications(db, 3)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(make_outbox(CrashingDb(db)).flush_digest(force=True))
+    assert len(digests(db)) == 1
+    assert statuses(db) == {DIGESTING: 3}
+
+    other = make_outbox(db)
+    # Аренда еще не истекла: claim принадлежит упавшему процессу
+    assert asyncio.run(other.flush_digest()) == 0
+    assert statuses(db) == {DIGESTING: 3}
+
+    expire_claims(db)
+    assert asyncio.run(other.flush_digest()) == 0
+    assert statuses(db) == {DIGESTED: 3}
+    [digest] = digests(db)
+    assert len(digest["payload"]["submissions"]) == 3
+
+    # Повтор ничего не меняет
+    assert asyncio.run(other.flush_digest(force=True)) == 0
+    assert len(digests(db)) == 1
+
+
+def test_stale_claim_recovered_by_other_caller(db):
+    buffer_notifications(db, 2)
+    # Процесс забрал уведомления в дайджест и упал до создания письма
+    asyncio.run(db.email_outbox.update_many(
+        {"status": BUFFERED}, {"$set": {"status": DIGESTING, "digest_id": "lost-digest", "updated_at": datetime.utcnow()}}
+    ))
+    buffer_notifications(db, 1)
+    other = make_outbox(db)
+
+    assert asyncio.run(other.flush_digest()) == 0
+    assert digests(db) == []
+
+    expire_claims(db)
+    assert asyncio.run(other.flush_digest()) == 1
+    [digest] = digests(db)
+    assert digest["id"] == "lost-digest"
+    assert len(digest["payload"]["submissions"]) == 2
+    # Новое уведомление ждет своего окна
+    assert statuses(db) == {DIGESTED: 2, BUFFERED: 1}
+
+    assert asyncio.run(other.flush_digest(force=True)) == 1
+    assert len(digests(db)) == 2
+    assert statuses(db) == {DIGESTED: 3}
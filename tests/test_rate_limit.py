@@ -0,0 +1,145 @@
+"""Ограничение частоты запросов: RateLimiter с MemoryRateLimitBackend и подменными часами"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from rate_limit import MemoryRateLimitBackend, RateLimiter, RateLimitRule
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_limiter(clock, max_keys=100):
+    return RateLimiter(
+        rules={
+            "contact-form": RateLimitRule(capacity=2, period=10),
+            "admin-login": RateLimitRule(capacity=3, period=30),
+        },
+        backend=MemoryRateLimitBackend(max_keys=max_keys, clock=clock)
+    )
+
+
+def check(limiter, route, ip):
+    asyncio.run(limiter.check(route, ip))
+
+
+def test_rule_parse():
+    rule = RateLimitRule.parse("5/600")
+    assert rule == RateLimitRule(5, 600.0)
+    assert rule.rate == pytest.approx(5 / 600)
+
+
+def test_exhausted_bucket_returns_429_with_retry_after():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    check(limiter, "contact-form", "10.0.0.1")
+    check(limiter, "contact-form", "10.0.0.1")
+
+    with pytest.raises(HTTPException) as error:
+        check(limiter, "contact-form", "10.0.0.1")
+    assert error.value.status_code == 429
+    # 2 запроса за 10 секунд: следующий токен через 5 секунд
+    assert error.value.headers["Retry-After"] == "5"
+
+    clock.advance(2)
+    with pytest.raises(HTTPException) as error:
+        check(limiter, "contact-form", "10.0.0.1")
+    assert error.value.headers["Retry-After"] == "3"
+
+
+def test_tokens_refill_after_window():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    for _ in range(2):
+        check(limiter, "contact-form", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        check(limiter, "contact-form", "10.0.0.1")
+
+    clock.advance(5)
+    check(limiter, "contact-form", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        check(limiter, "contact-form", "10.0.0.1")
+
+    # Пополнение не превышает capacity
+    clock.advance(100)
+    for _ in range(2):
+        check(limiter, "contact-form", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        check(limiter, "contact-form", "10.0.0.1")
+
+
+def test_lru_eviction_when_max_keys_exceeded():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_keys=2)
+    backend = limiter.backend
+    check(limiter, "contact-form", "10.0.0.1")
+    check(limiter, "contact-form", "10.0.0.2")
+    check(limiter, "contact-form", "10.0.0.1")
+    # Дольше всех не использовался 10.0.0.2: он и вытесняется
+    check(limiter, "contact-form", "10.0.0.3")
+
+    assert backend.evictions == 1
+    assert backend.stats()["keys"] == 2
+    with pytest.raises(HTTPException):
+        check(limiter, "contact-form", "10.0.0.1")
+    # Вытесненный ключ начинает с полной корзины
+    check(limiter, "contact-form", "10.0.0.2")
+    check(limiter, "contact-form", "10.0.0.2")
+
+
+def test_routes_do_not_share_buckets():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    for _ in range(2):
+        check(limiter, "contact-form", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        check(limiter, "contact-form", "10.0.0.1")
+
+    for _ in range(3):
+        check(limiter, "admin-login", "10.0.0.1")
+    # Другой IP на том же маршруте тоже не затронут
+    check(limiter, "contact-form", "10.0.0.2")
+
+
+def test_route_without_rule_is_not_limited():
+    limiter = make_limiter(FakeClock())
+    for _ in range(10):
+        check(limiter, "news", "10.0.0.1")
+    assert limiter.backend.stats()["keys"] == 0
+
+
+def test_rejected_requests_metric():
+    limiter = make_limiter(FakeClock())
+    for _ in range(4):
+        try:
+            check(limiter, "contact-form", "10.0.0.1")
+        except HTTPException:
+            pass
+    check(limiter, "admin-login", "10.0.0.1")
+
+    stats = limiter.stats()
+    assert stats["allowed"] == {"contact-form": 2, "admin-login": 1}
+    assert stats["rejected"] == {"contact-form": 2}
+
+
+def test_backend_failure_allows_request():
+    class BrokenBackend:
+        async def hit(self, key, rule):
+            raise ConnectionError("storage is down")
+
+        def stats(self):
+            return {}
+
+    limiter = RateLimiter({"contact-form": RateLimitRule(1, 10)}, backend=BrokenBackend())
+    check(limiter, "contact-form", "10.0.0.1")
+    check(limiter, "contact-form", "10.0.0.1")
+    assert limiter.stats()["backend_errors"] == 2
@@ -0,0 +1,158 @@
+"""
+Эквивалентность security.sanitize_string/sanitize_dict прежней реализации (цепочка re.sub)
+
+Случайные строки собираются из фрагментов опасных шаблонов в разных регистрах,
+кириллицы, спецсимволов и символов, меняющих длину при смене регистра.
+Генератор с фиксированным seed, поэтому набор случаев одинаков при каждом запуске.
+"""
+import random
+import re
+from datetime import datetime
+from typing import Any, Dict
+
+import pytest
+
+from security import sanitize_dict, sanitize_string, DANGEROUS_PATTERNS
+
+SEED = 20250301
+STRING_CASES = 20000
+DOCUMENT_CASES = 2000
+
+
+# --- Прежняя реализация (эталон) ---
+
+def reference_sanitize_string(value: str, max_length: int = 1000) -> str:
+    if not isinstance(value, str):
+        raise ValueError("Value must be a string")
+
+    dangerous_patterns = [
+        r'\$where',
+        r'\$regex',
+        r'\$ne',
+        r'\$gt',
+        r'\$lt',
+        r'\$in',
+        r'\$nin',
+        r'javascript:',
+        r'<script',
+        r'eval\(',
+        r'function\(',
+    ]
+
+    cleaned = value
+    for pattern in dangerous_patterns:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+
+    if len(cleaned) > max_length:
+        cleaned = cleaned[:max_length]
+
+    cleaned = re.sub(r'[<>"\']', '', cleaned)
+
+    return cleaned.strip()
+
+
+def reference_sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        return data
+
+    sanitized = {}
+    for key, value in data.items():
+        clean_key = reference_sanitize_string(str(key), 100)
+
+        if isinstance(value, str):
+            sanitized[clean_key] = reference_sanitize_string(value)
+        elif isinstance(value, dict):
+            sanitized[clean_key] = reference_sanitize_dict(value)
+        elif isinstance(value, list):
+            sanitized[clean_key] = [reference_sanitize_dict(item) if isinstance(item, dict)
+                                    else reference_sanitize_string(str(item)) if isinstance(item, str)
+                                    else item for item in value]
+        else:
+            sanitized[clean_key] = value
+
+    return sanitized
+
+
+# --- Генераторы ---
+
+_FRAGMENTS = [
+    pattern.replace("\\", "") for pattern in DANGEROUS_PATTERNS
+] + ["$", "$n", "$w", "e", "in", "here", "ere", "(", ":", "<", ">", "\"", "'", "script", "java"]
+_CHARS = list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ $(:<>\"'\t\n") + list(
+    "аяыЁё№«»—"
+) + ["ſ", "K", "İ", "ı", " ", " ", "\x00"]
+
+
+def _mutate_case(text: str, rng: random.Random) -> str:
+    return "".join(ch.upper() if rng.random() < 0.5 else ch for ch in text)
+
+
+def random_text(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 12)):
+        if rng.random() < 0.5:
+            parts.append(_mutate_case(rng.choice(_FRAGMENTS), rng))
+        else:
+            parts.append("".join(rng.choice(_CHARS) for _ in range(rng.randint(1, 4))))
+    return "".join(parts)
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    kind = rng.random()
+    if kind < 0.45 or depth > 2:
+        return random_text(rng)
+    if kind < 0.6:
+        return rng.choice([None, True, 42, 3.5, datetime(2025, 1, 1)])
+    if kind < 0.8:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {random_text(rng): random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))}
+
+
+# --- Тесты ---
+
+# Каскады: удаление шаблона образует следующий по списку
+CASCADES = ["$n$wherEe", "$$nein", "<scr<scriptipt", "jav$ltascript:", "eval$gt(", "  $where  ", "$NİN", "ſcript"]
+
+
+@pytest.mark.parametrize("text", CASCADES)
+def test_cascades_match_reference(text):
+    assert sanitize_string(text) == reference_sanitize_string(text)
+
+
+def test_random_strings_match_reference():
+    rng = random.Random(SEED)
+    for _ in range(STRING_CASES):
+        text = random_text(rng)
+        max_length = rng.choice([1000, 100, 5, 0])
+        assert sanitize_string(text, max_length) == reference_sanitize_string(text, max_length), text
+
+
+@pytest.mark.parametrize("max_length", [0, 1, 5, 10])
+def test_truncation_edge_matches_reference(max_length):
+    # Обрезка выполняется после удаления шаблонов и до удаления кавычек и скобок
+    rng = random.Random(SEED + max_length)
+    texts = ["a" * max_length, "a" * (max_length + 1), f"$where{'b' * max_length}", f"{'<' * max_length}abc", " " * max_length + "x"]
+    texts += [random_text(rng) for _ in range(2000)]
+    for text in texts:
+        assert sanitize_string(text, max_length) == reference_sanitize_string(text, max_length), text
+
+
+def test_random_documents_match_reference():
+    rng = random.Random(SEED)
+    for _ in range(DOCUMENT_CASES):
+        document = {random_text(rng): random_value(rng) for _ in range(rng.randint(0, 5))}
+        assert sanitize_dict(document) == reference_sanitize_dict(document), document
+
+
+def test_nested_dicts_and_lists_match_reference():
+    document = {
+        "$where": {"eval(x)": ["<script>", {"$NE": "javascript:alert"}, 7, None, ["$in"]]},
+        "comment": "  'quoted' \"text\"  ",
+        "long": "x" * 1500,
+        "k" * 150: datetime(2025, 1, 1),
+    }
+    assert sanitize_dict(document) == reference_sanitize_dict(document)
+
+
+def test_non_dict_is_returned_as_is():
+    assert sanitize_dict(["$where"]) == reference_sanitize_dict(["$where"])
@@ -0,0 +1,54 @@
+"""Буферизованный счетчик просмотров новостей"""
+import asyncio
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from view_counter import ViewCounter, news_view_counter
+
+
+def test_published_views_recorded_on_miss_and_hit(news_client):
+    assert news_client.get("/api/news/n1").status_code == 200
+    assert news_client.get("/api/news/n1").status_code == 200
+    assert news_view_counter._pending == {"n1": 2}
+
+
+def test_draft_views_not_recorded(news_client, db):
+    asyncio.run(db.news.update_one({"id": "n1"}, {"$set": {"published": False, "updated_at": datetime(2025, 3, 2)}}))
+    assert news_client.get("/api/news/n1").json()["published"] is False
+    assert news_client.get("/api/news/n1").status_code == 200
+    assert not news_view_counter._pending
+
+
+def test_flush_writes_views(db):
+    asyncio.run(db.news.insert_many([{"id": "n1", "views": 3}, {"id": "n2"}]))
+    counter = ViewCounter()
+    counter._db = db
+    for news_id in ("n1", "n1", "n2"):
+        counter.record(news_id)
+
+    assert asyncio.run(counter.flush()) == 3
+    assert not counter._pending
+    views = {doc["id"]: doc.get("views") for doc in asyncio.run(db.news.find({}, {"_id": 0}).to_list(None))}
+    assert views == {"n1": 5, "n2": 1}
+    assert counter.stats()["flushed_views"] == 3
+
+
+def test_flush_failure_returns_views_to_buffer():
+    class FailingNews:
+        async def bulk_write(self, operations, ordered=True):
+            # Просмотр, пришедший во время записи, не теряется
+            counter.record("n1")
+            raise BulkWriteError({"writeErrors": [], "nInserted": 0})
+
+    class FailingDb:
+        news = FailingNews()
+
+    counter = ViewCounter()
+    counter._db = FailingDb()
+    counter.record("n1")
+    counter.record("n2")
+
+    assert asyncio.run(counter.flush()) == 0
+    assert counter._pending == {"n1": 2, "n2": 1}
+    assert counter.stats()["flushed_views"] == 0